@@ -29,7 +29,8 @@ class GrupoAdmin(admin.ModelAdmin):
 @admin.register(Asignatura)
 class AsignaturaAdmin(admin.ModelAdmin):
     # 'grupo' ya no existe, usamos 'carrera' o una función personalizada
-    list_display = ('nombre', 'carrera', 'mostrar_grupos', 'clave') 
+    list_display = ('nombre', 'carrera', 'mostrar_grupos', 'clave', 'horas_semana')
+    list_editable = ('horas_semana',)
     
     # 'grupo__plantel' ya no funciona porque la relación es ManyToMany
     # Filtramos por carrera o directamente por el plantel de la carrera
@@ -0,0 +1,166 @@
+# academic/analisis_items.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Análisis de reactivos de actividades de opción múltiple
+#
+# Con las respuestas de todas las entregas (una consulta) se arma una matriz
+# entregas × preguntas con el índice de la opción elegida; de ahí salen, con
+# operaciones de NumPy sobre columnas completas:
+#
+#   · dificultad: proporción de aciertos de cada pregunta;
+#   · discriminación: correlación punto-biserial entre acertar la pregunta y
+#     el puntaje en el resto de la actividad (sin la pregunta misma);
+#   · distractores: cuántas veces se eligió cada opción;
+#   · alfa de Cronbach de la actividad, con los puntos de cada pregunta.
+#
+# El resultado va a la caché con una firma de entregas, respuestas, textos y
+# clave: una entrega o respuesta nueva o corregida, o un cambio de preguntas,
+# cambia la firma y se recalcula.
+# ─────────────────────────────────────────────────────────────────────────────
+import hashlib
+import json
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .models import EntregaActividad, OpcionRespuesta, PreguntaActividad, RespuestaAlumno
+
+ANALISIS_TTL = 24 * 3600
+
+
+def _redondear(valor, digitos=3):
+    return round(float(valor), digitos) if valor is not None and np.isfinite(valor) else None
+
+
+def _clave(actividad):
+    preguntas = list(
+        PreguntaActividad.objects.filter(actividad=actividad)
+        .order_by('orden', 'pk').values('pk', 'texto', 'orden', 'puntos')
+    )
+    opciones = list(
+        OpcionRespuesta.objects.filter(pregunta__actividad=actividad)
+        .order_by('pk').values('pk', 'pregunta_id', 'texto', 'es_correcta')
+    )
+    return preguntas, opciones
+
+
+def _firma(actividad, preguntas, opciones):
+    # Contar y sumar las opciones elegidas hace que también cambie la firma
+    # cuando un alumno corrige una respuesta ya guardada.
+    entregas = EntregaActividad.objects.filter(actividad=actividad).aggregate(
+        n=Count('pk', distinct=True), ultima=Max('pk'), respuesta=Max('respuestas__pk'),
+        n_respuestas=Count('respuestas'), elegidas=Sum('respuestas__opcion'),
+    )
+    datos = json.dumps(
+        [entregas, [(p['pk'], p['texto'], p['orden'], str(p['puntos'])) for p in preguntas],
+         [(o['pk'], o['pregunta_id'], o['texto'], o['es_correcta']) for o in opciones]],
+        sort_keys=True,
+    )
+    return hashlib.sha1(datos.encode()).hexdigest()[:16]
+
+
+def analizar(actividad):
+    """Estadísticas de reactivos de `actividad`, desde la caché si nada cambió."""
+    preguntas, opciones = _clave(actividad)
+    clave = f'analisis_items:{actividad.pk}:{_firma(actividad, preguntas, opciones)}'
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular(actividad, preguntas, opciones)
+        cache.set(clave, resultado, ANALISIS_TTL)
+    return resultado
+
+
+def calcular(actividad, preguntas=None, opciones=None):
+    if preguntas is None:
+        preguntas, opciones = _clave(actividad)
+    k = len(preguntas)
+    col_pregunta = {p['pk']: j for j, p in enumerate(preguntas)}
+
+    # Opciones numeradas por pregunta: 0..m-1 en el orden en que se crearon
+    opciones_de = [[] for _ in preguntas]
+    indice_opcion = {}
+    for o in opciones:
+        j = col_pregunta.get(o['pregunta_id'])
+        if j is not None:
+            indice_opcion[o['pk']] = (j, len(opciones_de[j]))
+            opciones_de[j].append(o)
+    m = max((len(ops) for ops in opciones_de), default=0)
+    correcta = np.zeros((k, max(m, 1)), dtype=bool)
+    for j, ops in enumerate(opciones_de):
+        for i, o in enumerate(ops):
+            correcta[j, i] = o['es_correcta']
+    puntos = np.array([float(p['puntos']) for p in preguntas])
+
+    # Matriz entregas × preguntas con la opción elegida (-1 = sin respuesta)
+    filas = list(
+        RespuestaAlumno.objects.filter(entrega__actividad=actividad, pregunta_id__in=col_pregunta)
+        .order_by('pk').values_list('entrega_id', 'pregunta_id', 'opcion_id')
+    )
+    entrega_ids = np.unique(np.array([f[0] for f in filas], dtype=np.int64))
+    n = len(entrega_ids)
+    elegida = np.full((n, k), -1, dtype=np.int64)
+    if filas:
+        validas = [(e, indice_opcion[o]) for e, p, o in filas if o in indice_opcion and indice_opcion[o][0] == col_pregunta[p]]
+        if validas:
+            fila = np.searchsorted(entrega_ids, np.array([e for e, _ in validas], dtype=np.int64))
+            col = np.array([jo[0] for _, jo in validas])
+            elegida[fila, col] = [jo[1] for _, jo in validas]   # gana la última respuesta
+
+    respondida = elegida >= 0
+    acierto = respondida & correcta[np.arange(k)[None, :], elegida.clip(min=0)]
+    aciertos = acierto.astype(float)
+    puntaje = aciertos * puntos                       # n × k
+    total = puntaje.sum(axis=1)
+
+    # Dificultad y discriminación (punto-biserial con el resto de la actividad)
+    dificultad = discriminacion = np.full(k, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if n:
+            dificultad = aciertos.mean(axis=0)
+            resto = total[:, None] - puntaje
+            a_c = aciertos - dificultad
+            r_c = resto - resto.mean(axis=0)
+            discriminacion = (a_c * r_c).sum(axis=0) / np.sqrt((a_c ** 2).sum(axis=0) * (r_c ** 2).sum(axis=0))
+
+        # Alfa de Cronbach
+        alfa = None
+        if k > 1 and n > 1:
+            var_total = total.var(ddof=1)
+            if var_total > 0:
+                alfa = k / (k - 1) * (1 - puntaje.var(axis=0, ddof=1).sum() / var_total)
+
+    # Distractores: veces que se eligió cada opción de cada pregunta
+    veces = np.bincount(
+        (np.arange(k)[None, :] * (m + 1) + elegida + 1).ravel(), minlength=k * (m + 1),
+    ).reshape(k, m + 1)
+
+    return {
+        'entregas':   int(n),
+        'puntos':     float(puntos.sum()),
+        'promedio':   _redondear(total.mean()) if n else None,
+        'desviacion': _redondear(total.std(ddof=1)) if n > 1 else None,
+        'alfa':       _redondear(alfa),
+        'preguntas': [
+            {
+                'id':             p['pk'],
+                'numero':         j + 1,
+                'texto':          p['texto'],
+                'puntos':         float(p['puntos']),
+                'respondieron':   int(respondida[:, j].sum()),
+                'sin_respuesta':  int(veces[j, 0]),
+                'dificultad':     _redondear(dificultad[j]),
+                'discriminacion': _redondear(discriminacion[j]),
+                'opciones': [
+                    {
+                        'id':         o['pk'],
+                        'texto':      o['texto'],
+                        'correcta':   o['es_correcta'],
+                        'veces':      int(veces[j, i + 1]),
+                        'proporcion': _redondear(veces[j, i + 1] / n) if n else None,
+                    }
+                    for i, o in enumerate(opciones_de[j])
+                ],
+            }
+            for j, p in enumerate(preguntas)
+        ],
+    }
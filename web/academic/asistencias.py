@@ -0,0 +1,261 @@
+# academic/asistencias.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Registro de asistencia en bloque
+#
+# Pasar lista guarda el estado de todo el grupo para una (asignatura, fecha).
+# En lugar de un update_or_create por alumno, se bloquea el grupo, se leen los
+# estados previos una vez y solo se escriben (en un upsert) las filas nuevas o
+# que cambiaron. Los cambios se reflejan en AsistenciaMensual en la misma
+# transacción.
+# ─────────────────────────────────────────────────────────────────────────────
+from functools import cached_property
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, F, Count, Q
+from django.db.models.functions import ExtractYear, ExtractMonth
+
+from .models import Asistencia, AsistenciaMensual, Grupo
+
+ESTADOS_VALIDOS = {clave for clave, _ in Asistencia.ESTADOS}
+
+
+def registrar_asistencia(grupo, asignatura, fecha, estados):
+    """
+    Guarda {alumno_id: estado} para (grupo, asignatura, fecha); `asignatura`
+    puede ser None (lista general del grupo). Los estados no válidos cuentan
+    como ausencia. Devuelve solo lo que cambió: {alumno_id: (previo, nuevo)},
+    con previo=None si el alumno no tenía registro.
+    """
+    estados = {
+        alumno_id: estado if estado in ESTADOS_VALIDOS else 'A'
+        for alumno_id, estado in estados.items()
+    }
+    registros = Asistencia.objects.filter(grupo=grupo, asignatura=asignatura, fecha=fecha)
+
+    with transaction.atomic():
+        # Se bloquea la fila del grupo antes de leer: dos listas simultáneas
+        # del mismo grupo se turnan y la segunda ve lo que escribió la primera,
+        # así el diff (y con él AsistenciaMensual) no se cuenta dos veces.
+        list(Grupo.objects.select_for_update().filter(pk=grupo.pk).values_list('pk'))
+        previos = dict(registros.filter(alumno_id__in=estados).values_list('alumno_id', 'estado'))
+        cambios = {
+            alumno_id: (previos.get(alumno_id), estado)
+            for alumno_id, estado in estados.items()
+            if previos.get(alumno_id) != estado
+        }
+        if not cambios:
+            return cambios
+
+        objs = [
+            Asistencia(alumno_id=alumno_id, grupo=grupo, asignatura=asignatura, fecha=fecha, estado=nuevo)
+            for alumno_id, (_, nuevo) in cambios.items()
+        ]
+        if asignatura is not None:
+            Asistencia.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['alumno', 'grupo', 'asignatura', 'fecha'],
+                update_fields=['estado'],
+            )
+        elif connection.vendor in ('postgresql', 'sqlite'):
+            _upsert_sin_asignatura(objs)
+        else:
+            # Sin ON CONFLICT sobre índices parciales: insertar las nuevas y
+            # actualizar las existentes (el bloqueo del grupo evita choques).
+            Asistencia.objects.bulk_create([o for o in objs if o.alumno_id not in previos])
+            existentes = [a for a in cambios if a in previos]
+            if existentes:
+                registros.filter(alumno_id__in=existentes).update(estado=Case(
+                    *[When(alumno_id=a, then=Value(cambios[a][1])) for a in existentes],
+                ))
+        aplicar_cambios_mensuales(grupo.pk, asignatura.pk if asignatura else None, fecha, cambios)
+
+    from inicio.kpis import invalidar_kpis
+    invalidar_kpis(['asistencia'], plantel_ids=[grupo.plantel_id], fecha=fecha)
+    return cambios
+
+
+def _upsert_sin_asignatura(objs):
+    """
+    Un solo INSERT … ON CONFLICT contra la restricción parcial
+    asistencia_unica_sin_asignatura; el ORM no sabe apuntar a un índice parcial.
+    """
+    meta = Asistencia._meta
+    columnas = [meta.get_field(f).column for f in ('alumno', 'grupo', 'asignatura', 'fecha', 'estado')]
+    alumno, grupo, asignatura, fecha, estado = (connection.ops.quote_name(c) for c in columnas)
+    fila = '(%s, %s, NULL, %s, %s)'
+    sql = (
+        f'INSERT INTO {connection.ops.quote_name(meta.db_table)} '
+        f'({alumno}, {grupo}, {asignatura}, {fecha}, {estado}) '
+        f'VALUES {", ".join([fila] * len(objs))} '
+        f'ON CONFLICT ({alumno}, {grupo}, {fecha}) WHERE {asignatura} IS NULL '
+        f'DO UPDATE SET {estado} = excluded.{estado}'
+    )
+    campo_fecha = meta.get_field('fecha')
+    params = []
+    for o in objs:
+        params += [o.alumno_id, o.grupo_id, campo_fecha.get_db_prep_value(o.fecha, connection), o.estado]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MATRIZ ALUMNO × SESIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Código de cada estado en la cuadrícula (0 = sin registro)
+LETRAS    = np.array(['—', 'A', 'P', 'R'])
+_ESTADOS  = LETRAS[1:]                   # ordenados, para searchsorted
+AUSENTE, PRESENTE, RETARDO = 1, 2, 3
+
+
+class MatrizAsistencia:
+    """
+    Asistencia de un grupo entre `desde` y `hasta` (inclusive) leída en una
+    consulta: (alumno, fecha, estado) pasan a arreglos y se colocan en una
+    cuadrícula alumnos × sesiones; los totales salen de un solo bincount.
+    Las sesiones son las fechas con algún registro del grupo. Con
+    `asignatura` solo cuenta esa lista; sin ella, todas las del grupo.
+
+    `filas` devuelve la estructura que consumen las vistas y los PDFs:
+        [{'alumno', 'celdas': ['P', 'A', '—', ...], 'presentes',
+          'retardos', 'ausentes', 'porcentaje'}]
+    """
+
+    def __init__(self, grupo, alumnos, desde, hasta, asignatura=None):
+        self.grupo   = grupo
+        self.alumnos = list(alumnos)
+        self.desde   = desde
+        self.hasta   = hasta
+        registros = Asistencia.objects.filter(grupo=grupo, fecha__range=(desde, hasta))
+        if asignatura is not None:
+            registros = registros.filter(asignatura=asignatura)
+        self._cargar(list(registros.order_by('pk').values_list('alumno_id', 'fecha', 'estado')))
+
+    def _cargar(self, registros):
+        n = len(self.alumnos)
+        alumno_ids = np.array([r[0] for r in registros], dtype=np.int64)
+        fechas     = np.array([r[1] for r in registros], dtype='datetime64[D]')
+        codigos    = np.searchsorted(_ESTADOS, np.array([r[2] for r in registros], dtype='U1')) + 1
+
+        self._fechas = np.unique(fechas)
+        columnas = np.searchsorted(self._fechas, fechas)
+
+        # Fila de cada registro; los de alumnos que no están en la lista se descartan
+        ids   = np.array([a.pk for a in self.alumnos], dtype=np.int64)
+        orden = np.argsort(ids, kind='stable')
+        pos   = np.searchsorted(ids[orden], alumno_ids).clip(max=max(n - 1, 0))
+        validos = ids[orden][pos] == alumno_ids if n else np.zeros(len(registros), dtype=bool)
+
+        self.cuadricula = np.zeros((n, len(self._fechas)), dtype=np.int8)
+        # Con registros repetidos gana el último (order_by pk)
+        self.cuadricula[orden[pos[validos]], columnas[validos]] = codigos[validos]
+
+        conteos = np.bincount(
+            (self.cuadricula.astype(np.int64) + 4 * np.arange(n)[:, None]).ravel(), minlength=4 * n,
+        ).reshape(n, 4)
+        self.presentes = conteos[:, PRESENTE]
+        self.retardos  = conteos[:, RETARDO]
+        self.ausentes  = conteos[:, AUSENTE]
+        self.registradas = self.presentes + self.retardos + self.ausentes
+
+    @cached_property
+    def fechas(self):
+        return self._fechas.astype(object).tolist()
+
+    def posiciones(self, codigo):
+        """(fila, columna) de cada celda con ese estado."""
+        return zip(*np.nonzero(self.cuadricula == codigo))
+
+    @cached_property
+    def filas(self):
+        celdas = LETRAS[self.cuadricula].tolist()
+        porcentajes = np.where(self.registradas > 0, self.presentes * 100 // np.maximum(self.registradas, 1), -1)
+        return [
+            {
+                'alumno':     alumno,
+                'celdas':     celdas[i],
+                'presentes':  int(self.presentes[i]),
+                'retardos':   int(self.retardos[i]),
+                'ausentes':   int(self.ausentes[i]),
+                'porcentaje': int(porcentajes[i]) if porcentajes[i] >= 0 else None,
+            }
+            for i, alumno in enumerate(self.alumnos)
+        ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MANTENIMIENTO DE AsistenciaMensual
+# ─────────────────────────────────────────────────────────────────────────────
+
+CAMPO_ESTADO = {'P': 'presentes', 'A': 'ausentes', 'R': 'retardos'}
+
+
+def aplicar_cambios_mensuales(grupo_id, asignatura_id, fecha, cambios):
+    """
+    Suma a AsistenciaMensual los cambios {alumno_id: (previo, nuevo)} de un
+    día con un solo UPDATE. Solo se crean filas para alumnos con un estado
+    nuevo: quitar un registro nunca inserta nada.
+    """
+    deltas = {}
+    for alumno_id, (previo, nuevo) in cambios.items():
+        delta = deltas.setdefault(alumno_id, dict.fromkeys(CAMPO_ESTADO.values(), 0))
+        if previo:
+            delta[CAMPO_ESTADO[previo]] -= 1
+        if nuevo:
+            delta[CAMPO_ESTADO[nuevo]] += 1
+
+    actualizaciones = {}
+    for campo in CAMPO_ESTADO.values():
+        whens = [When(alumno_id=a, then=Value(d[campo])) for a, d in deltas.items() if d[campo]]
+        if whens:
+            actualizaciones[campo] = F(campo) + Case(*whens, default=Value(0))
+    if not actualizaciones:
+        return
+
+    clave = {'grupo_id': grupo_id, 'asignatura_id': asignatura_id, 'anio': fecha.year, 'mes': fecha.month}
+    with transaction.atomic():
+        AsistenciaMensual.objects.bulk_create(
+            [AsistenciaMensual(alumno_id=a, **clave) for a, (_, nuevo) in cambios.items() if nuevo],
+            ignore_conflicts=True,
+        )
+        AsistenciaMensual.objects.filter(alumno_id__in=deltas, **clave).update(**actualizaciones)
+
+
+def calcular_mensuales(grupo_ids=None):
+    """
+    Calcula desde cero AsistenciaMensual (toda, o solo la de `grupo_ids`) con
+    una consulta agrupada. Devuelve {(alumno, grupo, asignatura, anio, mes):
+    AsistenciaMensual sin guardar}.
+    """
+    registros = Asistencia.objects.all()
+    if grupo_ids is not None:
+        registros = registros.filter(grupo_id__in=grupo_ids)
+
+    filas = {}
+    for r in (
+        registros
+        .values('alumno_id', 'grupo_id', 'asignatura_id', anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'))
+        .annotate(
+            presentes=Count('id', filter=Q(estado='P')),
+            ausentes =Count('id', filter=Q(estado='A')),
+            retardos =Count('id', filter=Q(estado='R')),
+        )
+        .order_by()
+    ):
+        clave = (r['alumno_id'], r['grupo_id'], r['asignatura_id'], r['anio'], r['mes'])
+        filas[clave] = AsistenciaMensual(**r)
+    return filas
+
+
+def reconstruir_mensuales(grupo_ids=None):
+    """Reemplaza AsistenciaMensual (o la de `grupo_ids`) en una transacción."""
+    filas = calcular_mensuales(grupo_ids)
+    with transaction.atomic():
+        actuales = AsistenciaMensual.objects.all()
+        if grupo_ids is not None:
+            actuales = actuales.filter(grupo_id__in=grupo_ids)
+        borradas, _ = actuales.delete()
+        AsistenciaMensual.objects.bulk_create(filas.values(), batch_size=1000)
+    return len(filas), borradas
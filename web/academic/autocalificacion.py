@@ -0,0 +1,144 @@
+# academic/autocalificacion.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Calificación automática de actividades de opción múltiple
+#
+# Las entregas de una Actividad MULTIPLE con calificacion_automatica se
+# califican todas en una pasada: la clave (puntos por pregunta y opciones
+# correctas) se lee una vez, las respuestas de todas las entregas en una sola
+# consulta, y solo las calificaciones que cambiaron se escriben con
+# bulk_update. Como bulk_update no dispara señales, aquí mismo se ajusta el
+# resumen (celda por celda si fueron unas entregas, el grupo entero si se
+# recalificó la actividad) y se avisa en el feed a los alumnos.
+#
+# Las señales (academic/signals.py) piden una pasada al guardar respuestas o
+# al cambiar la clave; `programar` junta todo lo de una transacción en una
+# sola pasada por actividad al confirmarla.
+# ─────────────────────────────────────────────────────────────────────────────
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+
+from .models import Actividad, EntregaActividad, OpcionRespuesta, PreguntaActividad, RespuestaAlumno
+from .eventos import publicar, eventos_calificacion
+
+CENTESIMOS = Decimal('0.01')
+
+
+def es_automatica(actividad):
+    return actividad.tipo == 'MULTIPLE' and actividad.calificacion_automatica
+
+
+def calcular_notas(actividad, entrega_ids=None):
+    """
+    {entrega_id: calificación} de las entregas con al menos una respuesta
+    (todas, o solo `entrega_ids`). Cada pregunta vale sus `puntos` si la opción
+    elegida es correcta; el total se escala a `valor_total`. Si un alumno
+    respondió dos veces la misma pregunta cuenta la última respuesta.
+    """
+    puntos = dict(PreguntaActividad.objects.filter(actividad=actividad).values_list('pk', 'puntos'))
+    total = sum(puntos.values(), Decimal(0))
+    correctas = set(
+        OpcionRespuesta.objects
+        .filter(pregunta__actividad=actividad, es_correcta=True)
+        .values_list('pk', flat=True)
+    )
+
+    respuestas = RespuestaAlumno.objects.filter(entrega__actividad=actividad)
+    if entrega_ids is not None:
+        respuestas = respuestas.filter(entrega_id__in=entrega_ids)
+    elegidas = {}
+    for entrega_id, pregunta_id, opcion_id in respuestas.order_by('pk').values_list('entrega_id', 'pregunta_id', 'opcion_id'):
+        elegidas.setdefault(entrega_id, {})[pregunta_id] = opcion_id
+
+    notas = {}
+    for entrega_id, por_pregunta in elegidas.items():
+        obtenidos = sum(
+            (puntos.get(pregunta_id, 0) for pregunta_id, opcion_id in por_pregunta.items() if opcion_id in correctas),
+            Decimal(0),
+        )
+        nota = obtenidos / total * actividad.valor_total if total else Decimal(0)
+        notas[entrega_id] = nota.quantize(CENTESIMOS, rounding=ROUND_HALF_UP)
+    return notas
+
+
+def calificar_actividad(actividad, entrega_ids=None):
+    """
+    Califica las entregas de `actividad` (todas, o solo `entrega_ids`) y guarda
+    las que cambiaron. Las entregas sin respuestas no se tocan. Devuelve
+    cuántas calificaciones cambiaron.
+    """
+    if not es_automatica(actividad):
+        return 0
+    with transaction.atomic():
+        notas = calcular_notas(actividad, entrega_ids)
+        entregas = list(
+            EntregaActividad.objects.select_for_update()
+            .filter(pk__in=notas).select_related('alumno')
+        )
+        cambiaron = [e for e in entregas if e.calificacion != notas[e.pk]]
+        if not cambiaron:
+            return 0
+        previas = {e.pk: e.calificacion for e in cambiaron}
+        for e in cambiaron:
+            e.calificacion = notas[e.pk]
+            e.actividad = actividad
+        EntregaActividad.objects.bulk_update(cambiaron, ['calificacion'], batch_size=500)
+
+        # Unas cuantas entregas (un alumno que envía): se ajusta su celda del
+        # resumen. Recalificar toda la actividad: se reconstruye el grupo.
+        from .calificaciones import aplicar_delta, reconstruir_resumenes
+        if entrega_ids is None:
+            reconstruir_resumenes([actividad.grupo_id])
+        else:
+            for e in cambiaron:
+                aplicar_delta(e.alumno_id, actividad.asignatura_id, actividad.grupo_id, 'actividades',
+                              previa=previas[e.pk], nueva=e.calificacion)
+        publicar([evento for e in cambiaron for evento in eventos_calificacion(e)])
+    return len(cambiaron)
+
+
+# ── Calificación al confirmar la transacción ─────────────────────────────────
+# Lo pendiente vive en el propio callback de on_commit (_Lote): si la
+# transacción se deshace Django descarta el callback y con él lo pendiente.
+
+class _Lote:
+    def __init__(self):
+        self.pendientes = {}   # actividad_id → set de entrega_ids, o None = todas
+
+    def agregar(self, actividad_id, entrega_id):
+        if actividad_id in self.pendientes:
+            anteriores = self.pendientes[actividad_id]
+            if anteriores is not None:
+                if entrega_id is None:
+                    self.pendientes[actividad_id] = None
+                else:
+                    anteriores.add(entrega_id)
+        else:
+            self.pendientes[actividad_id] = None if entrega_id is None else {entrega_id}
+
+    def __call__(self):
+        for actividad_id, entrega_ids in self.pendientes.items():
+            _ejecutar(actividad_id, entrega_ids)
+
+
+def programar(actividad_id, entrega_id=None):
+    """
+    Pide calificar la actividad (o solo una entrega) al confirmar la
+    transacción en curso, o enseguida si no hay una. Lo pedido dentro de una
+    misma transacción se junta en una sola pasada por actividad.
+    """
+    conexion = transaction.get_connection()
+    if not conexion.in_atomic_block:
+        _ejecutar(actividad_id, None if entrega_id is None else {entrega_id})
+        return
+    lote = next((f for _, f, _ in conexion.run_on_commit if isinstance(f, _Lote)), None)
+    if lote is None:
+        lote = _Lote()
+        transaction.on_commit(lote)
+    lote.agregar(actividad_id, entrega_id)
+
+
+def _ejecutar(actividad_id, entrega_ids):
+    actividad = Actividad.objects.filter(pk=actividad_id).first()
+    if actividad is not None:
+        calificar_actividad(actividad, entrega_ids)
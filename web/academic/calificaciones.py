@@ -0,0 +1,396 @@
+# academic/calificaciones.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Matriz de calificaciones por grupo (alumnos × asignaturas)
+#
+# Boletas, concentrados y sus PDFs necesitan, por cada alumno y asignatura,
+# el promedio de tareas, el de actividades y la calificación manual. Esos
+# valores viven ya agregados en ResumenCalificacion (mantenida por señales,
+# ver academic/signals.py), así que una matriz completa es una sola consulta.
+# ─────────────────────────────────────────────────────────────────────────────
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import cached_property
+
+from django.db import transaction
+from django.db.models import Count, Sum, F
+from django.db.models.functions import Coalesce
+
+from .models import Calificacion, EntregaTarea, EntregaActividad, ResumenCalificacion
+from .eventos import publicar, eventos_notas
+
+
+def _redondear(valor):
+    return round(float(valor), 2) if valor else None
+
+
+def _promedio(valores):
+    """Promedio de los valores no nulos, o None si no hay ninguno."""
+    valores = [float(v) for v in valores if v is not None]
+    return round(sum(valores) / len(valores), 2) if valores else None
+
+
+class MatrizCalificaciones:
+    """
+    Calificaciones de un grupo leídas de ResumenCalificacion en una consulta.
+
+    `filas` devuelve la estructura que consumen las vistas y los PDFs:
+        [{'alumno', 'cols': [{'asignatura', 'prom_tareas', 'prom_activ',
+                              'manual', 'final'}, ...], 'promedio_general'}]
+    """
+
+    def __init__(self, grupo, asignaturas, alumnos):
+        self.grupo       = grupo
+        self.asignaturas = list(asignaturas)
+        self.alumnos     = list(alumnos)
+        self._resumenes  = {}
+        if self.asignaturas and self.alumnos:
+            self._cargar()
+
+    def _cargar(self):
+        resumenes = ResumenCalificacion.objects.filter(
+            grupo=self.grupo,
+            asignatura_id__in=[a.pk for a in self.asignaturas],
+        )
+        self._resumenes = {(r.alumno_id, r.asignatura_id): r for r in resumenes}
+
+    def celda(self, alumno_id, asignatura_id):
+        r = self._resumenes.get((alumno_id, asignatura_id))
+        if r is None:
+            return {'prom_tareas': None, 'prom_activ': None, 'manual': None, 'final': None}
+        return {
+            'prom_tareas': _redondear(r.prom_tareas),
+            'prom_activ':  _redondear(r.prom_actividades),
+            'manual':      float(r.manual) if r.manual is not None else None,
+            'final':       float(r.promedio_final) if r.promedio_final is not None else None,
+        }
+
+    @cached_property
+    def filas(self):
+        filas = []
+        for alumno in self.alumnos:
+            cols = [
+                {'asignatura': asig, **self.celda(alumno.pk, asig.pk)}
+                for asig in self.asignaturas
+            ]
+            filas.append({
+                'alumno':           alumno,
+                'cols':             cols,
+                'promedio_general': _promedio([c['final'] for c in cols]),
+            })
+        return filas
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MANTENIMIENTO DE ResumenCalificacion
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _grupo_calificacion():
+    """Las notas manuales antiguas no tienen grupo: se usa el del alumno."""
+    return Coalesce('grupo_id', 'alumno__alumno_grupo_id')
+
+
+def manual_vigente(alumno_id, asignatura_id, grupo_id):
+    """Nota MANUAL más reciente de la celda, o None."""
+    return (
+        Calificacion.objects
+        .annotate(grupo_efectivo=_grupo_calificacion())
+        .filter(
+            alumno_id=alumno_id, asignatura_id=asignatura_id,
+            grupo_efectivo=grupo_id, tipo='MANUAL',
+        )
+        .order_by('-fecha', '-pk')
+        .values_list('nota', flat=True)
+        .first()
+    )
+
+
+def aplicar_delta(alumno_id, asignatura_id, grupo_id, campo, previa=None, nueva=None):
+    """
+    Ajusta la suma/conteo de `campo` ('tareas' o 'actividades') de una celda
+    cuando una entrega pasa de la calificación `previa` a `nueva` (None = sin
+    calificar). La fila se bloquea para que dos capturas simultáneas no se pisen.
+    """
+    if previa == nueva:
+        return
+    with transaction.atomic():
+        resumen = _bloquear(alumno_id, asignatura_id, grupo_id, crear=nueva is not None)
+        if resumen is None:
+            return
+        suma, num = f'suma_{campo}', f'num_{campo}'
+        if previa is not None:
+            setattr(resumen, suma, getattr(resumen, suma) - Decimal(str(previa)))
+            setattr(resumen, num, max(getattr(resumen, num) - 1, 0))
+        if nueva is not None:
+            setattr(resumen, suma, getattr(resumen, suma) + Decimal(str(nueva)))
+            setattr(resumen, num, getattr(resumen, num) + 1)
+        resumen.recalcular_final()
+        resumen.save()
+
+
+def actualizar_manual(alumno_id, asignatura_id, grupo_id):
+    """Sincroniza la nota manual de una celda con la Calificacion vigente."""
+    with transaction.atomic():
+        manual  = manual_vigente(alumno_id, asignatura_id, grupo_id)
+        resumen = _bloquear(alumno_id, asignatura_id, grupo_id, crear=manual is not None)
+        if resumen is None or resumen.manual == manual:
+            return
+        resumen.manual = manual
+        resumen.recalcular_final()
+        resumen.save()
+
+
+def _bloquear(alumno_id, asignatura_id, grupo_id, crear):
+    clave = {'alumno_id': alumno_id, 'asignatura_id': asignatura_id, 'grupo_id': grupo_id}
+    if crear:
+        ResumenCalificacion.objects.get_or_create(**clave)
+    return ResumenCalificacion.objects.select_for_update().filter(**clave).first()
+
+
+def calcular_resumenes(grupo_ids=None):
+    """
+    Calcula desde cero las celdas de ResumenCalificacion (todas, o solo las de
+    `grupo_ids`) con tres consultas agrupadas. Devuelve
+    {(alumno_id, asignatura_id, grupo_id): ResumenCalificacion sin guardar}.
+    """
+    celdas = {}
+
+    def celda(clave):
+        if clave not in celdas:
+            celdas[clave] = ResumenCalificacion(
+                alumno_id=clave[0], asignatura_id=clave[1], grupo_id=clave[2],
+            )
+        return celdas[clave]
+
+    tareas = EntregaTarea.objects.filter(calificacion__isnull=False)
+    actividades = EntregaActividad.objects.filter(calificacion__isnull=False)
+    manuales = (
+        Calificacion.objects
+        .filter(tipo='MANUAL')
+        .annotate(grupo_efectivo=_grupo_calificacion())
+        .exclude(grupo_efectivo=None)
+    )
+    if grupo_ids is not None:
+        tareas      = tareas.filter(tarea__grupo_id__in=grupo_ids)
+        actividades = actividades.filter(actividad__grupo_id__in=grupo_ids)
+        manuales    = manuales.filter(grupo_efectivo__in=grupo_ids)
+
+    for r in (
+        tareas
+        .values('alumno_id', asig=F('tarea__asignatura_id'), grp=F('tarea__grupo_id'))
+        .annotate(suma=Sum('calificacion'), num=Count('id'))
+        .order_by()
+    ):
+        c = celda((r['alumno_id'], r['asig'], r['grp']))
+        c.suma_tareas, c.num_tareas = r['suma'], r['num']
+
+    for r in (
+        actividades
+        .values('alumno_id', asig=F('actividad__asignatura_id'), grp=F('actividad__grupo_id'))
+        .annotate(suma=Sum('calificacion'), num=Count('id'))
+        .order_by()
+    ):
+        c = celda((r['alumno_id'], r['asig'], r['grp']))
+        c.suma_actividades, c.num_actividades = r['suma'], r['num']
+
+    # Orden ascendente: la nota manual más reciente sobrescribe a las anteriores.
+    for alumno_id, asig_id, grupo_id, nota in (
+        manuales
+        .order_by('fecha', 'pk')
+        .values_list('alumno_id', 'asignatura_id', 'grupo_efectivo', 'nota')
+    ):
+        celda((alumno_id, asig_id, grupo_id)).manual = nota
+
+    for c in celdas.values():
+        c.recalcular_final()
+    return celdas
+
+
+CAMPOS_RESUMEN = [
+    'suma_tareas', 'num_tareas', 'suma_actividades', 'num_actividades',
+    'manual', 'promedio_final', 'actualizado_en',
+]
+
+
+def reconstruir_resumenes(grupo_ids=None):
+    """
+    Recalcula y guarda ResumenCalificacion en una transacción (upsert en bloque
+    y borrado de celdas que ya no tienen datos). Devuelve (guardadas, borradas).
+    """
+    celdas = calcular_resumenes(grupo_ids)
+    with transaction.atomic():
+        obsoletas = ResumenCalificacion.objects.all()
+        if grupo_ids is not None:
+            obsoletas = obsoletas.filter(grupo_id__in=grupo_ids)
+        vigentes = set(celdas)
+        borrar = [
+            pk for pk, *clave in obsoletas.values_list('pk', 'alumno_id', 'asignatura_id', 'grupo_id')
+            if tuple(clave) not in vigentes
+        ]
+        ResumenCalificacion.objects.filter(pk__in=borrar).delete()
+        ResumenCalificacion.objects.bulk_create(
+            celdas.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['alumno', 'asignatura', 'grupo'],
+            update_fields=CAMPOS_RESUMEN,
+        )
+
+    from inicio.kpis import invalidar_kpis
+    from campuses.models import Plantel
+    if grupo_ids is None:
+        invalidar_kpis(['calificaciones'], plantel_ids=Plantel.objects.values_list('pk', flat=True))
+    else:
+        invalidar_kpis(['calificaciones'], grupo_ids=grupo_ids)
+    return len(celdas), len(borrar)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CAPTURA EN BLOQUE DE CALIFICACIONES MANUALES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def validar_notas(valores, alumnos_ids, asignaturas_ids):
+    """
+    Valida en memoria una captura {(alumno_id, asignatura_id): texto}.
+    Las celdas vacías se ignoran. Devuelve (notas, errores), ambos por celda.
+    """
+    notas, errores = {}, {}
+    for clave, texto in valores.items():
+        texto = (texto or '').strip().replace(',', '.')
+        if texto == '':
+            continue
+        alumno_id, asig_id = clave
+        if alumno_id not in alumnos_ids or asig_id not in asignaturas_ids:
+            errores[clave] = 'La celda no pertenece a este grupo.'
+            continue
+        nota, error = leer_nota(texto)
+        if error:
+            errores[clave] = error
+            continue
+        notas[clave] = nota
+    return notas, errores
+
+
+def leer_nota(texto, maximo=Decimal(10)):
+    """(nota, None) con la nota redondeada a centésimos, o (None, error)."""
+    texto = str(texto if texto is not None else '').strip().replace(',', '.')
+    try:
+        nota = Decimal(texto)
+    except InvalidOperation:
+        return None, 'No es un número.'
+    if not nota.is_finite() or not 0 <= nota <= maximo:
+        return None, f'Debe estar entre 0 y {maximo.normalize():f}.'
+    return nota.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP), None
+
+
+def guardar_notas(grupo, notas, docente=None):
+    """
+    Guarda {(alumno_id, asignatura_id): nota} como calificaciones MANUAL del
+    grupo con un solo upsert, refresca el resumen del grupo y avisa en el feed
+    a los alumnos con notas nuevas (bulk_create no dispara señales).
+    Devuelve cuántas celdas se guardaron.
+    """
+    if not notas:
+        return 0
+    previas = {
+        (alumno_id, asig_id): nota
+        for alumno_id, asig_id, nota in Calificacion.objects.filter(
+            grupo=grupo, tipo='MANUAL',
+            alumno_id__in={a for a, _ in notas}, asignatura_id__in={s for _, s in notas},
+        ).values_list('alumno_id', 'asignatura_id', 'nota')
+    }
+    cambiaron = sorted({clave[0] for clave, nota in notas.items() if previas.get(clave) != nota})
+    objs = [
+        Calificacion(
+            alumno_id=alumno_id, asignatura_id=asig_id, grupo=grupo,
+            docente=docente, nota=nota, tipo='MANUAL',
+        )
+        for (alumno_id, asig_id), nota in notas.items()
+    ]
+    with transaction.atomic():
+        Calificacion.objects.bulk_create(
+            objs,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['alumno', 'asignatura', 'grupo', 'tipo'],
+            update_fields=['nota', 'docente'] if docente else ['nota'],
+        )
+        reconstruir_resumenes([grupo.pk])
+        publicar(eventos_notas(grupo, cambiaron, docente))
+    return len(objs)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CALIFICACIÓN EN BLOQUE DE ENTREGAS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def calificar_entregas(docente, modelo, filas):
+    """
+    Califica de una vez entregas de tareas (modelo EntregaTarea) o de
+    actividades (EntregaActividad) del `docente`. `filas` es una lista de
+    {'id', 'calificacion', 'feedback'}; si no viene 'feedback' se conserva el
+    que había. La pertenencia se valida en una sola consulta, se guarda con
+    bulk_update y, como no hay señales, aquí se refresca el resumen de los
+    grupos y se avisa en el feed.
+
+    Devuelve (guardadas, errores {id: mensaje}, contadores por tarea/actividad
+    {id: {'total_entregas', 'entregas_calificadas', 'pendientes'}}).
+    """
+    from django.db.models import Q
+    from django.utils import timezone
+    from .eventos import eventos_calificacion
+
+    es_tarea = modelo is EntregaTarea
+    padre    = 'tarea' if es_tarea else 'actividad'
+
+    errores, pedidas = {}, {}
+    for fila in filas:
+        try:
+            pk = int(fila.get('id'))
+        except (TypeError, ValueError):
+            continue
+        pedidas[pk] = fila
+
+    entregas = {
+        e.pk: e for e in
+        modelo.objects.filter(pk__in=pedidas, **{f'{padre}__docente': docente})
+        .select_related(padre)
+    }
+    ahora, guardar, calificadas = timezone.now(), [], []
+    for pk, fila in pedidas.items():
+        entrega = entregas.get(pk)
+        if entrega is None:
+            errores[pk] = 'Entrega no encontrada.'
+            continue
+        maximo = Decimal(10) if es_tarea else entrega.actividad.valor_total
+        nota, error = leer_nota(fila.get('calificacion'), maximo)
+        if error:
+            errores[pk] = error
+            continue
+        if nota != entrega.calificacion:
+            calificadas.append(entrega)
+        entrega.calificacion = nota
+        if 'feedback' in fila:
+            entrega.feedback = str(fila['feedback'] or '').strip()
+        if es_tarea:
+            entrega.estado        = 'CALIFICADA'
+            entrega.calificada_en = ahora
+        guardar.append(entrega)
+
+    campos = ['calificacion', 'feedback'] + (['estado', 'calificada_en'] if es_tarea else [])
+    padres = {getattr(e, f'{padre}_id') for e in guardar}
+    with transaction.atomic():
+        modelo.objects.bulk_update(guardar, campos, batch_size=500)
+        if calificadas:
+            reconstruir_resumenes(sorted({getattr(e, padre).grupo_id for e in calificadas}))
+            publicar([evento for e in calificadas for evento in eventos_calificacion(e)])
+
+    hecha = Q(estado='CALIFICADA') if es_tarea else Q(calificacion__isnull=False)
+    contadores = {
+        fila[f'{padre}_id']: {
+            'total_entregas':       fila['total'],
+            'entregas_calificadas': fila['calificadas'],
+            'pendientes':           fila['total'] - fila['calificadas'],
+        }
+        for fila in modelo.objects.filter(**{f'{padre}_id__in': padres})
+        .values(f'{padre}_id').annotate(total=Count('pk'), calificadas=Count('pk', filter=hecha))
+    }
+    return len(guardar), errores, contadores
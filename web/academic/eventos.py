@@ -0,0 +1,177 @@
+# academic/eventos.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Feed de actividad (EventoActividad)
+#
+# Cada entrega, comentario o calificación escribe al momento una fila por
+# destinatario con el texto ya resuelto (ver academic/signals.py y
+# guardar_notas). Leer las notificaciones es una sola consulta por índice
+# (destinatario, -creado_en, -id), paginada por cursor: ?antes=<cursor>.
+# ─────────────────────────────────────────────────────────────────────────────
+import datetime
+
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import EventoActividad, ComentarioTarea, ComentarioMaterial, EntregaTarea
+
+FEED_LIMITE = 10
+FEED_LIMITE_MAX = 50
+
+# tipo → (icono, color, fondo) para la plantilla y el JSON
+ESTILOS = {
+    'ENTREGA_TAREA':       ('📥', '#059669', '#d1fae5'),
+    'ENTREGA_ACTIVIDAD':   ('📝', '#2563eb', '#dbeafe'),
+    'COMENTARIO_TAREA':    ('💬', '#7c3aed', '#ede9fe'),
+    'COMENTARIO_MATERIAL': ('💬', '#db2777', '#fce7f3'),
+    'CALIFICACION':        ('⭐', '#d97706', '#fef3c7'),
+}
+
+_EPOCA = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _nombre(usuario):
+    return usuario.get_full_name() or usuario.username
+
+
+# ── Escritura (fan-out) ──────────────────────────────────────────────────────
+
+def publicar(eventos):
+    """Guarda en bloque los EventoActividad, sin los que el actor se manda a sí mismo."""
+    eventos = [e for e in eventos if e.destinatario_id and e.destinatario_id != e.actor_id]
+    return EventoActividad.objects.bulk_create(eventos) if eventos else []
+
+
+def eventos_entrega(entrega):
+    """Aviso al docente de una EntregaTarea o EntregaActividad nueva."""
+    if isinstance(entrega, EntregaTarea):
+        padre, tipo, que = entrega.tarea, 'ENTREGA_TAREA', 'una tarea'
+        url = reverse('detalle_tarea', args=[padre.pk])
+    else:
+        padre, tipo, que = entrega.actividad, 'ENTREGA_ACTIVIDAD', 'una actividad'
+        url = reverse('detalle_actividad', args=[padre.pk])
+    return [EventoActividad(
+        destinatario_id=padre.docente_id, actor_id=entrega.alumno_id, tipo=tipo,
+        titulo=f'{_nombre(entrega.alumno)} entregó {que}', sub=padre.titulo[:200],
+        url=url, creado_en=entrega.entregada_en,
+    )]
+
+
+def eventos_calificacion(entrega):
+    """Aviso al alumno de que su entrega fue calificada."""
+    padre = entrega.tarea if isinstance(entrega, EntregaTarea) else entrega.actividad
+    return [EventoActividad(
+        destinatario_id=entrega.alumno_id, actor_id=padre.docente_id, tipo='CALIFICACION',
+        titulo=f'Tu entrega fue calificada: {entrega.calificacion}', sub=padre.titulo[:200],
+    )]
+
+
+def _participantes(docente_id, comentarios, extra=()):
+    """Autores de `comentarios` más `extra`, sin el docente."""
+    ids = set(comentarios.values_list('autor_id', flat=True)) | set(extra)
+    ids.discard(docente_id)
+    return ids
+
+
+def eventos_comentario_tarea(comentario):
+    """
+    Comentario de un alumno → al docente de la tarea. Comentario del docente →
+    a los alumnos que ya participan (comentaron o entregaron).
+    """
+    tarea = comentario.tarea
+    if comentario.autor_id != tarea.docente_id:
+        destinatarios = [tarea.docente_id]
+    else:
+        destinatarios = _participantes(
+            tarea.docente_id,
+            ComentarioTarea.objects.filter(tarea=tarea),
+            tarea.entregas.values_list('alumno_id', flat=True),
+        )
+    return [
+        EventoActividad(
+            destinatario_id=d, actor_id=comentario.autor_id, tipo='COMENTARIO_TAREA',
+            titulo=f'{_nombre(comentario.autor)} comentó', sub=tarea.titulo[:200],
+            url=reverse('detalle_tarea', args=[tarea.pk]) if d == tarea.docente_id else '',
+            creado_en=comentario.creado_en,
+        )
+        for d in destinatarios
+    ]
+
+
+def eventos_comentario_material(comentario):
+    """Igual que eventos_comentario_tarea, para ComentarioMaterial."""
+    material = comentario.material
+    if comentario.autor_id != material.docente_id:
+        destinatarios = [material.docente_id]
+    else:
+        destinatarios = _participantes(
+            material.docente_id, ComentarioMaterial.objects.filter(material=material),
+        )
+    return [
+        EventoActividad(
+            destinatario_id=d, actor_id=comentario.autor_id, tipo='COMENTARIO_MATERIAL',
+            titulo=f'{_nombre(comentario.autor)} comentó un material', sub=material.titulo[:200],
+            url=reverse('detalle_material', args=[material.pk]) if d == material.docente_id else '',
+            creado_en=comentario.creado_en,
+        )
+        for d in destinatarios
+    ]
+
+
+def eventos_notas(grupo, alumno_ids, docente=None):
+    """Un aviso por alumno cuyas calificaciones manuales cambiaron (guardar_notas)."""
+    return [
+        EventoActividad(
+            destinatario_id=alumno_id, actor_id=docente.pk if docente else None,
+            tipo='CALIFICACION', titulo='Se actualizaron tus calificaciones', sub=str(grupo)[:200],
+        )
+        for alumno_id in alumno_ids
+    ]
+
+
+# ── Lectura ──────────────────────────────────────────────────────────────────
+
+def _cursor(evento):
+    return f'{(evento.creado_en - _EPOCA) // datetime.timedelta(microseconds=1)}-{evento.pk}'
+
+
+def _leer_cursor(cursor):
+    """'<microsegundos>-<id>' → (datetime, id). ValueError si no es válido."""
+    micros, _, pk = cursor.partition('-')
+    return _EPOCA + datetime.timedelta(microseconds=int(micros)), int(pk)
+
+
+def notificacion(evento):
+    icono, color, bg = ESTILOS.get(evento.tipo, ('🔔', '#6b7280', '#f3f4f6'))
+    return {
+        'id': evento.pk, 'tipo': evento.tipo, 'icono': icono, 'color': color, 'bg': bg,
+        'titulo': evento.titulo, 'sub': evento.sub, 'url': evento.url,
+        'fecha': evento.creado_en, 'leido': evento.leido,
+    }
+
+
+def feed(usuario, antes=None, limite=FEED_LIMITE):
+    """
+    Notificaciones de `usuario`, de la más reciente a la más antigua,
+    a partir del cursor `antes`.
+    Devuelve (notificaciones, siguiente_cursor o None).
+    """
+    limite = max(1, min(limite, FEED_LIMITE_MAX))
+    qs = EventoActividad.objects.filter(destinatario=usuario).order_by('-creado_en', '-id')
+    if antes:
+        creado_en, pk = _leer_cursor(antes)
+        qs = qs.filter(Q(creado_en__lt=creado_en) | Q(creado_en=creado_en, pk__lt=pk))
+    eventos = list(qs[:limite + 1])
+    siguiente = _cursor(eventos[limite - 1]) if len(eventos) > limite else None
+    return [notificacion(e) for e in eventos[:limite]], siguiente
+
+
+def no_leidos(usuario):
+    return EventoActividad.objects.filter(destinatario=usuario, leido=False).count()
+
+
+def marcar_leidos(usuario, hasta=None):
+    """Marca como leídas las notificaciones de `usuario` (hasta el id `hasta`, si se da)."""
+    qs = EventoActividad.objects.filter(destinatario=usuario, leido=False)
+    if hasta:
+        qs = qs.filter(pk__lte=hasta)
+    return qs.update(leido=True)
@@ -116,7 +116,7 @@ class AsignaturaForm(forms.ModelForm):
  
     class Meta:
         model = Asignatura
-        fields = ['nombre', 'clave', 'creditos', 'docentes']
+        fields = ['nombre', 'clave', 'creditos', 'horas_semana', 'docentes']
         widgets = {
             'nombre': forms.TextInput(attrs={
                 'class': (
@@ -138,12 +138,23 @@ class AsignaturaForm(forms.ModelForm):
                     'px-4 py-3 outline-none focus:ring-2 focus:ring-blue-500'
                 ),
             }),
+            'horas_semana': forms.NumberInput(attrs={
+                'class': (
+                    'w-full bg-white border border-slate-200 rounded-xl '
+                    'px-4 py-3 outline-none focus:ring-2 focus:ring-blue-500'
+                ),
+                'min': 0, 'max': 40,
+            }),
         }
  
     def __init__(self, *args, **kwargs):
         plantel = kwargs.pop('plantel', None)
         super().__init__(*args, **kwargs)
  
+        # Opcional: 0 deja que el generador de horarios use su valor por defecto
+        self.fields['horas_semana'].required = False
+        self.fields['horas_semana'].help_text = 'Déjalo en 0 para usar el valor por defecto.'
+
         if plantel:
             self.fields['docentes'].queryset = User.objects.filter(
                 plantel=plantel, rol='DOCENTE'
@@ -152,6 +163,9 @@ class AsignaturaForm(forms.ModelForm):
             if hasattr(plantel, 'nivel_educativo') and plantel.nivel_educativo != 'SUPERIOR':
                 self.fields['creditos'].widget = forms.HiddenInput()
                 self.fields['creditos'].required = False
+
+    def clean_horas_semana(self):
+        return self.cleaned_data.get('horas_semana') or 0
  
 
 class AlumnoForm(forms.ModelForm):
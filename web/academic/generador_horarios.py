@@ -0,0 +1,354 @@
+# academic/generador_horarios.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Generador automático de horarios de un plantel
+#
+# Cada hora semanal de una materia (grupo, asignatura y su docente en
+# DocenteGrupo) es una "unidad" que ocupa un bloque de plantel.duracion_bloque.
+# Primero se colocan las más restringidas (docentes con más carga); las que no
+# caben se resuelven con búsqueda local: la unidad entra en el bloque con menos
+# choques, las unidades que estorban salen y vuelven a la cola, y una lista
+# tabú evita deshacer el último movimiento. Las clases que ya existen (y las de
+# los mismos docentes en otros planteles) son fijas. Al final las horas
+# seguidas de una misma materia se unen en una sola HorarioClase y todo se
+# inserta en una transacción.
+# ─────────────────────────────────────────────────────────────────────────────
+import random
+import time
+from collections import Counter, deque
+
+from django.db import transaction
+from django.db.models import Q
+
+from campuses.models import Plantel
+from users.models import DocenteGrupo, User
+from .models import Grupo, Asignatura, HorarioClase
+from .horarios import AULA_SIN_DEFINIR, invalidar_horarios
+
+HORAS_POR_DEFECTO = 4
+SEGUNDOS_POR_DEFECTO = 20
+FIJA = -1   # ocupación por una clase existente: no se puede desalojar
+
+
+class HorarioDesactualizado(Exception):
+    """El horario del plantel cambió mientras se generaba la propuesta."""
+
+
+def _minutos(hora):
+    return hora.hour * 60 + hora.minute
+
+
+def _hora(minutos):
+    return HorarioClase._meta.get_field('hora_inicio').to_python(f'{minutos // 60:02d}:{minutos % 60:02d}')
+
+
+class GeneradorHorarios:
+    """
+    Propuesta de horario para las materias del plantel que aún no tienen
+    todas sus horas semanales. `reemplazar=True` ignora (y al guardar
+    desactiva) las clases actuales del plantel y genera todo desde cero.
+    """
+
+    def __init__(self, plantel, *, reemplazar=False, horas_por_defecto=HORAS_POR_DEFECTO,
+                 segundos=SEGUNDOS_POR_DEFECTO, semilla=None):
+        self.plantel    = plantel
+        self.reemplazar = reemplazar
+        self.horas_por_defecto = horas_por_defecto
+        self.segundos   = segundos
+        self.azar       = random.Random(semilla)
+        self.version    = plantel.version_horario
+
+        self.dias = [c for c, _ in HorarioClase.DIAS_SEMANA if c != 'SA' or plantel.incluye_sabado]
+        duracion  = plantel.duracion_bloque or 60
+        entrada, salida = _minutos(plantel.hora_entrada), _minutos(plantel.hora_salida)
+        self.horas = [(m, m + duracion) for m in range(entrada, salida - duracion + 1, duracion)]
+        self.total_bloques = len(self.dias) * len(self.horas)
+        self.capacidad = plantel.total_aulas
+
+        self.unidades   = []      # [(grupo_id, asignatura_id, maestro_id)]
+        self.bloque     = []      # bloque asignado a cada unidad (o None)
+        self.grupo_en   = {}      # (grupo_id, bloque)   → unidad | FIJA
+        self.maestro_en = {}      # (maestro_id, bloque) → unidad | FIJA
+        self.en_bloque  = [set() for _ in range(self.total_bloques)]   # unidades movibles
+        self.aulas_usadas = [0] * self.total_bloques
+        self.nombres_aula = [set() for _ in range(self.total_bloques)]
+        self.por_dia    = Counter()   # (grupo_id, asignatura_id, día) → horas
+        self.aula_grupo = {}
+        self.iteraciones = 0
+        self._cargar()
+
+    # ── Datos ────────────────────────────────────────────────────────────────
+
+    def _bloques_de(self, dia, inicio, fin):
+        """Bloques de la rejilla que toca una clase (dia, hora_inicio, hora_fin)."""
+        if dia not in self.dias:
+            return []
+        d = self.dias.index(dia)
+        ini, fin = _minutos(inicio), _minutos(fin)
+        return [d * len(self.horas) + h for h, (a, b) in enumerate(self.horas) if a < fin and b > ini]
+
+    def _cargar(self):
+        plantel_id = self.plantel.pk
+        self.aula_grupo = dict(
+            Grupo.objects.filter(plantel_id=plantel_id).values_list('pk', 'aula')
+        )
+
+        # Una materia por (grupo, asignatura): la asignación más reciente decide el docente
+        materias = {}
+        for grupo_id, asignatura_id, maestro_id, horas in (
+            DocenteGrupo.objects
+            .filter(grupo__plantel_id=plantel_id, activo=True, asignatura__isnull=False)
+            .order_by('-fecha_asignacion', '-pk')
+            .values_list('grupo_id', 'asignatura_id', 'docente_id', 'asignatura__horas_semana')
+        ):
+            materias.setdefault((grupo_id, asignatura_id), (maestro_id, horas or self.horas_por_defecto))
+        maestros = {m for m, _ in materias.values()}
+
+        fijas = HorarioClase.objects.filter(activo=True).filter(
+            Q(grupo__plantel_id=plantel_id) | Q(maestro_id__in=maestros)
+        )
+        if self.reemplazar:
+            fijas = fijas.exclude(grupo__plantel_id=plantel_id)
+
+        hechas = Counter()
+        for grupo_id, asignatura_id, maestro_id, dia, inicio, fin, aula, plantel_clase in fijas.values_list(
+            'grupo_id', 'asignatura_id', 'maestro_id', 'dia', 'hora_inicio', 'hora_fin', 'aula', 'grupo__plantel_id',
+        ):
+            bloques = self._bloques_de(dia, inicio, fin)
+            for b in bloques:
+                self.maestro_en[(maestro_id, b)] = FIJA
+                if plantel_clase == plantel_id:
+                    self.grupo_en[(grupo_id, b)] = FIJA
+                    self.aulas_usadas[b] += 1
+                    self.nombres_aula[b].add(aula)
+            if plantel_clase == plantel_id:
+                hechas[(grupo_id, asignatura_id)] += len(bloques)
+                if bloques:
+                    self.por_dia[(grupo_id, asignatura_id, dia)] += len(bloques)
+
+        for (grupo_id, asignatura_id), (maestro_id, horas) in materias.items():
+            faltan = horas - hechas[(grupo_id, asignatura_id)]
+            self.unidades.extend([(grupo_id, asignatura_id, maestro_id)] * max(faltan, 0))
+        self.bloque = [None] * len(self.unidades)
+
+    # ── Estado ───────────────────────────────────────────────────────────────
+
+    def _poner(self, u, b):
+        grupo_id, asignatura_id, maestro_id = self.unidades[u]
+        self.bloque[u] = b
+        self.grupo_en[(grupo_id, b)] = u
+        self.maestro_en[(maestro_id, b)] = u
+        self.en_bloque[b].add(u)
+        self.aulas_usadas[b] += 1
+        self.por_dia[(grupo_id, asignatura_id, self.dias[b // len(self.horas)])] += 1
+
+    def _quitar(self, u):
+        grupo_id, asignatura_id, maestro_id = self.unidades[u]
+        b = self.bloque[u]
+        self.bloque[u] = None
+        del self.grupo_en[(grupo_id, b)]
+        del self.maestro_en[(maestro_id, b)]
+        self.en_bloque[b].discard(u)
+        self.aulas_usadas[b] -= 1
+        self.por_dia[(grupo_id, asignatura_id, self.dias[b // len(self.horas)])] -= 1
+
+    def _libre(self, u, b):
+        grupo_id, _, maestro_id = self.unidades[u]
+        return (
+            (grupo_id, b) not in self.grupo_en
+            and (maestro_id, b) not in self.maestro_en
+            and self.aulas_usadas[b] < self.capacidad
+        )
+
+    def _choques(self, u, b):
+        """Unidades a desalojar para poner `u` en `b`; None si lo impide una clase fija."""
+        grupo_id, _, maestro_id = self.unidades[u]
+        choques = set()
+        for ocupante in (self.grupo_en.get((grupo_id, b)), self.maestro_en.get((maestro_id, b))):
+            if ocupante == FIJA:
+                return None
+            if ocupante is not None:
+                choques.add(ocupante)
+        if self.aulas_usadas[b] - len(choques) >= self.capacidad:
+            libres = self.en_bloque[b] - choques
+            if not libres:
+                return None
+            choques.add(self.azar.choice(sorted(libres)))
+        return choques
+
+    def _costo_dia(self, u, b):
+        """Penaliza juntar en un día más horas de la misma materia que las necesarias."""
+        grupo_id, asignatura_id, _ = self.unidades[u]
+        return self.por_dia[(grupo_id, asignatura_id, self.dias[b // len(self.horas)])]
+
+    # ── Búsqueda ─────────────────────────────────────────────────────────────
+
+    def _voraz(self):
+        carga = Counter(m for _, _, m in self.unidades)
+        horas = Counter((g, a) for g, a, _ in self.unidades)
+        orden = sorted(
+            range(len(self.unidades)),
+            key=lambda u: (-carga[self.unidades[u][2]], -horas[self.unidades[u][:2]], self.unidades[u]),
+        )
+        pendientes = []
+        for u in orden:
+            mejor, costo_mejor = None, None
+            for b in range(self.total_bloques):
+                if not self._libre(u, b):
+                    continue
+                costo = (self._costo_dia(u, b), b % len(self.horas), self.azar.random())
+                if costo_mejor is None or costo < costo_mejor:
+                    mejor, costo_mejor = b, costo
+            if mejor is None:
+                pendientes.append(u)
+            else:
+                self._poner(u, mejor)
+        return pendientes
+
+    def _busqueda_local(self, pendientes, limite):
+        pendientes = deque(pendientes)
+        imposibles = []
+        tabu = {}
+        mejor_faltan, mejor = len(pendientes), list(self.bloque)
+        cupo = self.capacidad * self.total_bloques
+
+        # Si todas las aulas de todos los bloques están ocupadas ya no cabe nada más
+        while pendientes and sum(self.aulas_usadas) < cupo and time.monotonic() < limite:
+            self.iteraciones += 1
+            u = pendientes.popleft()
+            elegido, costo_elegido, choques_elegido = None, None, None
+            for b in range(self.total_bloques):
+                if tabu.get((u, b), 0) > self.iteraciones:
+                    continue
+                choques = self._choques(u, b)
+                if choques is None:
+                    continue
+                costo = (len(choques), self._costo_dia(u, b), self.azar.random())
+                if costo_elegido is None or costo < costo_elegido:
+                    elegido, costo_elegido, choques_elegido = b, costo, choques
+            if elegido is None:
+                # Todos sus bloques están tomados por clases fijas (o en tabú)
+                if all(self._choques(u, b) is None for b in range(self.total_bloques)):
+                    imposibles.append(u)
+                else:
+                    pendientes.append(u)
+                continue
+
+            for v in choques_elegido:
+                tabu[(v, self.bloque[v])] = self.iteraciones + 10 + self.azar.randrange(10)
+                self._quitar(v)
+                pendientes.append(v)
+            self._poner(u, elegido)
+
+            faltan = len(pendientes) + len(imposibles)
+            if faltan < mejor_faltan:
+                mejor_faltan, mejor = faltan, list(self.bloque)
+
+        if len(pendientes) + len(imposibles) > mejor_faltan:
+            self._restaurar(mejor)
+
+    def _restaurar(self, bloques):
+        for u, b in enumerate(self.bloque):
+            if b is not None:
+                self._quitar(u)
+        for u, b in enumerate(bloques):
+            if b is not None:
+                self._poner(u, b)
+
+    def resolver(self):
+        """Coloca las unidades dentro del presupuesto de tiempo. Devuelve el reporte."""
+        inicio = time.monotonic()
+        pendientes = self._voraz()
+        if pendientes:
+            self._busqueda_local(pendientes, inicio + self.segundos)
+        return self.reporte(time.monotonic() - inicio)
+
+    # ── Resultado ────────────────────────────────────────────────────────────
+
+    def clases(self):
+        """HorarioClase sin guardar: las horas seguidas de una materia forman una sola clase."""
+        por_materia = {}
+        for u, b in enumerate(self.bloque):
+            if b is not None:
+                por_materia.setdefault(self.unidades[u], []).append(b)
+
+        clases = []
+        for (grupo_id, asignatura_id, maestro_id), bloques in sorted(por_materia.items()):
+            bloques.sort()
+            tramos = []
+            for b in bloques:
+                if tramos and b == tramos[-1][-1] + 1 and b // len(self.horas) == tramos[-1][0] // len(self.horas):
+                    tramos[-1].append(b)
+                else:
+                    tramos.append([b])
+            for tramo in tramos:
+                dia = self.dias[tramo[0] // len(self.horas)]
+                clases.append(HorarioClase(
+                    grupo_id=grupo_id, asignatura_id=asignatura_id, maestro_id=maestro_id, dia=dia,
+                    hora_inicio=_hora(self.horas[tramo[0] % len(self.horas)][0]),
+                    hora_fin=_hora(self.horas[tramo[-1] % len(self.horas)][1]),
+                    aula=self._elegir_aula(grupo_id, tramo),
+                ))
+        return clases
+
+    def _elegir_aula(self, grupo_id, tramo):
+        """El aula del grupo si está libre en todo el tramo; si no, la primera 'Aula N' libre."""
+        candidatas = [self.aula_grupo.get(grupo_id)] + [f'Aula {n}' for n in range(1, self.capacidad + 1)]
+        for aula in candidatas:
+            if aula and aula != AULA_SIN_DEFINIR and not any(aula in self.nombres_aula[b] for b in tramo):
+                for b in tramo:
+                    self.nombres_aula[b].add(aula)
+                return aula
+        return AULA_SIN_DEFINIR
+
+    def reporte(self, segundos=0):
+        faltantes = Counter(self.unidades[u] for u, b in enumerate(self.bloque) if b is None)
+        nombres = {}
+        if faltantes:
+            for grupo in Grupo.objects.filter(pk__in={g for g, _, _ in faltantes}).select_related('carrera'):
+                nombres[('grupo', grupo.pk)] = str(grupo)
+            for pk, nombre in Asignatura.objects.filter(pk__in={a for _, a, _ in faltantes}).values_list('pk', 'nombre'):
+                nombres[('asignatura', pk)] = nombre
+            for docente in User.objects.filter(pk__in={m for _, _, m in faltantes}):
+                nombres[('maestro', docente.pk)] = docente.get_full_name() or docente.username
+        return {
+            'horas_pedidas':   len(self.unidades),
+            'horas_colocadas': len(self.unidades) - sum(faltantes.values()),
+            'sin_colocar': [
+                {
+                    'grupo':      nombres.get(('grupo', g), g),
+                    'asignatura': nombres.get(('asignatura', a), a),
+                    'maestro':    nombres.get(('maestro', m), m),
+                    'horas':      horas,
+                }
+                for (g, a, m), horas in sorted(faltantes.items())
+            ],
+            'segundos':    round(segundos, 2),
+            'iteraciones': self.iteraciones,
+        }
+
+    def guardar(self):
+        """
+        Inserta la propuesta en una transacción (desactivando antes las clases
+        del plantel si `reemplazar`). Devuelve las HorarioClase creadas.
+        """
+        clases = self.clases()
+        plantel_id = self.plantel.pk
+        with transaction.atomic():
+            actual = Plantel.objects.select_for_update().values_list('version_horario', flat=True).get(pk=plantel_id)
+            if actual != self.version:
+                raise HorarioDesactualizado(
+                    'El horario del plantel cambió mientras se generaba la propuesta. Vuelve a intentarlo.'
+                )
+            invalidar_horarios(
+                grupo_ids=list(self.aula_grupo),
+                maestro_ids={m for _, _, m in self.unidades},
+            )
+            version = Plantel.objects.values_list('version_horario', flat=True).get(pk=plantel_id)
+            if self.reemplazar:
+                HorarioClase.objects.filter(grupo__plantel_id=plantel_id, activo=True).update(
+                    activo=False, version=version,
+                )
+            for clase in clases:
+                clase.version = version
+            HorarioClase.objects.bulk_create(clases, batch_size=500)
+        return clases
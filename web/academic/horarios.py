@@ -0,0 +1,348 @@
+# academic/horarios.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Índice de intervalos para detectar choques de HorarioClase
+#
+# Por plantel se guarda en memoria, por día, la lista ordenada de bloques de
+# cada maestro, grupo y aula. El índice se reconstruye cuando cambia
+# Plantel.version_horario, que las señales de HorarioClase incrementan en la
+# misma transacción del cambio; así cada proceso detecta que el suyo quedó
+# viejo con una sola consulta.
+# ─────────────────────────────────────────────────────────────────────────────
+import threading
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q, OuterRef, Subquery
+
+from campuses.models import Plantel
+from .models import Grupo, HorarioClase, HorarioEliminado
+
+AULA_SIN_DEFINIR = 'Por definir'
+
+Bloque = namedtuple('Bloque', 'pk dia inicio fin asignatura')
+
+
+def _hora(valor):
+    return HorarioClase._meta.get_field('hora_inicio').to_python(valor)
+
+
+def _solapa(inicios, bloques, inicio, fin, excluir):
+    """Primer bloque de `bloques` (ordenados por inicio) que se cruza con [inicio, fin)."""
+    for bloque in bloques[:bisect_left(inicios, fin)]:
+        if bloque.fin > inicio and bloque.pk != excluir:
+            return bloque
+    return None
+
+
+class IndiceHorarios:
+    """
+    Clases activas de un plantel, más las de otros planteles impartidas por
+    sus maestros (un maestro no puede estar en dos lugares a la vez).
+    """
+
+    def __init__(self, plantel_id, version):
+        self.plantel_id = plantel_id
+        self.version    = version
+        self.maestros   = set()
+        self._bloques   = defaultdict(list)
+        self._cargar()
+
+    def _cargar(self):
+        maestros_del_plantel = HorarioClase.objects.filter(
+            grupo__plantel_id=self.plantel_id, activo=True,
+        ).values('maestro_id')
+        clases = (
+            HorarioClase.objects
+            .filter(activo=True)
+            .filter(Q(grupo__plantel_id=self.plantel_id) | Q(maestro_id__in=maestros_del_plantel))
+            .values_list(
+                'pk', 'dia', 'hora_inicio', 'hora_fin', 'maestro_id', 'grupo_id',
+                'aula', 'asignatura__nombre', 'grupo__plantel_id',
+            )
+        )
+        for pk, dia, inicio, fin, maestro_id, grupo_id, aula, asignatura, plantel_id in clases:
+            bloque = Bloque(pk, dia, inicio, fin, asignatura)
+            self._bloques[(dia, 'maestro', maestro_id)].append(bloque)
+            if plantel_id == self.plantel_id:
+                self.maestros.add(maestro_id)
+                self._bloques[(dia, 'grupo', grupo_id)].append(bloque)
+                if aula and aula != AULA_SIN_DEFINIR:
+                    self._bloques[(dia, 'aula', aula)].append(bloque)
+        for clave, bloques in self._bloques.items():
+            bloques.sort(key=lambda b: b.inicio)
+            self._bloques[clave] = ([b.inicio for b in bloques], bloques)
+
+    def buscar_conflictos(self, clase):
+        """
+        Choques de `clase` (guardada o no) con las clases activas del índice.
+        Devuelve {'maestro'|'grupo'|'aula': Bloque} con el primer choque de cada tipo.
+        """
+        dia, inicio, fin = clase.dia, _hora(clase.hora_inicio), _hora(clase.hora_fin)
+        if not (dia and inicio and fin) or inicio >= fin:
+            return {}
+
+        conflictos = {}
+        claves = [('grupo', clase.grupo_id)]
+        if clase.aula and clase.aula != AULA_SIN_DEFINIR:
+            claves.append(('aula', clase.aula))
+        if clase.maestro_id in self.maestros:
+            claves.append(('maestro', clase.maestro_id))
+        elif clase.maestro_id:
+            # Maestro aún sin clases en este plantel: sus otros horarios no están en el índice
+            otra = (
+                HorarioClase.objects
+                .filter(maestro_id=clase.maestro_id, dia=dia, activo=True,
+                        hora_inicio__lt=fin, hora_fin__gt=inicio)
+                .exclude(pk=clase.pk)
+                .values_list('pk', 'dia', 'hora_inicio', 'hora_fin', 'asignatura__nombre')
+                .first()
+            )
+            if otra:
+                conflictos['maestro'] = Bloque(*otra)
+
+        for campo, valor in claves:
+            if valor is None:
+                continue
+            bloque = _solapa(*self._bloques.get((dia, campo, valor), ([], [])), inicio, fin, clase.pk)
+            if bloque:
+                conflictos[campo] = bloque
+        return conflictos
+
+
+_indices = {}
+_lock    = threading.Lock()
+
+
+def indice_horarios(plantel):
+    """IndiceHorarios vigente del plantel (objeto o pk); lo reconstruye si cambió la versión."""
+    plantel_id = getattr(plantel, 'pk', plantel)
+    version = version_horario(plantel_id)
+    indice = _indices.get(plantel_id)
+    if indice is None or indice.version != version:
+        indice = IndiceHorarios(plantel_id, version)
+        # Dentro de una transacción el índice puede ver cambios que luego se
+        # deshagan: se usa, pero no se comparte con las siguientes peticiones.
+        if not connection.in_atomic_block:
+            with _lock:
+                _indices[plantel_id] = indice
+    return indice
+
+
+def invalidar_horarios(grupo_ids=(), maestro_ids=(), clase_ids=()):
+    """
+    Incrementa version_horario de los planteles de `grupo_ids` y de los
+    planteles donde dan clase `maestro_ids`. Las clases `clase_ids` (recién
+    creadas o editadas) quedan marcadas con la nueva versión de su plantel.
+    """
+    grupo_ids   = [g for g in grupo_ids if g]
+    maestro_ids = [m for m in maestro_ids if m]
+    clase_ids   = [c for c in clase_ids if c]
+    planteles = (
+        Grupo.objects
+        .filter(Q(pk__in=grupo_ids) | Q(horarios__maestro_id__in=maestro_ids))
+        .values('plantel_id')
+    )
+    Plantel.objects.filter(pk__in=planteles).update(version_horario=F('version_horario') + 1)
+    if clase_ids:
+        HorarioClase.objects.filter(pk__in=clase_ids).update(version=Subquery(
+            Grupo.objects.filter(pk=OuterRef('grupo_id')).values('plantel__version_horario')[:1]
+        ))
+
+
+def registrar_bajas(bajas):
+    """
+    Anota en HorarioEliminado las clases [(clase_id, grupo_id), ...] que ya no
+    pertenecen al plantel del grupo, con la versión actual de ese plantel.
+    Llamar después de invalidar_horarios.
+    """
+    bajas = [(c, g) for c, g in bajas if c and g]
+    if not bajas:
+        return
+    planteles = {
+        grupo_id: (plantel_id, version)
+        for grupo_id, plantel_id, version in
+        Grupo.objects.filter(pk__in={g for _, g in bajas})
+        .values_list('pk', 'plantel_id', 'plantel__version_horario')
+    }
+    HorarioEliminado.objects.bulk_create([
+        HorarioEliminado(clase_id=c, plantel_id=planteles[g][0], version=planteles[g][1])
+        for c, g in bajas if g in planteles
+    ])
+    # Lo que ningún ?since= aceptado puede pedir ya no hace falta
+    viejas = Q()
+    for plantel_id, version in set(planteles.values()):
+        viejas |= Q(plantel_id=plantel_id, version__lte=version - RETENER_VERSIONES)
+    HorarioEliminado.objects.filter(viejas).delete()
+
+
+def mensajes_conflicto(clase, conflictos):
+    """Mensajes de ValidationError por campo, con la redacción de HorarioClase.clean()."""
+    dia = dict(HorarioClase.DIAS_SEMANA).get(clase.dia, clase.dia)
+    errores = {}
+    if 'maestro' in conflictos:
+        errores['maestro'] = (
+            f'El docente ya tiene "{conflictos["maestro"].asignatura}" asignada '
+            f'los {dia} en ese horario.'
+        )
+    if 'grupo' in conflictos:
+        errores['grupo'] = (
+            f'El grupo ya tiene "{conflictos["grupo"].asignatura}" '
+            f'los {dia} en ese horario.'
+        )
+    if 'aula' in conflictos:
+        errores['aula'] = f'El aula "{clase.aula}" ya está ocupada en ese horario.'
+    return errores
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON DEL PLANTEL PARA EL EDITOR DE HORARIOS
+#
+# El editor valida choques en el navegador con todas las clases activas del
+# plantel. La lista completa se cachea por (plantel, version_horario): como la
+# versión sube con cada cambio, una clave nunca queda vieja. Con ?since=<v>
+# solo viajan las clases tocadas después de v y los ids que ya no están; las
+# bajas se guardan por RETENER_VERSIONES versiones y un ?since= más viejo
+# recibe la lista completa.
+# ─────────────────────────────────────────────────────────────────────────────
+
+CAMPOS_JSON = {
+    'id': 'pk', 'grupo_id': 'grupo_id', 'maestro_id': 'maestro_id',
+    'asignatura_id': 'asignatura_id', 'asignatura_nombre': 'asignatura__nombre',
+    'dia': 'dia', 'hora_inicio': 'hora_inicio', 'hora_fin': 'hora_fin', 'aula': 'aula',
+}
+CACHE_JSON_SEGUNDOS = 60 * 60
+RETENER_VERSIONES = 1000   # ?since= más viejo que esto recibe la lista completa
+
+
+def version_horario(plantel):
+    plantel_id = getattr(plantel, 'pk', plantel)
+    return Plantel.objects.filter(pk=plantel_id).values_list('version_horario', flat=True).first()
+
+
+def _clases_json(clases):
+    filas = []
+    for fila in clases.values_list(*CAMPOS_JSON.values()):
+        clase = dict(zip(CAMPOS_JSON, fila))
+        clase['hora_inicio'] = clase['hora_inicio'].strftime('%H:%M')
+        clase['hora_fin']    = clase['hora_fin'].strftime('%H:%M')
+        clase['aula']        = clase['aula'] or ''
+        filas.append(clase)
+    return filas
+
+
+def horarios_plantel_json(plantel_id, version, desde=None):
+    """
+    Clases activas del plantel para el editor.
+        completo: {'version', 'completo': True, 'clases'}
+        delta:    {'version', 'completo': False, 'clases', 'eliminados'}
+    El delta se da cuando version - RETENER_VERSIONES <= desde <= version
+    (las bajas más viejas ya se borraron); `clases` trae las altas y ediciones
+    posteriores a `desde` y `eliminados` los ids que hay que quitar.
+    """
+    activas = HorarioClase.objects.filter(grupo__plantel_id=plantel_id, activo=True).order_by()
+
+    if desde is not None and max(version - RETENER_VERSIONES, 0) <= desde <= version:
+        clases = _clases_json(activas.filter(version__gt=desde))
+        vigentes = {c['id'] for c in clases}
+        eliminados = set(
+            HorarioEliminado.objects
+            .filter(plantel_id=plantel_id, version__gt=desde)
+            .values_list('clase_id', flat=True)
+        ) | set(
+            HorarioClase.objects
+            .filter(grupo__plantel_id=plantel_id, activo=False, version__gt=desde)
+            .values_list('pk', flat=True)
+        )
+        return {
+            'version': version, 'completo': False,
+            'clases': clases, 'eliminados': sorted(eliminados - vigentes),
+        }
+
+    clave = f'horarios_json:{plantel_id}:{version}'
+    datos = cache.get(clave)
+    if datos is None:
+        datos = {'version': version, 'completo': True, 'clases': _clases_json(activas)}
+        cache.set(clave, datos, CACHE_JSON_SEGUNDOS)
+    return datos
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REJILLA SEMANAL DE UN GRUPO
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _minutos(hora):
+    return hora.hour * 60 + hora.minute
+
+
+def rejilla_horario(clases, plantel):
+    """
+    Acomoda `clases` (HorarioClase ya cargadas) en bloques de
+    plantel.duracion_bloque minutos, de hora_entrada a hora_salida; el rango
+    se amplía si alguna clase queda fuera. Una clase que cruza varios bloques
+    (o empieza a media hora) ocupa una sola celda con rowspan, y las clases
+    que comparten bloques se agrupan en esa misma celda.
+
+    Devuelve (dias, filas):
+        dias  = [(codigo, nombre), ...]
+        filas = [{'hora': 'HH:MM', 'celdas': [{'dia', 'dia_nombre', 'tipo',
+                  'clases', 'rowspan'}, ...]}, ...]
+    con tipo 'clases', 'libre' o 'cubierta' (celda absorbida por un rowspan).
+    """
+    clases   = sorted(clases, key=lambda c: (c.dia, c.hora_inicio))
+    duracion = plantel.duracion_bloque or 60
+    base     = _minutos(plantel.hora_entrada)
+
+    dias_con_clase = {c.dia for c in clases}
+    dias = [
+        (codigo, nombre) for codigo, nombre in HorarioClase.DIAS_SEMANA
+        if codigo != 'SA' or plantel.incluye_sabado or 'SA' in dias_con_clase
+    ]
+
+    # Índices de bloque relativos a hora_entrada (pueden ser negativos)
+    def bloque_inicio(hora):
+        return (_minutos(hora) - base) // duracion
+
+    def bloque_fin(hora):
+        return -((base - _minutos(hora)) // duracion)   # techo
+
+    primero = min([0] + [bloque_inicio(c.hora_inicio) for c in clases])
+    ultimo  = max([bloque_fin(plantel.hora_salida)] + [bloque_fin(c.hora_fin) for c in clases])
+
+    # Por día, las clases cuyos bloques se tocan forman una sola celda
+    ocupadas = []
+    for clase in clases:
+        ini = bloque_inicio(clase.hora_inicio)
+        fin = max(bloque_fin(clase.hora_fin), ini + 1)
+        previa = ocupadas[-1] if ocupadas else None
+        if previa and previa['dia'] == clase.dia and ini < previa['fin']:
+            previa['clases'].append(clase)
+            previa['fin'] = max(previa['fin'], fin)
+        else:
+            ocupadas.append({'dia': clase.dia, 'inicio': ini, 'fin': fin, 'clases': [clase]})
+
+    celdas = {}
+    for celda in ocupadas:
+        celdas[(celda['dia'], celda['inicio'])] = celda
+        for b in range(celda['inicio'] + 1, celda['fin']):
+            celdas[(celda['dia'], b)] = None
+
+    filas = []
+    for b in range(primero, ultimo):
+        minutos = base + b * duracion
+        fila = {'hora': f'{minutos // 60:02d}:{minutos % 60:02d}', 'celdas': []}
+        for dia, nombre in dias:
+            celda = celdas.get((dia, b), False)
+            if celda is None:
+                tipo, contenido, rowspan = 'cubierta', [], 1
+            elif celda:
+                tipo, contenido, rowspan = 'clases', celda['clases'], celda['fin'] - celda['inicio']
+            else:
+                tipo, contenido, rowspan = 'libre', [], 1
+            fila['celdas'].append({
+                'dia': dia, 'dia_nombre': nombre, 'tipo': tipo,
+                'clases': contenido, 'rowspan': rowspan,
+            })
+        filas.append(fila)
+    return dias, filas
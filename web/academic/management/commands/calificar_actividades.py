@@ -0,0 +1,32 @@
+# academic/management/commands/calificar_actividades.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from academic.autocalificacion import calificar_actividad
+from academic.models import Actividad
+
+
+class Command(BaseCommand):
+    help = (
+        'Vuelve a calificar las entregas de las actividades de opción múltiple '
+        'con calificación automática (todas, o las indicadas).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--actividad', type=int, action='append', dest='actividades',
+                            help='Limitar a una o varias actividades (repetible).')
+
+    def handle(self, *args, actividades=None, **options):
+        qs = Actividad.objects.filter(tipo='MULTIPLE', calificacion_automatica=True)
+        if actividades:
+            qs = qs.filter(pk__in=actividades)
+        inicio = time.monotonic()
+        total = cambios = 0
+        for actividad in qs.iterator():
+            cambios += calificar_actividad(actividad)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} actividades revisadas, {cambios} calificaciones actualizadas '
+            f'en {time.monotonic() - inicio:.2f} s.'
+        ))
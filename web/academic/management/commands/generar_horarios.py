@@ -0,0 +1,54 @@
+# academic/management/commands/generar_horarios.py
+from django.core.management.base import BaseCommand, CommandError
+
+from campuses.models import Plantel
+from academic.generador_horarios import (
+    GeneradorHorarios, HorarioDesactualizado, HORAS_POR_DEFECTO, SEGUNDOS_POR_DEFECTO,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera el horario de un plantel a partir de DocenteGrupo y las horas '
+        'semanales de cada asignatura. Con --simular solo muestra el reporte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('plantel', type=int, help='ID del plantel.')
+        parser.add_argument('--segundos', type=float, default=SEGUNDOS_POR_DEFECTO,
+                            help='Tiempo máximo de búsqueda (por defecto %(default)s).')
+        parser.add_argument('--horas', type=int, default=HORAS_POR_DEFECTO,
+                            help='Horas semanales de las asignaturas sin horas_semana (por defecto %(default)s).')
+        parser.add_argument('--reemplazar', action='store_true',
+                            help='Desactiva las clases actuales del plantel y genera todo desde cero.')
+        parser.add_argument('--semilla', type=int, help='Semilla aleatoria, para repetir un resultado.')
+        parser.add_argument('--simular', action='store_true', help='No escribe nada.')
+
+    def handle(self, *args, plantel, segundos, horas, reemplazar, semilla, simular, **options):
+        try:
+            plantel = Plantel.objects.get(pk=plantel)
+        except Plantel.DoesNotExist:
+            raise CommandError(f'No existe el plantel {plantel}.')
+
+        generador = GeneradorHorarios(
+            plantel, reemplazar=reemplazar, horas_por_defecto=horas, segundos=segundos, semilla=semilla,
+        )
+        reporte = generador.resolver()
+        self.stdout.write(
+            f'{reporte["horas_colocadas"]}/{reporte["horas_pedidas"]} horas colocadas '
+            f'en {reporte["segundos"]} s ({reporte["iteraciones"]} iteraciones de búsqueda local).'
+        )
+        for falta in reporte['sin_colocar']:
+            self.stdout.write(
+                f'  {falta["grupo"]} · {falta["asignatura"]} ({falta["maestro"]}): '
+                f'{falta["horas"]} h sin lugar'
+            )
+
+        if simular:
+            self.stdout.write(self.style.WARNING('Simulación: no se guardó nada.'))
+            return
+        try:
+            clases = generador.guardar()
+        except HorarioDesactualizado as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'{len(clases)} clases creadas en {plantel}.'))
@@ -0,0 +1,63 @@
+# academic/management/commands/reconstruir_asistencia_mensual.py
+from django.core.management.base import BaseCommand
+
+from academic.asistencias import calcular_mensuales, reconstruir_mensuales, CAMPO_ESTADO
+from academic.models import AsistenciaMensual
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye AsistenciaMensual desde Asistencia. '
+        'Con --verificar solo reporta los meses desfasados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grupo', type=int, action='append', dest='grupos',
+                            help='Limitar a uno o varios grupos (repetible).')
+        parser.add_argument('--verificar', action='store_true',
+                            help='No escribe nada; lista las diferencias encontradas.')
+
+    def handle(self, *args, grupos=None, verificar=False, **options):
+        if not verificar:
+            guardadas, borradas = reconstruir_mensuales(grupos)
+            self.stdout.write(self.style.SUCCESS(
+                f'Asistencia mensual reconstruida: {guardadas} filas guardadas ({borradas} anteriores reemplazadas).'
+            ))
+            return
+
+        esperadas = calcular_mensuales(grupos)
+        actuales  = AsistenciaMensual.objects.all()
+        if grupos:
+            actuales = actuales.filter(grupo_id__in=grupos)
+
+        campos = list(CAMPO_ESTADO.values())
+        desfasadas = 0
+        vistas = set()
+        for r in actuales.iterator():
+            clave = (r.alumno_id, r.grupo_id, r.asignatura_id, r.anio, r.mes)
+            vistas.add(clave)
+            esperada = esperadas.get(clave) or AsistenciaMensual()
+            diferencias = [
+                f'{c}: {getattr(r, c)} ≠ {getattr(esperada, c)}'
+                for c in campos if getattr(r, c) != getattr(esperada, c)
+            ]
+            if diferencias:
+                desfasadas += 1
+                self.stdout.write(f'  {self._etiqueta(clave)}  ' + '; '.join(diferencias))
+
+        faltantes = [c for c in esperadas if c not in vistas]
+        for clave in faltantes:
+            self.stdout.write(f'  {self._etiqueta(clave)}  falta en el resumen')
+
+        total = desfasadas + len(faltantes)
+        if total:
+            self.stdout.write(self.style.WARNING(
+                f'{total} filas desfasadas. Ejecuta el comando sin --verificar para corregirlas.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Asistencia mensual al día: sin diferencias.'))
+
+    @staticmethod
+    def _etiqueta(clave):
+        alumno, grupo, asignatura, anio, mes = clave
+        return f'alumno={alumno} grupo={grupo} asignatura={asignatura} {mes:02d}/{anio}'
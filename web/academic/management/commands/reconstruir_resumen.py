@@ -0,0 +1,58 @@
+# academic/management/commands/reconstruir_resumen.py
+from django.core.management.base import BaseCommand
+
+from academic.calificaciones import calcular_resumenes, reconstruir_resumenes, CAMPOS_RESUMEN
+from academic.models import ResumenCalificacion
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye ResumenCalificacion desde EntregaTarea, EntregaActividad y '
+        'Calificacion. Con --verificar solo reporta las celdas desfasadas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grupo', type=int, action='append', dest='grupos',
+                            help='Limitar a uno o varios grupos (repetible).')
+        parser.add_argument('--verificar', action='store_true',
+                            help='No escribe nada; lista las diferencias encontradas.')
+
+    def handle(self, *args, grupos=None, verificar=False, **options):
+        if not verificar:
+            guardadas, borradas = reconstruir_resumenes(grupos)
+            self.stdout.write(self.style.SUCCESS(
+                f'Resumen reconstruido: {guardadas} celdas guardadas, {borradas} eliminadas.'
+            ))
+            return
+
+        esperadas = calcular_resumenes(grupos)
+        actuales  = ResumenCalificacion.objects.all()
+        if grupos:
+            actuales = actuales.filter(grupo_id__in=grupos)
+
+        campos = [c for c in CAMPOS_RESUMEN if c != 'actualizado_en']
+        desfasadas = 0
+        vistas = set()
+        for r in actuales.iterator():
+            clave = (r.alumno_id, r.asignatura_id, r.grupo_id)
+            vistas.add(clave)
+            esperada = esperadas.get(clave) or ResumenCalificacion()
+            diferencias = [
+                f'{c}: {getattr(r, c)} ≠ {getattr(esperada, c)}'
+                for c in campos if getattr(r, c) != getattr(esperada, c)
+            ]
+            if diferencias:
+                desfasadas += 1
+                self.stdout.write(f'  alumno={clave[0]} asignatura={clave[1]} grupo={clave[2]}  ' + '; '.join(diferencias))
+
+        faltantes = [c for c in esperadas if c not in vistas]
+        for clave in faltantes:
+            self.stdout.write(f'  alumno={clave[0]} asignatura={clave[1]} grupo={clave[2]}  falta en el resumen')
+
+        total = desfasadas + len(faltantes)
+        if total:
+            self.stdout.write(self.style.WARNING(
+                f'{total} celdas desfasadas. Ejecuta el comando sin --verificar para corregirlas.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Resumen al día: sin diferencias.'))
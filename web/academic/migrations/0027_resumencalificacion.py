@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0026_planclase_temaclase'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenCalificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suma_tareas', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('num_tareas', models.PositiveIntegerField(default=0)),
+                ('suma_actividades', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('num_actividades', models.PositiveIntegerField(default=0)),
+                ('manual', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('promedio_final', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_calificacion', to=settings.AUTH_USER_MODEL)),
+                ('asignatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_calificacion', to='academic.asignatura')),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_calificacion', to='academic.grupo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Calificación',
+                'verbose_name_plural': 'Resúmenes de Calificación',
+                'indexes': [models.Index(fields=['promedio_final'], name='academic_re_promedi_899323_idx')],
+                'unique_together': {('alumno', 'asignatura', 'grupo')},
+            },
+        ),
+    ]
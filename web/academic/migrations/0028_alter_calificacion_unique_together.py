@@ -0,0 +1,51 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:02
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def normalizar_calificaciones(apps, schema_editor):
+    """
+    Antes de la restricción única: las notas manuales sin grupo toman el del
+    alumno y, si una celda quedó repetida, se conserva la captura más reciente.
+    """
+    Calificacion = apps.get_model('academic', 'Calificacion')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    Calificacion.objects.filter(tipo='MANUAL', grupo__isnull=True).update(
+        grupo_id=Subquery(
+            User.objects.filter(pk=OuterRef('alumno_id')).values('alumno_grupo_id')[:1]
+        )
+    )
+
+    vistas, repetidas = set(), []
+    for pk, *clave in (
+        Calificacion.objects
+        .filter(grupo__isnull=False)
+        .order_by('-fecha', '-pk')
+        .values_list('pk', 'alumno_id', 'asignatura_id', 'grupo_id', 'tipo')
+        .iterator()
+    ):
+        clave = tuple(clave)
+        if clave in vistas:
+            repetidas.append(pk)
+        else:
+            vistas.add(clave)
+    Calificacion.objects.filter(pk__in=repetidas).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0027_resumencalificacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_calificaciones, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='calificacion',
+            unique_together={('alumno', 'asignatura', 'grupo', 'tipo')},
+        ),
+    ]
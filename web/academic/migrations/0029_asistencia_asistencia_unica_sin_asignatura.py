@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def quitar_duplicados_sin_asignatura(apps, schema_editor):
+    """Si una lista general se guardó dos veces el mismo día, queda la última."""
+    Asistencia = apps.get_model('academic', 'Asistencia')
+    vistas, repetidas = set(), []
+    for pk, *clave in (
+        Asistencia.objects
+        .filter(asignatura__isnull=True)
+        .order_by('-pk')
+        .values_list('pk', 'alumno_id', 'grupo_id', 'fecha')
+        .iterator()
+    ):
+        clave = tuple(clave)
+        if clave in vistas:
+            repetidas.append(pk)
+        else:
+            vistas.add(clave)
+    Asistencia.objects.filter(pk__in=repetidas).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0028_alter_calificacion_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(quitar_duplicados_sin_asignatura, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='asistencia',
+            constraint=models.UniqueConstraint(condition=models.Q(('asignatura__isnull', True)), fields=('alumno', 'grupo', 'fecha'), name='asistencia_unica_sin_asignatura'),
+        ),
+    ]
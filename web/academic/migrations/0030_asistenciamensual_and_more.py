@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0029_asistencia_asistencia_unica_sin_asignatura'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AsistenciaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('presentes', models.IntegerField(default=0)),
+                ('ausentes', models.IntegerField(default=0)),
+                ('retardos', models.IntegerField(default=0)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asistencias_mensuales', to=settings.AUTH_USER_MODEL)),
+                ('asignatura', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='asistencias_mensuales', to='academic.asignatura')),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asistencias_mensuales', to='academic.grupo')),
+            ],
+            options={
+                'verbose_name': 'Asistencia Mensual',
+                'verbose_name_plural': 'Asistencias Mensuales',
+                'indexes': [models.Index(fields=['grupo', 'anio', 'mes'], name='academic_as_grupo_i_920e36_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='asistenciamensual',
+            constraint=models.UniqueConstraint(condition=models.Q(('asignatura__isnull', True)), fields=('alumno', 'grupo', 'anio', 'mes'), name='asistencia_mensual_unica_sin_asignatura'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='asistenciamensual',
+            unique_together={('alumno', 'grupo', 'asignatura', 'anio', 'mes')},
+        ),
+    ]
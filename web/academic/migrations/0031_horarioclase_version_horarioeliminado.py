@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0030_asistenciamensual_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horarioclase',
+            name='version',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='HorarioEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plantel_id', models.PositiveIntegerField(db_index=True)),
+                ('clase_id', models.PositiveIntegerField()),
+                ('version', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Horario eliminado',
+                'verbose_name_plural': 'Horarios eliminados',
+                'indexes': [models.Index(fields=['plantel_id', 'version'], name='academic_ho_plantel_b7ba22_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0031_horarioclase_version_horarioeliminado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asignatura',
+            name='horas_semana',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Horas por semana'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:26
+
+from itertools import islice
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+EVENTOS_POR_DOCENTE = 50
+LOTE = 1000
+
+# Rutas escritas a mano: una migración no debe depender del URLconf actual.
+# Son las de docente/urls.py al crear el feed.
+FUENTES = [
+    # (modelo, objeto, actor, fecha, tipo, acción, ruta)
+    ('EntregaTarea',       'tarea',     'alumno', 'entregada_en', 'ENTREGA_TAREA',       'entregó una tarea',     '/docente/tareas/{}/'),
+    ('EntregaActividad',   'actividad', 'alumno', 'entregada_en', 'ENTREGA_ACTIVIDAD',   'entregó una actividad', '/docente/actividades/{}/'),
+    ('ComentarioTarea',    'tarea',     'autor',  'creado_en',    'COMENTARIO_TAREA',    'comentó',               '/docente/tareas/{}/'),
+    ('ComentarioMaterial', 'material',  'autor',  'creado_en',    'COMENTARIO_MATERIAL', 'comentó un material',   '/docente/material/{}/'),
+]
+
+
+def poblar_feed(apps, schema_editor):
+    """
+    Eventos de las últimas entregas y comentarios de alumnos (hasta
+    EVENTOS_POR_DOCENTE por docente), para que el feed no arranque vacío.
+    Se marcan como leídos y se insertan por lotes de LOTE.
+    """
+    Evento = apps.get_model('academic', 'EventoActividad')
+
+    def recientes(docente_id):
+        filas = []
+        for modelo, objeto, actor, fecha, tipo, accion, ruta in FUENTES:
+            for f in (
+                apps.get_model('academic', modelo).objects
+                .filter(**{f'{objeto}__docente_id': docente_id})
+                .exclude(**{f'{actor}_id': models.F(f'{objeto}__docente_id')})
+                .order_by(f'-{fecha}')
+                .values_list(fecha, f'{actor}_id', f'{actor}__first_name', f'{actor}__last_name',
+                             f'{actor}__username', f'{objeto}_id', f'{objeto}__titulo')
+                [:EVENTOS_POR_DOCENTE]
+            ):
+                filas.append((tipo, accion, ruta) + f)
+        filas.sort(key=lambda f: f[3], reverse=True)
+        return filas[:EVENTOS_POR_DOCENTE]
+
+    def eventos():
+        docentes = set()
+        for modelo in ('Tarea', 'Actividad', 'MaterialApoyo'):
+            docentes.update(apps.get_model('academic', modelo).objects.values_list('docente_id', flat=True).distinct())
+        for docente_id in sorted(docentes):
+            for tipo, accion, ruta, creado_en, actor_id, first, last, username, objeto_id, sub in recientes(docente_id):
+                nombre = f'{first} {last}'.strip() or username
+                yield Evento(
+                    destinatario_id=docente_id, actor_id=actor_id, tipo=tipo,
+                    titulo=f'{nombre} {accion}'[:200], sub=sub[:200],
+                    url=ruta.format(objeto_id), creado_en=creado_en, leido=True,
+                )
+
+    lotes = eventos()
+    while lote := list(islice(lotes, LOTE)):
+        Evento.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0032_asignatura_horas_semana'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoActividad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ENTREGA_TAREA', 'Entrega de tarea'), ('ENTREGA_ACTIVIDAD', 'Entrega de actividad'), ('COMENTARIO_TAREA', 'Comentario en tarea'), ('COMENTARIO_MATERIAL', 'Comentario en material'), ('CALIFICACION', 'Calificación')], max_length=20)),
+                ('titulo', models.CharField(max_length=200)),
+                ('sub', models.CharField(blank=True, max_length=200)),
+                ('url', models.CharField(blank=True, max_length=200)),
+                ('creado_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('leido', models.BooleanField(default=False)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('destinatario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evento de actividad',
+                'verbose_name_plural': 'Eventos de actividad',
+                'ordering': ['-creado_en', '-id'],
+                'indexes': [models.Index(fields=['destinatario', '-creado_en', '-id'], name='academic_ev_destina_6e37aa_idx'), models.Index(condition=models.Q(('leido', False)), fields=['destinatario'], name='evento_no_leido_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_feed, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.db.models import Avg
 from django.utils import timezone
@@ -58,6 +58,43 @@ class Carrera(models.Model):
 # 2. GRUPOS
 # ==========================================
 
+class GrupoQuerySet(models.QuerySet):
+
+    def with_kpis(self, fecha=None):
+        """
+        Anota en la misma consulta los KPIs de cada grupo, que las propiedades
+        de Grupo leen sin ir a la base:
+            alumnos_total, asignaturas_total, promedio_calificaciones,
+            asistencias_mes / registros_mes (AsistenciaMensual del mes de `fecha`)
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count, Sum, F, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+
+        fecha = fecha or timezone.localdate()
+
+        def por_grupo(qs, campo_grupo, agregado):
+            """Subconsulta con `agregado` sobre las filas de `qs` del grupo externo."""
+            return Subquery(
+                qs.filter(**{campo_grupo: OuterRef('pk')})
+                .order_by().values(campo_grupo)
+                .annotate(valor=agregado).values('valor')
+            )
+
+        mes = AsistenciaMensual.objects.filter(anio=fecha.year, mes=fecha.month)
+        return self.annotate(
+            alumnos_total=Coalesce(
+                por_grupo(get_user_model().objects.all(), 'alumno_grupo', Count('pk')), 0,
+            ),
+            asignaturas_total=Coalesce(
+                por_grupo(Asignatura.grupos.through.objects.all(), 'grupo', Count('pk')), 0,
+            ),
+            promedio_calificaciones=por_grupo(Calificacion.objects.all(), 'asignatura__grupos', Avg('nota')),
+            asistencias_mes=por_grupo(mes, 'grupo', Sum('presentes')),
+            registros_mes=por_grupo(mes, 'grupo', Sum(F('presentes') + F('ausentes') + F('retardos'))),
+        )
+
+
 class Grupo(models.Model):
     plantel  = models.ForeignKey(Plantel,  on_delete=models.CASCADE, related_name='grupos')
     carrera  = models.ForeignKey(Carrera,  on_delete=models.CASCADE, related_name='grupos',  null=True, blank=True)
@@ -77,6 +114,8 @@ class Grupo(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = GrupoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Grupo"
         verbose_name_plural = "Grupos"
@@ -88,33 +127,53 @@ class Grupo(models.Model):
         return f"{nombre_carrera} — {self.grado}º {self.nombre}"
 
     # ── KPIs ────────────────────────────────────────────────────────
+    # Leen las anotaciones de Grupo.objects.with_kpis() si existen; si no,
+    # consultan por instancia (un detalle de grupo, por ejemplo).
+    @property
+    def total_alumnos(self):
+        if hasattr(self, 'alumnos_total'):
+            return self.alumnos_total
+        return self.alumnos.count()
+
+    @property
+    def total_asignaturas(self):
+        if hasattr(self, 'asignaturas_total'):
+            return self.asignaturas_total
+        return self.asignaturas.count()
+
     @property
     def ocupacion_porcentaje(self):
         if self.capacidad_maxima > 0:
-            return round((self.alumnos.count() / self.capacidad_maxima) * 100, 1)
+            return round((self.total_alumnos / self.capacidad_maxima) * 100, 1)
         return 0
 
     @property
     def promedio_general(self):
-        val = Calificacion.objects.filter(
-            asignatura__grupos=self
-        ).distinct().aggregate(promedio=Avg('nota'))['promedio']
+        if hasattr(self, 'promedio_calificaciones'):
+            val = self.promedio_calificaciones
+        else:
+            val = Calificacion.objects.filter(
+                asignatura__grupos=self
+            ).distinct().aggregate(promedio=Avg('nota'))['promedio']
         return round(float(val), 2) if val else 0.0
 
     @property
     def asistencia_mensual(self):
-        from django.db.models import Count, Case, When, IntegerField
-        now = timezone.now()
-        resultado = Asistencia.objects.filter(
-            grupo=self, fecha__month=now.month
-        ).aggregate(
-            total=Count('id'),
-            presentes=Count(Case(When(estado='P', then=1), output_field=IntegerField()))
-        )
-        total = resultado['total']
-        if total == 0:
+        if hasattr(self, 'registros_mes'):
+            asistencias, total = self.asistencias_mes, self.registros_mes
+        else:
+            from django.db.models import Sum
+            now = timezone.localdate()
+            resultado = AsistenciaMensual.objects.filter(
+                grupo=self, anio=now.year, mes=now.month
+            ).aggregate(
+                asistencias=Sum('presentes'),
+                total=Sum(models.F('presentes') + models.F('ausentes') + models.F('retardos')),
+            )
+            asistencias, total = resultado['asistencias'], resultado['total']
+        if not total:
             return 0
-        return int((resultado['presentes'] / total) * 100)
+        return int((asistencias / total) * 100)
 
 
 # ==========================================
@@ -143,6 +202,8 @@ class Asignatura(models.Model):
     nombre    = models.CharField(max_length=100)
     clave     = models.CharField(max_length=20, blank=True, null=True)
     creditos  = models.IntegerField(default=0,  blank=True, null=True)
+    # Horas de clase a la semana; 0 = usar el valor por defecto del generador de horarios
+    horas_semana = models.PositiveSmallIntegerField(default=0, verbose_name="Horas por semana")
     seriacion = models.ForeignKey(
         'self',
         on_delete=models.SET_NULL,
@@ -177,6 +238,7 @@ class Calificacion(models.Model):
         verbose_name = "Calificación"
         verbose_name_plural = "Calificaciones"
         ordering = ['-fecha']
+        unique_together = [['alumno', 'asignatura', 'grupo', 'tipo']]
 
     def __str__(self):
         return f"{self.alumno} — {self.asignatura}: {self.nota}"
@@ -205,6 +267,14 @@ class Asistencia(models.Model):
         verbose_name_plural = "Asistencias"
         ordering = ['-fecha']
         unique_together = [['alumno', 'grupo', 'asignatura', 'fecha']]
+        constraints = [
+            # unique_together no cubre asignatura nula (NULL ≠ NULL): lista general del grupo
+            models.UniqueConstraint(
+                fields=['alumno', 'grupo', 'fecha'],
+                condition=models.Q(asignatura__isnull=True),
+                name='asistencia_unica_sin_asignatura',
+            ),
+        ]
 
     @property
     def presente(self):
@@ -240,6 +310,8 @@ class HorarioClase(models.Model):
     hora_fin    = models.TimeField()
     aula        = models.CharField(max_length=50, default="Por definir")
     activo      = models.BooleanField(default=True)
+    # Plantel.version_horario en la que se tocó por última vez (delta ?since=)
+    version     = models.PositiveIntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         verbose_name = "Horario de Clase"
@@ -257,63 +329,41 @@ class HorarioClase(models.Model):
             if self.hora_inicio >= self.hora_fin:
                 errors['hora_fin'] = 'La hora de fin debe ser posterior a la de inicio.'
 
-        if not errors:
-
-            # 1. Colisión de MAESTRO (sin filtro de plantel — un maestro no puede
-            #    estar en dos lugares a la vez aunque sean planteles distintos)
-            if self.maestro_id:
-                conflicto_maestro = HorarioClase.objects.filter(
-                    dia=self.dia,
-                    maestro=self.maestro,
-                    activo=True,
-                    hora_inicio__lt=self.hora_fin,
-                    hora_fin__gt=self.hora_inicio,
-                ).exclude(pk=self.pk)
-
-                if conflicto_maestro.exists():
-                    clase = conflicto_maestro.first()
-                    errors['maestro'] = (
-                        f'El docente ya tiene "{clase.asignatura}" asignada '
-                        f'los {self.get_dia_display()} en ese horario.'
-                    )
-
-            # 2. Colisión de GRUPO (dentro del mismo plantel)
-            if self.grupo_id:
-                conflicto_grupo = HorarioClase.objects.filter(
-                    dia=self.dia,
-                    grupo=self.grupo,
-                    activo=True,
-                    hora_inicio__lt=self.hora_fin,
-                    hora_fin__gt=self.hora_inicio,
-                ).exclude(pk=self.pk)
-
-                if conflicto_grupo.exists():
-                    clase = conflicto_grupo.first()
-                    errors['grupo'] = (
-                        f'El grupo ya tiene "{clase.asignatura}" '
-                        f'los {self.get_dia_display()} en ese horario.'
-                    )
-
-            # 3. Colisión de AULA — solo dentro del mismo plantel (Fix crítico)
-            if self.aula and self.aula != "Por definir" and self.grupo_id:
-                conflicto_aula = HorarioClase.objects.filter(
-                    dia=self.dia,
-                    aula=self.aula,
-                    grupo__plantel=self.grupo.plantel,   # ← Fix: solo mismo plantel
-                    activo=True,
-                    hora_inicio__lt=self.hora_fin,
-                    hora_fin__gt=self.hora_inicio,
-                ).exclude(pk=self.pk)
-
-                if conflicto_aula.exists():
-                    errors['aula'] = f'El aula "{self.aula}" ya está ocupada en ese horario.'
+        # Choques de maestro (en cualquier plantel), grupo y aula (mismo plantel),
+        # resueltos contra el índice en memoria de academic/horarios.py
+        if not errors and self.grupo_id:
+            from .horarios import indice_horarios, mensajes_conflicto
+            conflictos = indice_horarios(self.grupo.plantel_id).buscar_conflictos(self)
+            errors.update(mensajes_conflicto(self, conflictos))
 
         if errors:
             raise ValidationError(errors)
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        # Atómico para que la versión del plantel (señales) se publique junto con el cambio
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class HorarioEliminado(models.Model):
+    """
+    Registro de HorarioClase borrados, para que el modo ?since= del JSON de
+    horarios pueda avisar de las bajas. plantel_id y clase_id son enteros
+    simples: la fila debe sobrevivir al borrado del grupo o del plantel.
+    """
+    plantel_id = models.PositiveIntegerField(db_index=True)
+    clase_id   = models.PositiveIntegerField()
+    version    = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = "Horario eliminado"
+        verbose_name_plural = "Horarios eliminados"
+        indexes = [models.Index(fields=['plantel_id', 'version'])]
 
 
 class Tarea(models.Model):
@@ -502,6 +552,41 @@ class ComentarioMaterial(models.Model):
     class Meta:
         ordering = ['creado_en']
 
+
+class EventoActividad(models.Model):
+    """
+    Notificación ya resuelta para un destinatario (fan-out al escribir, ver
+    academic/eventos.py). El feed se lee por (destinatario, creado_en, id)
+    con paginación por cursor.
+    """
+    TIPOS = [
+        ('ENTREGA_TAREA',       'Entrega de tarea'),
+        ('ENTREGA_ACTIVIDAD',   'Entrega de actividad'),
+        ('COMENTARIO_TAREA',    'Comentario en tarea'),
+        ('COMENTARIO_MATERIAL', 'Comentario en material'),
+        ('CALIFICACION',        'Calificación'),
+    ]
+    destinatario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='eventos')
+    actor        = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    tipo         = models.CharField(max_length=20, choices=TIPOS)
+    titulo       = models.CharField(max_length=200)
+    sub          = models.CharField(max_length=200, blank=True)
+    url          = models.CharField(max_length=200, blank=True)
+    creado_en    = models.DateTimeField(default=timezone.now)
+    leido        = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Evento de actividad"
+        verbose_name_plural = "Eventos de actividad"
+        ordering = ['-creado_en', '-id']
+        indexes = [
+            models.Index(fields=['destinatario', '-creado_en', '-id']),
+            models.Index(fields=['destinatario'], condition=models.Q(leido=False), name='evento_no_leido_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.destinatario} · {self.titulo}"
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PLANIFICACIÓN CURRICULAR
 # ─────────────────────────────────────────────────────────────────────────────
@@ -584,4 +669,96 @@ class TemaClase(models.Model):
         unique_together     = [['plan', 'numero']]
 
     def __str__(self):
-        return f"Sesión {self.numero}: {self.titulo}"
\ No newline at end of file
+        return f"Sesión {self.numero}: {self.titulo}"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESUMEN DE CALIFICACIONES (boleta materializada)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ResumenCalificacion(models.Model):
+    """
+    Calificación final por (alumno, asignatura, grupo), mantenida por señales
+    cada vez que se califica una entrega o se captura una nota manual.
+    Boletas, concentrados y reportes leen de aquí en lugar de recalcular.
+    Se reconstruye con: python manage.py reconstruir_resumen
+    """
+
+    alumno     = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resumenes_calificacion')
+    asignatura = models.ForeignKey(Asignatura, on_delete=models.CASCADE, related_name='resumenes_calificacion')
+    grupo      = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='resumenes_calificacion')
+
+    suma_tareas      = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    num_tareas       = models.PositiveIntegerField(default=0)
+    suma_actividades = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    num_actividades  = models.PositiveIntegerField(default=0)
+    manual           = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    promedio_final   = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    actualizado_en   = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name        = 'Resumen de Calificación'
+        verbose_name_plural = 'Resúmenes de Calificación'
+        unique_together     = [['alumno', 'asignatura', 'grupo']]
+        indexes             = [models.Index(fields=['promedio_final'])]
+
+    def __str__(self):
+        return f"{self.alumno} — {self.asignatura}: {self.promedio_final}"
+
+    @property
+    def prom_tareas(self):
+        return self.suma_tareas / self.num_tareas if self.num_tareas else None
+
+    @property
+    def prom_actividades(self):
+        return self.suma_actividades / self.num_actividades if self.num_actividades else None
+
+    def recalcular_final(self):
+        """Promedio simple de tareas, actividades y manual (los que existan)."""
+        from decimal import Decimal
+        valores = [v for v in (self.prom_tareas, self.prom_actividades, self.manual) if v is not None]
+        self.promedio_final = (
+            (sum(valores) / len(valores)).quantize(Decimal('0.01')) if valores else None
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RESUMEN MENSUAL DE ASISTENCIA
+# ─────────────────────────────────────────────────────────────────────────────
+
+class AsistenciaMensual(models.Model):
+    """
+    Conteo de P/A/R por (alumno, grupo, asignatura, año, mes), mantenido por
+    registrar_asistencia y por las señales de Asistencia. KPIs y resúmenes
+    mensuales leen de aquí en lugar de recorrer el historial de asistencia.
+    Se reconstruye con: python manage.py reconstruir_asistencia_mensual
+    """
+
+    alumno     = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='asistencias_mensuales')
+    grupo      = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='asistencias_mensuales')
+    asignatura = models.ForeignKey(Asignatura, on_delete=models.CASCADE, related_name='asistencias_mensuales', null=True, blank=True)
+    anio       = models.PositiveSmallIntegerField()
+    mes        = models.PositiveSmallIntegerField()
+
+    presentes  = models.IntegerField(default=0)
+    ausentes   = models.IntegerField(default=0)
+    retardos   = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name        = 'Asistencia Mensual'
+        verbose_name_plural = 'Asistencias Mensuales'
+        unique_together     = [['alumno', 'grupo', 'asignatura', 'anio', 'mes']]
+        constraints         = [
+            models.UniqueConstraint(
+                fields=['alumno', 'grupo', 'anio', 'mes'],
+                condition=models.Q(asignatura__isnull=True),
+                name='asistencia_mensual_unica_sin_asignatura',
+            ),
+        ]
+        indexes             = [models.Index(fields=['grupo', 'anio', 'mes'])]
+
+    def __str__(self):
+        return f"{self.alumno} — {self.grupo} {self.mes:02d}/{self.anio}"
+
+    @property
+    def total(self):
+        return self.presentes + self.ausentes + self.retardos
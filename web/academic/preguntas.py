@@ -0,0 +1,140 @@
+# academic/preguntas.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Preguntas y opciones de una Actividad (crear y editar)
+#
+# `leer_preguntas` convierte el POST del formulario en una lista de dicts.
+# Al crear, `crear_preguntas` inserta todas las preguntas con un bulk_create y
+# todas las opciones con otro. Al editar, `actualizar_preguntas` compara con
+# lo guardado y solo escribe la diferencia: las preguntas y opciones que
+# llegan con su id se conservan (con sus RespuestaAlumno), las que cambiaron
+# van en un bulk_update, las nuevas en un bulk_create y solo las que el
+# docente quitó se borran.
+#
+# bulk_create/bulk_update no disparan señales, así que si cambió la clave se
+# pide aquí la calificación automática (academic.autocalificacion).
+# ─────────────────────────────────────────────────────────────────────────────
+from decimal import Decimal, InvalidOperation
+
+from .models import OpcionRespuesta, PreguntaActividad
+
+
+def _id(valor):
+    return int(valor) if valor and str(valor).isdigit() else None
+
+
+def _puntos(valor):
+    try:
+        return Decimal(valor).quantize(Decimal('0.01'))
+    except (InvalidOperation, TypeError):
+        return Decimal(1)
+
+
+def leer_preguntas(post, tipo):
+    """
+    [{id, texto, orden, puntos, opciones: [{id, texto, es_correcta}]}] desde el
+    formulario. Cada bloque manda `pregunta_idx` con el índice de sus campos
+    `opcion_*_<idx>`; sin él se usa la posición. Se omiten las preguntas y
+    opciones sin texto.
+    """
+    textos  = post.getlist('pregunta_texto')
+    puntos  = post.getlist('pregunta_puntos')
+    ids     = post.getlist('pregunta_id')
+    indices = post.getlist('pregunta_idx')
+
+    preguntas = []
+    for i, texto in enumerate(textos):
+        if not texto.strip():
+            continue
+        idx = indices[i] if i < len(indices) else str(i)
+        opciones = []
+        if tipo == 'MULTIPLE':
+            opcion_ids = post.getlist(f'opcion_id_{idx}')
+            correcta   = post.get(f'opcion_correcta_{idx}', '0')
+            for j, op_texto in enumerate(post.getlist(f'opcion_texto_{idx}')):
+                if op_texto.strip():
+                    opciones.append({
+                        'id':          _id(opcion_ids[j]) if j < len(opcion_ids) else None,
+                        'texto':       op_texto.strip(),
+                        'es_correcta': str(j) == correcta,
+                    })
+        preguntas.append({
+            'id':       _id(ids[i]) if i < len(ids) else None,
+            'texto':    texto.strip(),
+            'orden':    i,
+            'puntos':   _puntos(puntos[i] if i < len(puntos) else 1),
+            'opciones': opciones,
+        })
+    return preguntas
+
+
+def crear_preguntas(actividad, preguntas):
+    """Inserta `preguntas` (de leer_preguntas) en dos consultas."""
+    creadas = PreguntaActividad.objects.bulk_create([
+        PreguntaActividad(actividad=actividad, texto=p['texto'], orden=p['orden'], puntos=p['puntos'])
+        for p in preguntas
+    ])
+    OpcionRespuesta.objects.bulk_create([
+        OpcionRespuesta(pregunta=pregunta, texto=o['texto'], es_correcta=o['es_correcta'])
+        for pregunta, p in zip(creadas, preguntas)
+        for o in p['opciones']
+    ])
+    return creadas
+
+
+def actualizar_preguntas(actividad, preguntas):
+    """
+    Deja las preguntas de `actividad` como `preguntas`, escribiendo solo la
+    diferencia. Devuelve {'creadas', 'actualizadas', 'borradas'} en preguntas.
+    Debe llamarse dentro de una transacción.
+    """
+    actuales = {p.pk: p for p in PreguntaActividad.objects.filter(actividad=actividad)}
+    opciones_de = {}
+    for o in OpcionRespuesta.objects.filter(pregunta__actividad=actividad):
+        opciones_de.setdefault(o.pregunta_id, {})[o.pk] = o
+
+    nuevas, cambiadas, conservadas = [], [], set()
+    opciones_nuevas, opciones_cambiadas, opciones_conservadas = [], [], set()
+    for p in preguntas:
+        pregunta = actuales.get(p['id'])
+        if pregunta is None or pregunta.pk in conservadas:
+            nuevas.append(p)
+            continue
+        conservadas.add(pregunta.pk)
+        if (pregunta.texto, pregunta.orden, pregunta.puntos) != (p['texto'], p['orden'], p['puntos']):
+            pregunta.texto, pregunta.orden, pregunta.puntos = p['texto'], p['orden'], p['puntos']
+            cambiadas.append(pregunta)
+
+        previas = opciones_de.get(pregunta.pk, {})
+        for o in p['opciones']:
+            opcion = previas.get(o['id'])
+            if opcion is None or opcion.pk in opciones_conservadas:
+                opciones_nuevas.append(OpcionRespuesta(pregunta=pregunta, texto=o['texto'], es_correcta=o['es_correcta']))
+                continue
+            opciones_conservadas.add(opcion.pk)
+            if (opcion.texto, opcion.es_correcta) != (o['texto'], o['es_correcta']):
+                opcion.texto, opcion.es_correcta = o['texto'], o['es_correcta']
+                opciones_cambiadas.append(opcion)
+
+    borradas = set(actuales) - conservadas
+    opciones_borradas = {
+        pk for pregunta_id, previas in opciones_de.items() if pregunta_id in conservadas
+        for pk in previas if pk not in opciones_conservadas
+    }
+    if borradas:
+        PreguntaActividad.objects.filter(pk__in=borradas).delete()
+    if opciones_borradas:
+        OpcionRespuesta.objects.filter(pk__in=opciones_borradas).delete()
+    if cambiadas:
+        PreguntaActividad.objects.bulk_update(cambiadas, ['texto', 'orden', 'puntos'])
+    if opciones_cambiadas:
+        OpcionRespuesta.objects.bulk_update(opciones_cambiadas, ['texto', 'es_correcta'])
+    if opciones_nuevas:
+        OpcionRespuesta.objects.bulk_create(opciones_nuevas)
+    if nuevas:
+        crear_preguntas(actividad, nuevas)
+
+    if borradas or opciones_borradas or cambiadas or opciones_cambiadas or opciones_nuevas or nuevas:
+        from .autocalificacion import es_automatica, programar
+        if es_automatica(actividad):
+            programar(actividad.pk)
+    return {'creadas': len(nuevas), 'actualizadas': len(cambiadas), 'borradas': len(borradas)}
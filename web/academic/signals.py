@@ -0,0 +1,220 @@
+# academic/signals.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Mantenimiento incremental de ResumenCalificacion y AsistenciaMensual,
+# invalidación del índice de horarios, fan-out del feed de actividad y
+# calificación automática de opción múltiple.
+# Se registran en AcademicConfig.ready().
+# ─────────────────────────────────────────────────────────────────────────────
+from decimal import Decimal
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    Calificacion, EntregaTarea, EntregaActividad, Asistencia, HorarioClase,
+    ComentarioTarea, ComentarioMaterial,
+    Actividad, PreguntaActividad, OpcionRespuesta, RespuestaAlumno,
+)
+from .calificaciones import aplicar_delta, actualizar_manual
+from .asistencias import aplicar_cambios_mensuales
+from .horarios import invalidar_horarios, registrar_bajas
+from .autocalificacion import programar, es_automatica
+from . import eventos
+
+
+def _celda_entrega(entrega):
+    """(alumno_id, asignatura_id, grupo_id, campo) de una EntregaTarea/EntregaActividad."""
+    if isinstance(entrega, EntregaTarea):
+        padre, campo = entrega.tarea, 'tareas'
+    else:
+        padre, campo = entrega.actividad, 'actividades'
+    return entrega.alumno_id, padre.asignatura_id, padre.grupo_id, campo
+
+
+def _nota(valor):
+    """La calificación como Decimal: las vistas asignan el texto del POST ('8')."""
+    return Decimal(str(valor)) if valor not in (None, '') else None
+
+
+@receiver(pre_save, sender=EntregaTarea)
+@receiver(pre_save, sender=EntregaActividad)
+def recordar_calificacion_previa(sender, instance, **kwargs):
+    instance._calificacion_previa = (
+        sender.objects.filter(pk=instance.pk).values_list('calificacion', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=EntregaTarea)
+@receiver(post_save, sender=EntregaActividad)
+def entrega_guardada(sender, instance, **kwargs):
+    previa = getattr(instance, '_calificacion_previa', None)
+    aplicar_delta(*_celda_entrega(instance), previa=previa, nueva=_nota(instance.calificacion))
+
+
+@receiver(post_delete, sender=EntregaTarea)
+@receiver(post_delete, sender=EntregaActividad)
+def entrega_eliminada(sender, instance, **kwargs):
+    if instance.calificacion is not None:
+        aplicar_delta(*_celda_entrega(instance), previa=instance.calificacion, nueva=None)
+
+
+@receiver(post_save, sender=Calificacion)
+@receiver(post_delete, sender=Calificacion)
+def calificacion_cambiada(sender, instance, **kwargs):
+    if instance.tipo != 'MANUAL':
+        return
+    grupo_id = instance.grupo_id or instance.alumno.alumno_grupo_id
+    if grupo_id:
+        actualizar_manual(instance.alumno_id, instance.asignatura_id, grupo_id)
+
+
+# ── Asistencia → AsistenciaMensual ───────────────────────────────────────────
+# registrar_asistencia escribe en bloque (sin señales) y actualiza el resumen
+# por su cuenta; estas señales cubren las ediciones sueltas (admin, shell).
+
+def _mes_asistencia(grupo_id, asignatura_id, fecha):
+    """(grupo_id, asignatura_id, fecha) con la fecha normalizada a date."""
+    return grupo_id, asignatura_id, Asistencia._meta.get_field('fecha').to_python(fecha)
+
+
+def _mismo_mes(a, b):
+    return a[:2] == b[:2] and (a[2].year, a[2].month) == (b[2].year, b[2].month)
+
+
+@receiver(pre_save, sender=Asistencia)
+def recordar_asistencia_previa(sender, instance, **kwargs):
+    instance._asistencia_previa = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list('grupo_id', 'asignatura_id', 'fecha', 'estado').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Asistencia)
+def asistencia_guardada(sender, instance, **kwargs):
+    actual = _mes_asistencia(instance.grupo_id, instance.asignatura_id, instance.fecha)
+    previo = None
+    if getattr(instance, '_asistencia_previa', None):
+        *clave, estado_previo = instance._asistencia_previa
+        anterior = _mes_asistencia(*clave)
+        if _mismo_mes(anterior, actual):
+            previo = estado_previo
+        else:
+            aplicar_cambios_mensuales(*anterior, {instance.alumno_id: (estado_previo, None)})
+    aplicar_cambios_mensuales(*actual, {instance.alumno_id: (previo, instance.estado)})
+
+
+@receiver(post_delete, sender=Asistencia)
+def asistencia_eliminada(sender, instance, **kwargs):
+    aplicar_cambios_mensuales(
+        *_mes_asistencia(instance.grupo_id, instance.asignatura_id, instance.fecha),
+        {instance.alumno_id: (instance.estado, None)},
+    )
+
+
+# ── HorarioClase → Plantel.version_horario ───────────────────────────────────
+
+@receiver(pre_save, sender=HorarioClase)
+def recordar_horario_previo(sender, instance, **kwargs):
+    instance._horario_previo = (
+        sender.objects.filter(pk=instance.pk).values_list('grupo_id', 'maestro_id').first()
+        if instance.pk else None
+    ) or (None, None)
+
+
+@receiver(post_save, sender=HorarioClase)
+def horario_guardado(sender, instance, **kwargs):
+    grupo_previo, maestro_previo = getattr(instance, '_horario_previo', (None, None))
+    invalidar_horarios(
+        grupo_ids=[instance.grupo_id, grupo_previo],
+        maestro_ids=[instance.maestro_id, maestro_previo],
+        clase_ids=[instance.pk],
+    )
+    if grupo_previo and grupo_previo != instance.grupo_id:
+        # Para el JSON del plantel anterior la clase es una baja
+        registrar_bajas([(instance.pk, grupo_previo)])
+
+
+@receiver(post_delete, sender=HorarioClase)
+def horario_eliminado(sender, instance, **kwargs):
+    invalidar_horarios(grupo_ids=[instance.grupo_id], maestro_ids=[instance.maestro_id])
+    registrar_bajas([(instance.pk, instance.grupo_id)])
+
+
+# ── Feed de actividad (EventoActividad) ──────────────────────────────────────
+# Las entregas calificadas aquí son las que se guardan una por una; el guardado
+# en bloque de calificaciones manuales publica sus eventos en guardar_notas.
+
+@receiver(post_save, sender=EntregaTarea)
+@receiver(post_save, sender=EntregaActividad)
+def entrega_al_feed(sender, instance, created, **kwargs):
+    nuevos = eventos.eventos_entrega(instance) if created else []
+    previa = getattr(instance, '_calificacion_previa', None)
+    nueva  = _nota(instance.calificacion)
+    if nueva is not None and nueva != previa:
+        nuevos += eventos.eventos_calificacion(instance)
+    eventos.publicar(nuevos)
+
+
+@receiver(post_save, sender=ComentarioTarea)
+def comentario_tarea_al_feed(sender, instance, created, **kwargs):
+    if created:
+        eventos.publicar(eventos.eventos_comentario_tarea(instance))
+
+
+@receiver(post_save, sender=ComentarioMaterial)
+def comentario_material_al_feed(sender, instance, created, **kwargs):
+    if created:
+        eventos.publicar(eventos.eventos_comentario_material(instance))
+
+
+# ── Opción múltiple → calificación automática ────────────────────────────────
+# Guardar respuestas califica esa entrega; cambiar preguntas, opciones, el
+# valor o el tipo de calificación de la actividad vuelve a calificar todas.
+# programar() junta lo de una misma transacción en una sola pasada.
+
+@receiver(post_save, sender=RespuestaAlumno)
+def respuesta_guardada(sender, instance, **kwargs):
+    programar(instance.entrega.actividad_id, instance.entrega_id)
+
+
+@receiver(post_save, sender=PreguntaActividad)
+@receiver(post_delete, sender=PreguntaActividad)
+def pregunta_cambiada(sender, instance, **kwargs):
+    programar(instance.actividad_id)
+
+
+@receiver(post_save, sender=OpcionRespuesta)
+@receiver(post_delete, sender=OpcionRespuesta)
+def opcion_cambiada(sender, instance, **kwargs):
+    actividad_id = (
+        PreguntaActividad.objects.filter(pk=instance.pregunta_id)
+        .values_list('actividad_id', flat=True).first()
+    )
+    if actividad_id:
+        programar(actividad_id)
+
+
+def _clave_actividad(tipo, calificacion_automatica, valor_total):
+    return tipo, bool(calificacion_automatica), Decimal(str(valor_total))
+
+
+@receiver(pre_save, sender=Actividad)
+def recordar_actividad_previa(sender, instance, **kwargs):
+    previa = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list('tipo', 'calificacion_automatica', 'valor_total').first()
+        if instance.pk else None
+    )
+    instance._clave_previa = _clave_actividad(*previa) if previa else None
+
+
+@receiver(post_save, sender=Actividad)
+def actividad_guardada(sender, instance, created, **kwargs):
+    # Publicar o cambiar el título no recalifica: una nota ajustada a mano se
+    # respeta hasta que cambie algo que afecte la calificación automática.
+    previa = getattr(instance, '_clave_previa', None)
+    actual = _clave_actividad(instance.tipo, instance.calificacion_automatica, instance.valor_total)
+    if not created and previa != actual and es_automatica(instance):
+        programar(instance.pk)
@@ -33,9 +33,11 @@ urlpatterns = [
     path('clase/crear/',                     views.crear_clase,             name='crear_clase'),
     path('clase/editar/<int:clase_id>/',     views.editar_clase,            name='editar_clase'),       # ← NUEVO
     path('clase/eliminar/<int:clase_id>/',   views.eliminar_clase,          name='eliminar_clase'),
+    path('horarios/generar/',                views.generar_horarios,        name='generar_horarios'),
 
     # ── API AJAX (opcional, validación server-side en tiempo real) ────────────
     path('api/conflicto/',                   views.api_verificar_conflicto, name='api_verificar_conflicto'),  # ← NUEVO
+    path('api/horarios/',                    views.api_horarios_plantel,    name='api_horarios_plantel'),
 
     # ── PROCESOS ──────────────────────────────────────────────────────────────
     path('promocion-masiva/',                views.promocion_masiva,        name='promocion_masiva'),
@@ -1,11 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import F, Q, Avg, Count, Case, When, IntegerField
 import datetime
 import json
 from django.http import JsonResponse
-from .models import Grupo, Periodo, Asignatura, Calificacion, Asistencia, Carrera, HorarioClase
+from .models import (
+    Grupo, Periodo, Asignatura, Calificacion, Asistencia, Carrera, HorarioClase,
+    ResumenCalificacion,
+)
+from .calificaciones import validar_notas, guardar_notas
+from .asistencias import registrar_asistencia
+from .horarios import (
+    indice_horarios, invalidar_horarios, mensajes_conflicto, rejilla_horario,
+    version_horario, horarios_plantel_json,
+)
 from users.models import User, Tutor
 from .forms import GrupoForm, AsignaturaForm, AlumnoForm, TutorForm
 from users.views import get_campus_theme
@@ -56,35 +66,6 @@ def get_plantel_context(user):
     }
 
 
-def _horarios_plantel_json(plantel):
-    """
-    Serializa todos los HorarioClase activos del plantel a JSON.
-    Se inyecta en el template para verificación de conflictos en el frontend.
-    """
-    horarios = (
-        HorarioClase.objects
-        .filter(grupo__plantel=plantel, activo=True)
-        .select_related('asignatura', 'maestro', 'grupo')
-    )
-    data = [
-        {
-            "id":                h.id,
-            "grupo_id":          h.grupo_id,
-            "grupo_nombre":      str(h.grupo),
-            "maestro_id":        h.maestro_id,
-            "maestro_nombre":    h.maestro.get_full_name(),
-            "asignatura_id":     h.asignatura_id,
-            "asignatura_nombre": h.asignatura.nombre,
-            "dia":               h.dia,
-            "hora_inicio":       h.hora_inicio.strftime("%H:%M"),
-            "hora_fin":          h.hora_fin.strftime("%H:%M"),
-            "aula":              h.aula or "",
-        }
-        for h in horarios
-    ]
-    return json.dumps(data, ensure_ascii=False)
-
-
 def _hora_str_a_time(h: str) -> dtime:
     hh, mm = h.split(":")
     return dtime(int(hh), int(mm))
@@ -127,7 +108,12 @@ def actualizar_aulas(request):
 def lista_grupos(request):
     theme   = get_campus_theme(request.user)
     plantel = request.user.plantel
-    grupos_base = Grupo.objects.filter(plantel=plantel).prefetch_related('docentes', 'alumnos')
+    grupos_base = (
+        Grupo.objects.filter(plantel=plantel)
+        .select_related('carrera')
+        .prefetch_related('docentes')
+        .with_kpis()
+    )
 
     total_aulas        = getattr(plantel, 'total_aulas', 20)
     aulas_ocupadas     = grupos_base.count()
@@ -143,42 +129,26 @@ def lista_grupos(request):
     }
 
     def get_kpis(queryset):
-        from django.db.models import Count, Case, When, IntegerField, FloatField
-        from django.utils import timezone
-        now = timezone.now()
-
-        total = queryset.count()
+        # len() evalúa el queryset (anotado con with_kpis) y el template reutiliza ese resultado
+        total  = len(queryset)
+        grupos = list(queryset)
         if total == 0:
             return {'total': 0, 'promedio': 0.0, 'asistencia': 0, 'alertas': 0}
 
         # 1 query para promedio de calificaciones
         avg = Calificacion.objects.filter(
-            asignatura__grupos__in=queryset
+            asignatura__grupos__in=[g.pk for g in grupos]
         ).distinct().aggregate(Avg('nota'))['nota__avg']
         promedio = round(avg, 1) if avg else 0.0
 
-        # 1 query para asistencia del mes (en vez de 2 por grupo)
-        asistencia_data = Asistencia.objects.filter(
-            grupo__in=queryset,
-            fecha__month=now.month
-        ).aggregate(
-            total=Count('id'),
-            presentes=Count(Case(When(estado='P', then=1), output_field=IntegerField()))
-        )
-        if asistencia_data['total']:
-            asistencia = int(asistencia_data['presentes'] / asistencia_data['total'] * 100)
-        else:
-            asistencia = 0
-
-        # 1 query para alertas usando anotaciones
-        grupos_con_datos = queryset.annotate(
-            num_asignaturas=Count('asignaturas', distinct=True),
-            num_alumnos=Count('alumnos', distinct=True)
-        )
+        # Asistencia del mes y alertas, con las anotaciones de cada grupo
+        registros   = sum(g.registros_mes or 0 for g in grupos)
+        asistencias = sum(g.asistencias_mes or 0 for g in grupos)
+        asistencia  = int(asistencias / registros * 100) if registros else 0
         alertas = sum(
-            1 for g in grupos_con_datos
-            if g.num_asignaturas == 0
-            or (g.capacidad_maxima > 0 and g.num_alumnos >= g.capacidad_maxima)
+            1 for g in grupos
+            if g.total_asignaturas == 0
+            or (g.capacidad_maxima > 0 and g.total_alumnos >= g.capacidad_maxima)
         )
         return {'total': total, 'promedio': promedio, 'asistencia': asistencia, 'alertas': alertas}
 
@@ -366,6 +336,7 @@ def crear_materia(request):
             nombre   = form.cleaned_data['nombre']
             clave    = form.cleaned_data['clave']
             creditos = form.cleaned_data['creditos']
+            horas    = form.cleaned_data['horas_semana']
             grado    = form.cleaned_data['grado_destino']
             nivel    = form.cleaned_data['nivel_academico']
             docentes_seleccionados = form.cleaned_data['docentes']
@@ -377,7 +348,8 @@ def crear_materia(request):
                 from users.models import DocenteGrupo
                 nueva_asignatura = Asignatura.objects.create(
                     carrera=grupos_coincidentes.first().carrera,
-                    nombre=nombre, clave=clave, creditos=creditos
+                    nombre=nombre, clave=clave, creditos=creditos,
+                    horas_semana=horas,
                 )
                 nueva_asignatura.grupos.set(grupos_coincidentes)
                 if docentes_seleccionados:
@@ -518,16 +490,10 @@ def pasar_lista(request, grupo_id):
 
     if request.method == 'POST' and 'guardar' in request.POST:
         presentes_ids = set(request.POST.getlist('presentes'))
-        
-        for alumno in alumnos:
-            estado = 'P' if str(alumno.id) in presentes_ids else 'A'
-            Asistencia.objects.update_or_create(
-                alumno=alumno,
-                grupo=grupo,
-                asignatura=None,
-                fecha=hoy,
-                defaults={'estado': estado},
-            )
+        registrar_asistencia(grupo, None, hoy, {
+            alumno_id: 'P' if str(alumno_id) in presentes_ids else 'A'
+            for alumno_id in alumnos.values_list('pk', flat=True)
+        })
 
         messages.success(
             request,
@@ -559,34 +525,37 @@ def registrar_calificaciones(request, grupo_id, asignatura_id):
     asignatura = get_object_or_404(Asignatura, pk=asignatura_id)
     ctx        = get_plantel_context(request.user)
     alumnos    = User.objects.filter(rol='ALUMNO', alumno_grupo=grupo).order_by('last_name', 'first_name')
-    existentes = {
-        c.alumno_id: c.nota
-        for c in Calificacion.objects.filter(alumno__in=alumnos, asignatura=asignatura)
-    }
+    existentes = dict(
+        Calificacion.objects
+        .filter(grupo=grupo, asignatura=asignatura, tipo='MANUAL')
+        .values_list('alumno_id', 'nota')
+    )
+    errores = {}
 
     if request.method == 'POST':
-        guardados, errores = 0, []
-        for alumno in alumnos:
-            raw = request.POST.get(f'nota_{alumno.id}', '').strip()
-            if raw == '':
-                continue
-            try:
-                nota = round(max(0.0, min(10.0, float(raw.replace(',', '.')))), 2)
-                Calificacion.objects.update_or_create(
-                    alumno=alumno, asignatura=asignatura, defaults={'nota': nota}
-                )
-                guardados += 1
-            except ValueError:
-                errores.append(alumno.get_full_name())
+        alumnos_ids = set(alumnos.values_list('pk', flat=True))
+        capturadas  = {
+            (alumno_id, asignatura.pk): request.POST.get(f'nota_{alumno_id}', '')
+            for alumno_id in alumnos_ids
+        }
+        notas, errores_celda = validar_notas(capturadas, alumnos_ids, {asignatura.pk})
+        errores = {alumno_id: msg for (alumno_id, _), msg in errores_celda.items()}
 
-        if guardados:
-            messages.success(request, f"{guardados} calificaciones guardadas en {asignatura.nombre}.")
-        if errores:
-            messages.warning(request, f"Notas inválidas ignoradas: {', '.join(errores)}.")
-        return redirect('reporte_calificaciones', grupo_id=grupo_id)
+        if not errores:
+            guardados = guardar_notas(grupo, notas, docente=request.user)
+            if guardados:
+                messages.success(request, f"{guardados} calificaciones guardadas en {asignatura.nombre}.")
+            return redirect('reporte_calificaciones', grupo_id=grupo_id)
+
+        nombres = {a.pk: a.get_full_name() for a in alumnos}
+        messages.warning(request, "No se guardó ningún cambio. Notas inválidas: " + "; ".join(
+            f"{nombres[alumno_id]} ({msg})" for alumno_id, msg in errores.items()
+        ))
+        existentes.update({alumno_id: texto for (alumno_id, _), texto in capturadas.items() if texto.strip()})
 
     return render(request, 'academic/calificaciones_form.html', {
-        'grupo': grupo, 'asignatura': asignatura, 'alumnos': alumnos, 'existentes': existentes, **ctx,
+        'grupo': grupo, 'asignatura': asignatura, 'alumnos': alumnos,
+        'existentes': existentes, 'errores': errores, **ctx,
     })
 
 
@@ -597,12 +566,18 @@ def reporte_calificaciones(request, grupo_id):
     alumnos     = User.objects.filter(rol='ALUMNO', alumno_grupo=grupo).order_by('last_name', 'first_name')
     asignaturas = grupo.asignaturas.all()
 
+    finales = {
+        (alumno_id, asig_id): nota
+        for alumno_id, asig_id, nota in ResumenCalificacion.objects.filter(
+            grupo=grupo, promedio_final__isnull=False,
+        ).values_list('alumno_id', 'asignatura_id', 'promedio_final')
+    }
     tabla = {}
     for alumno in alumnos:
         tabla[alumno.id] = {}
         for asig in asignaturas:
-            cal = Calificacion.objects.filter(alumno=alumno, asignatura=asig).first()
-            tabla[alumno.id][asig.id] = float(cal.nota) if cal else None
+            nota = finales.get((alumno.id, asig.id))
+            tabla[alumno.id][asig.id] = float(nota) if nota is not None else None
 
     promedios = {}
     for alumno in alumnos:
@@ -634,36 +609,17 @@ def gestionar_horario_grupo(request, grupo_id):
         messages.error(request, "Solo puedes gestionar horarios de los grupos que tienes asignados.")
         return redirect('lista_grupos')
 
-    dias_lista = [
-        ('LU', 'Lunes'), ('MA', 'Martes'), ('MI', 'Miércoles'),
-        ('JU', 'Jueves'), ('VI', 'Viernes'),
-    ]
-    horas_lista = [
-        "07:00", "08:00", "09:00", "10:00",
-        "11:00", "12:00", "13:00", "14:00",
-    ]
     dias_opciones = [
         ('LU', 'Lunes'), ('MA', 'Martes'), ('MI', 'Miércoles'),
         ('JU', 'Jueves'), ('VI', 'Viernes'), ('SA', 'Sábado'),
     ]
 
-    horarios_qs = (
+    clases = (
         HorarioClase.objects
         .filter(grupo=grupo, activo=True)
         .select_related('asignatura', 'maestro')
     )
-
-    matriz = {}
-    for hora in horas_lista:
-        t = _hora_str_a_time(hora)
-        matriz[hora] = {}
-        for dia_code, _ in dias_lista:
-            clase = horarios_qs.filter(
-                dia=dia_code,
-                hora_inicio__hour=t.hour,
-                hora_inicio__minute=t.minute,
-            ).first()
-            matriz[hora][dia_code] = clase
+    dias_lista, rejilla = rejilla_horario(clases, plantel)
 
     DIA_HOY_MAP = {0: 'LU', 1: 'MA', 2: 'MI', 3: 'JU', 4: 'VI', 5: 'SA', 6: 'SA'}
     dia_hoy = DIA_HOY_MAP.get(datetime.date.today().weekday(), '')
@@ -679,13 +635,12 @@ def gestionar_horario_grupo(request, grupo_id):
         'grupo':         grupo,
         'dias_lista':    dias_lista,
         'dias_opciones': dias_opciones,
-        'horas_lista':   horas_lista,
-        'matriz':        matriz,
+        'rejilla':       rejilla,
+        'duracion':      plantel.duracion_bloque,
         'dia_hoy':       dia_hoy,
         'asignaturas':   asignaturas,
         'maestros':      maestros,
         'puede_editar':  request.user.rol in ('DIRECTOR', 'COORD'),
-        'horarios_json': _horarios_plantel_json(plantel),
         'rol':           request.user.rol,
     })
 
@@ -724,17 +679,32 @@ def crear_clase(request):
                 asignatura = get_object_or_404(Asignatura, id=asignatura_id)
                 maestro    = get_object_or_404(User,       id=maestro_id)
 
-                creados, errores_ve = 0, []
+                # Un solo índice para todos los días; las clases válidas se insertan juntas
+                indice = indice_horarios(plantel_usuario)
+                nuevas, errores_ve = [], []
                 for dia_code in dias_seleccionados:
+                    clase = HorarioClase(
+                        grupo=grupo, asignatura=asignatura, maestro=maestro,
+                        dia=dia_code, hora_inicio=hora_inicio, hora_fin=hora_fin, aula=aula,
+                    )
                     try:
-                        HorarioClase.objects.create(
-                            grupo=grupo, asignatura=asignatura, maestro=maestro,
-                            dia=dia_code, hora_inicio=hora_inicio, hora_fin=hora_fin, aula=aula,
-                        )
-                        creados += 1
+                        clase.clean_fields(exclude=['grupo', 'asignatura', 'maestro'])  # ya cargados arriba
+                        conflictos = mensajes_conflicto(clase, indice.buscar_conflictos(clase))
+                        if conflictos:
+                            raise ValidationError(conflictos)
+                        nuevas.append(clase)
                     except ValidationError as ve:
                         errores_ve.append(_extraer_mensaje_ve(ve))
 
+                if nuevas:
+                    with transaction.atomic():
+                        HorarioClase.objects.bulk_create(nuevas)
+                        invalidar_horarios(
+                            grupo_ids=[grupo.pk], maestro_ids=[maestro.pk],
+                            clase_ids=[c.pk for c in nuevas],
+                        )
+                creados = len(nuevas)
+
                 if creados:
                     messages.success(request, f"✅ {creados} bloque(s) guardados para {grupo.nombre}.")
                 for err in errores_ve:
@@ -760,7 +730,6 @@ def crear_clase(request):
             ('LU', 'Lunes'), ('MA', 'Martes'), ('MI', 'Miércoles'),
             ('JU', 'Jueves'), ('VI', 'Viernes'), ('SA', 'Sábado'),
         ],
-        'horarios_json': _horarios_plantel_json(plantel_usuario),
         **theme
     })
 
@@ -804,8 +773,7 @@ def editar_clase(request, clase_id):
             clase.hora_inicio = hora_inicio
             clase.hora_fin    = hora_fin
             clase.aula        = aula
-            clase.full_clean()
-            clase.save()
+            clase.save()   # save() ya ejecuta full_clean()
 
             messages.success(request, f"✅ Clase '{asignatura.nombre}' actualizada.")
             return redirect('gestionar_horario', grupo_id=clase.grupo_id)
@@ -832,6 +800,51 @@ def eliminar_clase(request, clase_id):
     return redirect('gestionar_horario', grupo_id=clase.grupo_id)
 
 
+@rol_requerido('DIRECTOR')
+def generar_horarios(request):
+    """Genera el horario de todo el plantel con academic.generador_horarios."""
+    from .generador_horarios import GeneradorHorarios, HorarioDesactualizado, SEGUNDOS_POR_DEFECTO
+
+    plantel = request.user.plantel
+    reporte = None
+    opciones = {'segundos': SEGUNDOS_POR_DEFECTO, 'reemplazar': False, 'simular': True}
+
+    if request.method == 'POST':
+        try:
+            segundos = float(request.POST.get('segundos') or SEGUNDOS_POR_DEFECTO)
+        except ValueError:
+            segundos = SEGUNDOS_POR_DEFECTO
+        opciones = {
+            # La petición debe terminar antes del timeout del worker; para más tiempo, el comando
+            'segundos':   min(max(segundos, 1), 25),
+            'reemplazar': request.POST.get('reemplazar') == 'on',
+            'simular':    request.POST.get('simular') == 'on',
+        }
+        generador = GeneradorHorarios(
+            plantel, reemplazar=opciones['reemplazar'], segundos=opciones['segundos'],
+        )
+        reporte = generador.resolver()
+        if not opciones['simular']:
+            try:
+                clases = generador.guardar()
+            except HorarioDesactualizado as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(
+                    request,
+                    f"Horario generado: {len(clases)} clases nuevas, "
+                    f"{reporte['horas_colocadas']} de {reporte['horas_pedidas']} horas colocadas."
+                )
+
+    return render(request, 'academic/generar_horarios.html', {
+        'plantel':  plantel,
+        'opciones': opciones,
+        'reporte':  reporte,
+        'grupos':   Grupo.objects.filter(plantel=plantel).count(),
+        'docentes': User.objects.filter(plantel=plantel, rol='DOCENTE').count(),
+    })
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # HORARIOS — VISTA ALUMNO (solo lectura)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -849,7 +862,8 @@ def carga_horaria_alumno(request):
             .filter(plantel=plantel)
             .order_by('grado', 'nombre')
             .select_related('carrera')
-            .prefetch_related('alumnos', 'docentes')
+            .prefetch_related('docentes')
+            .with_kpis()
         )
         grupos_sec   = grupos_base.filter(carrera__nivel='SECUNDARIA')
         grupos_prepa = grupos_base.filter(carrera__nivel='PREPARATORIA')
@@ -867,7 +881,8 @@ def carga_horaria_alumno(request):
             .filter(plantel=plantel, docentes=request.user)
             .order_by('grado', 'nombre')
             .select_related('carrera')
-            .prefetch_related('alumnos', 'docentes')
+            .prefetch_related('docentes')
+            .with_kpis()
         )
         grupos_sec   = grupos_base.filter(carrera__nivel='SECUNDARIA')
         grupos_prepa = grupos_base.filter(carrera__nivel='PREPARATORIA')
@@ -910,49 +925,80 @@ def api_verificar_conflicto(request):
 
     try:
         data       = json.loads(request.body)
-        maestro_id = data.get('maestro_id')
-        grupo_id   = data.get('grupo_id')
         aula       = data.get('aula', '').strip()
         dia        = data.get('dia')
         hora_ini   = data.get('hora_inicio')
         hora_fin   = data.get('hora_fin')
-        excluir_id = data.get('excluir_id')
+        dias       = dict(HorarioClase.DIAS_SEMANA)
 
         if not all([dia, hora_ini, hora_fin]):
             return JsonResponse({'ok': True, 'conflictos': []})
 
-        qs = HorarioClase.objects.filter(
-            dia=dia, activo=True,
-            hora_inicio__lt=hora_fin, hora_fin__gt=hora_ini,
-            grupo__plantel=request.user.plantel,
+        # El índice compara ids enteros: "3" no encontraría al grupo 3
+        try:
+            maestro_id, grupo_id, excluir_id = (
+                int(data[c]) if data.get(c) not in (None, '') else None
+                for c in ('maestro_id', 'grupo_id', 'excluir_id')
+            )
+        except (TypeError, ValueError):
+            return JsonResponse({'ok': False, 'conflictos': ['Identificador no válido.']}, status=400)
+
+        candidata = HorarioClase(
+            pk=excluir_id or None, dia=dia, aula=aula,
+            hora_inicio=hora_ini, hora_fin=hora_fin,
+            maestro_id=maestro_id or None, grupo_id=grupo_id or None,
         )
-        if excluir_id:
-            qs = qs.exclude(pk=excluir_id)
+        encontrados = indice_horarios(request.user.plantel).buscar_conflictos(candidata)
 
         conflictos = []
-        if maestro_id:
-            conf = qs.filter(maestro_id=maestro_id).select_related('asignatura').first()
-            if conf:
-                conflictos.append(
-                    f"El docente ya tiene '{conf.asignatura.nombre}' "
-                    f"los {conf.get_dia_display()} {conf.hora_inicio:%H:%M}–{conf.hora_fin:%H:%M}."
-                )
-        if grupo_id:
-            conf = qs.filter(grupo_id=grupo_id).select_related('asignatura').first()
-            if conf:
-                conflictos.append(
-                    f"El grupo ya tiene '{conf.asignatura.nombre}' "
-                    f"los {conf.get_dia_display()} {conf.hora_inicio:%H:%M}–{conf.hora_fin:%H:%M}."
-                )
-        if aula and aula != 'Por definir':
-            conf = qs.filter(aula=aula).select_related('asignatura').first()
-            if conf:
-                conflictos.append(
-                    f"El aula '{aula}' está ocupada con '{conf.asignatura.nombre}' "
-                    f"{conf.hora_inicio:%H:%M}–{conf.hora_fin:%H:%M}."
-                )
+        if 'maestro' in encontrados:
+            conf = encontrados['maestro']
+            conflictos.append(
+                f"El docente ya tiene '{conf.asignatura}' "
+                f"los {dias[conf.dia]} {conf.inicio:%H:%M}–{conf.fin:%H:%M}."
+            )
+        if 'grupo' in encontrados:
+            conf = encontrados['grupo']
+            conflictos.append(
+                f"El grupo ya tiene '{conf.asignatura}' "
+                f"los {dias[conf.dia]} {conf.inicio:%H:%M}–{conf.fin:%H:%M}."
+            )
+        if 'aula' in encontrados:
+            conf = encontrados['aula']
+            conflictos.append(
+                f"El aula '{aula}' está ocupada con '{conf.asignatura}' "
+                f"{conf.inicio:%H:%M}–{conf.fin:%H:%M}."
+            )
 
         return JsonResponse({'ok': len(conflictos) == 0, 'conflictos': conflictos})
 
     except Exception as e:
-        return JsonResponse({'ok': False, 'conflictos': [str(e)]})
\ No newline at end of file
+        return JsonResponse({'ok': False, 'conflictos': [str(e)]})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# API AJAX: clases del plantel para el editor (versionado, ETag y ?since=)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@rol_requerido('DIRECTOR', 'COORD', 'DOCENTE')
+def api_horarios_plantel(request):
+    from django.http import HttpResponseNotModified
+    from django.utils.cache import patch_cache_control
+
+    plantel_id = request.user.plantel_id
+    version    = version_horario(plantel_id) or 0
+    try:
+        desde = int(request.GET['since'])
+    except (KeyError, ValueError):
+        desde = None
+    if desde is not None and not 0 <= desde <= version:
+        desde = None
+
+    etag = f'"horarios-{plantel_id}-{version}-{"" if desde is None else desde}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(horarios_plantel_json(plantel_id, version, desde))
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campuses', '0003_plantel_total_aulas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantel',
+            name='version_horario',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
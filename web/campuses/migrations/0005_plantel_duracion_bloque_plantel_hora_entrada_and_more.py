@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:10
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campuses', '0004_plantel_version_horario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantel',
+            name='duracion_bloque',
+            field=models.PositiveSmallIntegerField(default=60, verbose_name='Duración del bloque (min)'),
+        ),
+        migrations.AddField(
+            model_name='plantel',
+            name='hora_entrada',
+            field=models.TimeField(default=datetime.time(7, 0)),
+        ),
+        migrations.AddField(
+            model_name='plantel',
+            name='hora_salida',
+            field=models.TimeField(default=datetime.time(15, 0)),
+        ),
+        migrations.AddField(
+            model_name='plantel',
+            name='incluye_sabado',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,4 +1,6 @@
 # web/campuses/models.py
+import datetime
+
 from django.db import models
 
 class Plantel(models.Model):
@@ -14,6 +16,13 @@ class Plantel(models.Model):
     logo_url = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     total_aulas = models.PositiveIntegerField(default=20, verbose_name="Capacidad de Aulas")
+    # Rejilla del horario semanal (gestionar_horario)
+    hora_entrada    = models.TimeField(default=datetime.time(7, 0))
+    hora_salida     = models.TimeField(default=datetime.time(15, 0))
+    duracion_bloque = models.PositiveSmallIntegerField(default=60, verbose_name="Duración del bloque (min)")
+    incluye_sabado  = models.BooleanField(default=False)
+    # Se incrementa con cada cambio de HorarioClase que afecte al plantel
+    version_horario = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.nombre
\ No newline at end of file
@@ -109,6 +109,18 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'   # ← línea nueva
 MEDIA_URL   = '/media/'
 MEDIA_ROOT  = BASE_DIR / 'media'
 
+# Caché en disco de los archivos de Cloudinary que sirve ver_pdf (docente/cache_archivos.py)
+CACHE_ARCHIVOS_DIR    = MEDIA_ROOT / 'cache_archivos'
+CACHE_ARCHIVOS_MAX_MB = int(os.environ.get('CACHE_ARCHIVOS_MAX_MB', '1024'))
+
+# Reportes PDF generados en segundo plano (docente/reportes.py, manage.py procesar_reportes)
+# y su caché por contenido (docente/cache_reportes.py)
+REPORTES_DIR          = MEDIA_ROOT / 'reportes'
+REPORTES_RETENCION_H  = int(os.environ.get('REPORTES_RETENCION_H', '24'))
+REPORTES_MAX_MB       = int(os.environ.get('REPORTES_MAX_MB', '512'))
+# Procesos para las boletas en lote (docente/boletas.py); 0 = uno por núcleo
+BOLETAS_PROCESOS      = int(os.environ.get('BOLETAS_PROCESOS', '0'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ── CORS ──────────────────────────────────────────────────────────────────────
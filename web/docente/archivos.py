@@ -0,0 +1,133 @@
+# docente/archivos.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Proxy de archivos de Cloudinary
+#
+# Los PDFs de tareas y entregas (y los archivos de material) se sirven desde
+# nuestro dominio para poder mostrarlos en un <iframe>. La descarga usa una
+# sesión de requests compartida por el proceso (conexiones keep-alive a
+# res.cloudinary.com), con timeouts, y se reenvía al navegador por trozos:
+# la memoria no crece con el tamaño del archivo. Range y las cabeceras
+# condicionales pasan tal cual, así el visor de PDF puede pedir páginas
+# sueltas y revalidar con 304. Con `clave_cache` se consulta antes la caché
+# en disco (docente/cache_archivos.py) y las descargas completas se guardan
+# en ella al vuelo.
+# ─────────────────────────────────────────────────────────────────────────────
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from . import cache_archivos
+
+TIMEOUT = (5, 30)            # (conexión, lectura entre trozos) en segundos
+TAMANO_TROZO = 64 * 1024
+
+CABECERAS_PETICION = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+CABECERAS_RESPUESTA = (
+    'Content-Length', 'Content-Range', 'Accept-Ranges', 'ETag', 'Last-Modified',
+)
+
+
+def _crear_sesion():
+    sesion = requests.Session()
+    reintentos = Retry(total=2, connect=2, read=0, backoff_factor=0.2,
+                       status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=reintentos)
+    sesion.mount('https://', adaptador)
+    sesion.mount('http://', adaptador)
+    return sesion
+
+
+sesion = _crear_sesion()
+
+
+# ── URLs de origen ───────────────────────────────────────────────────────────
+
+def url_pdf(archivo):
+    """URL raw de Cloudinary de un PDF subido a Tarea/EntregaTarea/EntregaActividad."""
+    public_id = str(archivo)
+    if not public_id.endswith('.pdf'):
+        public_id += '.pdf'
+    cloud = settings.CLOUDINARY_STORAGE['CLOUD_NAME']
+    return f'https://res.cloudinary.com/{cloud}/raw/upload/{public_id}'
+
+
+def url_archivo(archivo):
+    """URL https de cualquier CloudinaryField (material: imagen, video o raw)."""
+    return archivo.build_url(secure=True)
+
+
+# ── Proxy ────────────────────────────────────────────────────────────────────
+
+def _trozos(origen, copia=None):
+    """Reenvía el cuerpo de `origen`; si hay `copia` la publica en la caché al terminar."""
+    completo = False
+    try:
+        for trozo in origen.raw.stream(TAMANO_TROZO, decode_content=False):
+            if copia:
+                copia.escribir(trozo)
+            yield trozo
+        completo = True
+    finally:
+        # Devuelve la conexión al pool aunque el cliente corte la descarga
+        origen.close()
+        if copia and completo:
+            copia.confirmar()
+        elif copia:
+            copia.descartar()
+
+
+def servir_archivo(request, url, nombre, content_type=None, adjunto=False, clave_cache=None):
+    """
+    StreamingHttpResponse con el archivo de `url`. Respeta Range y las
+    cabeceras condicionales del navegador; 404 si Cloudinary no lo tiene,
+    502 si no responde. Con `clave_cache` sirve desde el disco si puede.
+    """
+    if clave_cache:
+        entrada = cache_archivos.buscar(clave_cache)
+        if entrada:
+            return cache_archivos.servir(request, entrada, nombre, content_type, adjunto)
+
+    cabeceras = {h: request.headers[h] for h in CABECERAS_PETICION if h in request.headers}
+    # Sin compresión: Content-Length y Content-Range deben valer para los bytes reenviados
+    cabeceras['Accept-Encoding'] = 'identity'
+    try:
+        origen = sesion.get(url, headers=cabeceras, stream=True, timeout=TIMEOUT)
+    except requests.RequestException:
+        return HttpResponse('No se pudo obtener el archivo.', status=502, content_type='text/plain')
+
+    if origen.status_code == 304:
+        origen.close()
+        response = HttpResponseNotModified()
+        for h in ('ETag', 'Last-Modified'):
+            if h in origen.headers:
+                response[h] = origen.headers[h]
+        return response
+    if origen.status_code == 404:
+        origen.close()
+        raise Http404('El archivo no existe.')
+    if origen.status_code not in (200, 206, 416):
+        origen.close()
+        return HttpResponse('No se pudo obtener el archivo.', status=502, content_type='text/plain')
+
+    copia = None
+    if clave_cache and origen.status_code == 200:
+        copia = cache_archivos.nueva_escritura(
+            clave_cache, origen.headers.get('Content-Type'),
+            int(origen.headers.get('Content-Length') or 0),
+        )
+    response = StreamingHttpResponse(
+        _trozos(origen, copia),
+        status=origen.status_code,
+        content_type=content_type or origen.headers.get('Content-Type', 'application/octet-stream'),
+    )
+    for h in CABECERAS_RESPUESTA:
+        if h in origen.headers:
+            response[h] = origen.headers[h]
+    response['Content-Disposition'] = content_disposition_header(adjunto, nombre)
+    response['Cache-Control'] = 'private, max-age=300'
+    response['X-Frame-Options'] = 'SAMEORIGIN'
+    return response
@@ -0,0 +1,130 @@
+# docente/boletas.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Boletas por alumno en lote (un grupo, un grado o todo el plantel)
+#
+# `datos_boletas` lee las calificaciones de todos los alumnos en una sola
+# consulta a ResumenCalificacion y las deja en dicts simples. Con eso, la
+# exportación en ZIP reparte las boletas en lotes entre procesos (spawn, sin
+# Django ni base de datos en los hijos); cada proceso arma una sola vez los
+# estilos (_pdf_styles) al arrancar y los reutiliza en todas sus boletas.
+#
+# El PDF único se arma en un solo documento de ReportLab con todas las
+# boletas: no hay con qué unir PDFs generados por separado, y un solo
+# documento ya evita el costo por archivo.
+#
+# La usan la cola de reportes (tipos BOLETAS y BOLETAS_ZIP) y
+# `manage.py exportar_boletas`.
+# ─────────────────────────────────────────────────────────────────────────────
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+LOTE = 20          # boletas por tarea enviada a un proceso
+MIN_PARALELO = 60  # con menos alumnos no vale la pena levantar procesos
+
+
+def procesos_por_defecto():
+    return os.cpu_count() or 1
+
+
+# ── Datos (proceso principal) ────────────────────────────────────────────────
+
+def alumnos_boletas(plantel, grupo_id=None, grado=None):
+    """Alumnos del plantel, o solo de un grupo o de un grado, por grupo y apellido."""
+    from users.models import User
+
+    alumnos = User.objects.filter(plantel=plantel, rol='ALUMNO')
+    if grupo_id:
+        alumnos = alumnos.filter(alumno_grupo_id=grupo_id)
+    elif grado:
+        alumnos = alumnos.filter(alumno_grupo__grado=grado)
+    return alumnos.order_by('alumno_grupo__grado', 'alumno_grupo__nombre', 'last_name', 'first_name', 'pk')
+
+
+def datos_boletas(alumnos):
+    """Un dict por alumno con lo que imprime su boleta; las notas salen de una sola consulta."""
+    from academic.models import ResumenCalificacion
+
+    notas = {}
+    for alumno_id, asignatura, nota in (
+        ResumenCalificacion.objects
+        .filter(alumno__in=alumnos.values('pk'), promedio_final__isnull=False)
+        .order_by('asignatura__nombre')
+        .values_list('alumno_id', 'asignatura__nombre', 'promedio_final')
+        .iterator(chunk_size=5000)
+    ):
+        notas.setdefault(alumno_id, []).append((asignatura, float(nota)))
+    return [
+        {
+            'pk':        a.pk,
+            'nombre':    a.get_full_name(),
+            'matricula': a.username,
+            'grupo':     str(a.alumno_grupo) if a.alumno_grupo else '',
+            'estatus':   a.get_estatus_display(),
+            'notas':     notas.get(a.pk, []),
+        }
+        for a in alumnos.select_related('alumno_grupo__carrera')
+    ]
+
+
+def _limpio(texto):
+    return re.sub(r'[\\/:*?"<>|]+', '_', texto).strip() or 'sin_nombre'
+
+
+def nombre_en_zip(datos):
+    carpeta = _limpio(datos['grupo']) if datos['grupo'] else 'Sin grupo'
+    return f'{carpeta}/{_limpio(datos["matricula"])} - {_limpio(datos["nombre"])}.pdf'
+
+
+# ── Procesos hijos ───────────────────────────────────────────────────────────
+
+_estilos = None
+_plantel = ''
+
+
+def _iniciar(plantel_nombre):
+    global _estilos, _plantel
+    from .pdf_utils import _pdf_styles
+    _estilos = _pdf_styles()
+    _plantel = plantel_nombre
+
+
+def _renderizar(lote):
+    from .pdf_utils import generar_pdf_boleta_alumno
+    return [(nombre_en_zip(d), generar_pdf_boleta_alumno(d, _plantel, _estilos).getvalue()) for d in lote]
+
+
+# ── Exportación ──────────────────────────────────────────────────────────────
+
+def _boletas(lista, plantel_nombre, procesos):
+    """(nombre en el ZIP, bytes) de cada boleta, en el orden de `lista`."""
+    lotes = [lista[i:i + LOTE] for i in range(0, len(lista), LOTE)]
+    if procesos <= 1 or len(lista) < MIN_PARALELO:
+        _iniciar(plantel_nombre)
+        for lote in lotes:
+            yield from _renderizar(lote)
+        return
+    with ProcessPoolExecutor(min(procesos, len(lotes)), mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_iniciar, initargs=(plantel_nombre,)) as pool:
+        for resultado in pool.map(_renderizar, lotes):
+            yield from resultado
+
+
+def exportar_zip(lista, plantel_nombre, destino=None, procesos=None):
+    """Escribe en `destino` (BytesIO nuevo si no se da) un ZIP con una boleta por alumno."""
+    destino = destino if destino is not None else io.BytesIO()
+    procesos = procesos or procesos_por_defecto()
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED) as zf:
+        for nombre, pdf in _boletas(lista, plantel_nombre, procesos):
+            zf.writestr(nombre, pdf)
+    destino.seek(0)
+    return destino
+
+
+def exportar_pdf(lista, plantel_nombre):
+    """BytesIO con todas las boletas en un solo PDF."""
+    from .pdf_utils import generar_pdf_boletas
+    return generar_pdf_boletas(lista, plantel_nombre)
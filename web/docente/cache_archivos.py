@@ -0,0 +1,310 @@
+# docente/cache_archivos.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Caché en disco de los archivos de Cloudinary servidos por ver_pdf
+#
+# Al calificar, el docente abre una y otra vez las mismas entregas. La
+# primera descarga completa se copia a CACHE_ARCHIVOS_DIR mientras se envía
+# al navegador (docente/archivos.py); las siguientes, Range incluido, salen
+# del disco local.
+#
+#   · Clave: HMAC(SECRET_KEY) de resource_type/type/version/public_id, así el
+#     nombre del archivo no se puede adivinar aunque MEDIA_ROOT sea público.
+#   · Escritura atómica: se escribe en un temporal del mismo directorio y se
+#     publica con os.replace; un lector nunca ve un archivo a medias.
+#   · LRU por tamaño: cada acierto actualiza el mtime y `podar` borra los más
+#     viejos hasta quedar bajo CACHE_ARCHIVOS_MAX_MB; corre solo cuando la
+#     cuenta de bytes del proceso pasaría del límite.
+# ─────────────────────────────────────────────────────────────────────────────
+import hashlib
+import hmac
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+MAX_BYTES_ARCHIVO = 100 * 1024 * 1024   # los archivos más grandes no se guardan
+TAMANO_TROZO = 64 * 1024
+TEMPORALES_VIEJOS = 3600                # segundos tras los que un temporal huérfano se borra
+
+# Bytes en caché según este proceso: se mide al primer guardado (al podar) y
+# luego se suma lo que se escribe, así que solo se recorre el directorio cuando
+# el total pasaría del límite. Lo que escriban otros procesos se nota en su
+# propia cuenta o al podar; `manage.py cache_archivos --podar` recorta todo.
+_uso = {'bytes': None}
+PODAR_HASTA = 0.9     # fracción del límite que queda tras una poda automática
+
+
+def directorio():
+    return Path(settings.CACHE_ARCHIVOS_DIR)
+
+
+def limite_bytes():
+    return settings.CACHE_ARCHIVOS_MAX_MB * 1024 * 1024
+
+
+def clave_archivo(archivo):
+    """Clave de caché de un CloudinaryField: cambia si cambia la versión."""
+    origen = f'{archivo.resource_type}/{archivo.type}/{archivo.version or 0}/{archivo.public_id}.{archivo.format or ""}'
+    return hmac.new(settings.SECRET_KEY.encode(), origen.encode(), hashlib.sha256).hexdigest()[:40]
+
+
+def _rutas(clave):
+    carpeta = directorio() / clave[:2]
+    return carpeta / clave, carpeta / f'{clave}.json'
+
+
+# ── Lectura ──────────────────────────────────────────────────────────────────
+
+class Entrada:
+    """
+    Archivo en caché ya abierto: si otro proceso lo poda después de buscar(),
+    el descriptor sigue sirviendo los datos. Quien la recibe debe cerrarla.
+    """
+
+    def __init__(self, clave, archivo, meta):
+        self.clave = clave
+        self.archivo = archivo
+        self.content_type = meta.get('content_type') or 'application/octet-stream'
+        self.tamano = meta['tamano']
+        self.etag = f'"{clave}"'
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+def buscar(clave):
+    """Entrada abierta de `clave` si está completa en disco (y la marca como usada), o None."""
+    ruta, ruta_meta = _rutas(clave)
+    try:
+        meta = json.loads(ruta_meta.read_text())
+        archivo = open(ruta, 'rb')
+    except (OSError, ValueError):
+        return None
+    try:
+        if os.fstat(archivo.fileno()).st_size != meta['tamano']:
+            archivo.close()
+            return None
+        os.utime(ruta)
+    except (OSError, KeyError):
+        archivo.close()
+        return None
+    return Entrada(clave, archivo, meta)
+
+
+# ── Escritura ────────────────────────────────────────────────────────────────
+
+class Escritura:
+    """
+    Copia en curso de un archivo; solo se publica con confirmar(). Si el disco
+    falla se descarta en silencio: la descarga del usuario sigue igual.
+    """
+
+    def __init__(self, clave, content_type, tamano):
+        self.clave = clave
+        self.content_type = content_type
+        self.tamano = tamano
+        self.escritos = 0
+        self.descartada = False
+        self.ruta, self.ruta_meta = _rutas(clave)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.temporal = tempfile.mkstemp(dir=self.ruta.parent, prefix='.tmp-')
+        self.archivo = os.fdopen(fd, 'wb')
+
+    def escribir(self, trozo):
+        if self.descartada:
+            return
+        try:
+            self.archivo.write(trozo)
+        except OSError:
+            self.descartar()
+            return
+        self.escritos += len(trozo)
+
+    def confirmar(self):
+        """Publica la copia si llegó completa. Devuelve True si quedó guardada."""
+        if self.descartada:
+            return False
+        try:
+            self.archivo.close()
+            if self.escritos != self.tamano:
+                self.descartar()
+                return False
+            os.replace(self.temporal, self.ruta)
+            _escribir_atomico(self.ruta_meta, json.dumps({
+                'content_type': self.content_type, 'tamano': self.tamano, 'guardado_en': time.time(),
+            }))
+            _sumar(self.tamano)
+        except OSError:
+            self.descartar()
+            return False
+        return True
+
+    def descartar(self):
+        self.descartada = True
+        try:
+            self.archivo.close()
+        except OSError:
+            pass
+        try:
+            os.unlink(self.temporal)
+        except OSError:
+            pass
+
+
+def _escribir_atomico(ruta, texto):
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(texto)
+    os.replace(temporal, ruta)
+
+
+def nueva_escritura(clave, content_type, tamano):
+    """Escritura para `clave`, o None si el archivo no debe guardarse."""
+    if not tamano or tamano > min(MAX_BYTES_ARCHIVO, limite_bytes()):
+        return None
+    try:
+        return Escritura(clave, content_type, tamano)
+    except OSError:
+        return None
+
+
+def _sumar(tamano):
+    """Cuenta `tamano` bytes recién guardados; poda solo si se pasaría del límite."""
+    if _uso['bytes'] is None or _uso['bytes'] + tamano > limite_bytes():
+        # Se baja un poco más del límite para no volver a podar en cada guardado
+        podar(int(limite_bytes() * PODAR_HASTA))
+    else:
+        _uso['bytes'] += tamano
+
+
+# ── Mantenimiento ────────────────────────────────────────────────────────────
+
+def _recorrer():
+    """(ruta, stat) de cada archivo bajo el directorio de la caché."""
+    raiz = directorio()
+    if not raiz.is_dir():
+        return
+    for carpeta in os.scandir(raiz):
+        if carpeta.is_dir():
+            for f in os.scandir(carpeta.path):
+                if f.is_file():
+                    yield Path(f.path), f.stat()
+
+
+def podar(limite=None):
+    """
+    Borra temporales huérfanos, metadatos sin datos y, del menos al más
+    recientemente usado, archivos hasta quedar bajo `limite` bytes (por
+    defecto CACHE_ARCHIVOS_MAX_MB). Devuelve (archivos borrados, bytes liberados).
+    """
+    limite = limite_bytes() if limite is None else limite
+    ahora = time.time()
+    datos, metas, borrados, liberados = [], set(), 0, 0
+    for ruta, st in _recorrer():
+        if ruta.name.startswith('.tmp-'):
+            if ahora - st.st_mtime > TEMPORALES_VIEJOS:
+                ruta.unlink(missing_ok=True)
+        elif ruta.suffix == '.json':
+            metas.add(ruta)
+        else:
+            datos.append((st.st_mtime, st.st_size, ruta))
+
+    for ruta in metas - {r.with_suffix('.json') for _, _, r in datos}:
+        ruta.unlink(missing_ok=True)
+
+    total = sum(tamano for _, tamano, _ in datos)
+    for _, tamano, ruta in sorted(datos, key=lambda d: d[0]):
+        if total <= limite:
+            break
+        ruta.with_suffix('.json').unlink(missing_ok=True)
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+        borrados += 1
+        liberados += tamano
+    _uso['bytes'] = total
+    return borrados, liberados
+
+
+def estadisticas():
+    datos = [(st.st_mtime, st.st_size) for ruta, st in _recorrer()
+             if not ruta.name.startswith('.tmp-') and ruta.suffix != '.json']
+    return {
+        'archivos':     len(datos),
+        'bytes':        sum(t for _, t in datos),
+        'limite':       limite_bytes(),
+        'mas_antiguo':  min((m for m, _ in datos), default=None),
+        'mas_reciente': max((m for m, _ in datos), default=None),
+    }
+
+
+# ── Respuesta desde disco (con Range) ────────────────────────────────────────
+
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _rango(cabecera, tamano):
+    """(inicio, fin) inclusivos de un Range de un solo tramo; None si no aplica, ValueError si no se puede servir."""
+    m = _RANGO.match(cabecera.strip())
+    if not m or m.groups() == ('', ''):
+        return None
+    inicio, fin = m.groups()
+    if inicio == '':
+        inicio, fin = max(tamano - int(fin), 0), tamano - 1
+    else:
+        inicio, fin = int(inicio), min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio > fin or inicio >= tamano:
+        raise ValueError
+    return inicio, fin
+
+
+def _tramo(archivo, inicio, largo):
+    with archivo as f:
+        f.seek(inicio)
+        while largo > 0:
+            trozo = f.read(min(TAMANO_TROZO, largo))
+            if not trozo:
+                break
+            largo -= len(trozo)
+            yield trozo
+
+
+def servir(request, entrada, nombre, content_type=None, adjunto=False):
+    """Responde con el archivo en caché: 304, 206 (Range) o 200."""
+    if request.headers.get('If-None-Match') == entrada.etag:
+        entrada.cerrar()
+        response = HttpResponseNotModified()
+        response['ETag'] = entrada.etag
+        return response
+
+    content_type = content_type or entrada.content_type
+    rango = None
+    if 'Range' in request.headers and request.headers.get('If-Range', entrada.etag) == entrada.etag:
+        try:
+            rango = _rango(request.headers['Range'], entrada.tamano)
+        except ValueError:
+            entrada.cerrar()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{entrada.tamano}'
+            return response
+
+    if rango:
+        inicio, fin = rango
+        response = StreamingHttpResponse(
+            _tramo(entrada.archivo, inicio, fin - inicio + 1), status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{entrada.tamano}'
+        response['Content-Length'] = str(fin - inicio + 1)
+    else:
+        response = FileResponse(entrada.archivo, content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = entrada.etag
+    response['Content-Disposition'] = content_disposition_header(adjunto, nombre)
+    response['Cache-Control'] = 'private, max-age=300'
+    response['X-Frame-Options'] = 'SAMEORIGIN'
+    return response
@@ -0,0 +1,323 @@
+# docente/cache_reportes.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Caché de reportes PDF direccionada por contenido
+#
+# Un reporte se identifica por su tipo y la huella de sus datos de entrada:
+# HMAC(SECRET_KEY) de lo que imprime (grupo, alumnos, asignaturas, docente) y
+# de las filas que lee. Para los resúmenes de un grupo basta con conteo, id
+# máximo y `actualizado_en` máximo; Asistencia, AsistenciaMensual y TemaClase
+# no tienen marca de tiempo, así que entran sus filas. Si nada cambió, la huella
+# es la misma y el PDF sale de REPORTES_DIR sin pasar por ReportLab (la fecha
+# "Generado" del encabezado es la de la primera vez).
+#
+#   · La huella es el nombre del archivo y el ETag: el navegador revalida con
+#     If-None-Match y recibe 304 mientras los datos no cambien.
+#   · Escritura atómica (temporal + os.replace); LRU por tamaño hasta
+#     REPORTES_MAX_MB, como docente/cache_archivos.py.
+#   · Aciertos y fallos por tipo en UsoCacheReporte, compartidos entre procesos.
+#   · FORMATO entra en la huella: subirlo al cambiar el diseño de los PDFs.
+# ─────────────────────────────────────────────────────────────────────────────
+import calendar
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.db.models import Count, F, Max
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+
+from .models import UsoCacheReporte
+
+FORMATO = 1
+TEMPORALES_VIEJOS = 3600
+
+# Bytes en caché según este proceso: se mide al primer guardado (al podar) y
+# luego se suma lo que se escribe, así que solo se recorre el directorio cuando
+# el total pasaría del límite. Lo que escriban otros procesos se nota en su
+# propia cuenta o al podar; `manage.py cache_reportes --podar` recorta todo.
+_uso = {'bytes': None}
+PODAR_HASTA = 0.9     # fracción del límite que queda tras una poda automática
+
+
+def directorio():
+    return Path(settings.REPORTES_DIR)
+
+
+def limite_bytes():
+    return settings.REPORTES_MAX_MB * 1024 * 1024
+
+
+# ── Huellas ──────────────────────────────────────────────────────────────────
+
+def _grupo(grupo_id):
+    from academic.models import Grupo
+    return Grupo.objects.select_related('carrera').get(pk=grupo_id)
+
+
+def _alumnos(grupo):
+    return list(
+        grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO')
+        .order_by('last_name', 'first_name')
+        .values_list('pk', 'first_name', 'last_name')
+    )
+
+
+def _entradas_calificaciones(parametros, usuario):
+    from academic.models import ResumenCalificacion
+    from users.models import DocenteGrupo
+
+    grupo = _grupo(parametros['grupo_id'])
+    asignaturas = list(
+        DocenteGrupo.objects.filter(docente=usuario, activo=True, grupo=grupo)
+        .values_list('asignatura_id', 'asignatura__nombre')
+    )
+    resumenes = ResumenCalificacion.objects.filter(
+        grupo=grupo, asignatura_id__in=[a for a, _ in asignaturas],
+    ).aggregate(filas=Count('id'), ultimo_id=Max('id'), actualizado=Max('actualizado_en'))
+    return [str(grupo), asignaturas, _alumnos(grupo), resumenes]
+
+
+def periodo_asistencia(parametros):
+    """
+    (desde, hasta) de un reporte ASISTENCIA_GRUPO. Los trabajos encolados antes
+    de los rangos traen {'mes', 'anio'} en lugar de {'desde', 'hasta'}.
+    """
+    if 'desde' in parametros:
+        return (datetime.date.fromisoformat(parametros['desde']),
+                datetime.date.fromisoformat(parametros['hasta']))
+    anio, mes = int(parametros['anio']), int(parametros['mes'])
+    return datetime.date(anio, mes, 1), datetime.date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+
+def _entradas_asistencia_grupo(parametros, usuario):
+    from academic.models import Asistencia
+
+    grupo = _grupo(parametros['grupo_id'])
+    desde, hasta = periodo_asistencia(parametros)
+    # El reporte incluye a todos los alumnos del grupo, no solo los activos
+    alumnos = list(
+        grupo.alumnos.filter(rol='ALUMNO').order_by('last_name', 'first_name')
+        .values_list('pk', 'first_name', 'last_name')
+    )
+    registros = list(
+        Asistencia.objects.filter(grupo=grupo, fecha__range=(desde, hasta))
+        .order_by('pk').values_list('pk', 'alumno_id', 'fecha', 'estado')
+    )
+    return [str(grupo), alumnos, registros]
+
+
+def _entradas_cronograma(parametros, usuario):
+    from academic.models import PlanClase
+
+    plan = PlanClase.objects.select_related('asignatura', 'grupo').get(pk=parametros['plan_id'])
+    campos = PlanClase.objects.filter(pk=plan.pk).values().get()
+    return [str(plan.asignatura), str(plan.grupo), campos, list(plan.temas.values())]
+
+
+def _entradas_boleta_alumno(parametros, usuario):
+    from academic.models import ResumenCalificacion
+    from users.models import User
+
+    alumno = User.objects.select_related('alumno_grupo').get(pk=parametros['alumno_id'])
+    notas = list(
+        ResumenCalificacion.objects.filter(alumno=alumno, promedio_final__isnull=False)
+        .order_by('asignatura__nombre').values_list('asignatura__nombre', 'promedio_final')
+    )
+    return [alumno.get_full_name(), alumno.username, str(alumno.alumno_grupo or ''), alumno.estatus, notas]
+
+
+def _entradas_asistencia(parametros, usuario):
+    from academic.models import Asignatura, AsistenciaMensual
+
+    grupo = _grupo(parametros['grupo_id'])
+    asignatura = Asignatura.objects.get(pk=parametros['asignatura_id'])
+    conteos = list(
+        AsistenciaMensual.objects.filter(
+            grupo=grupo, asignatura=asignatura, anio=parametros['anio'], mes=parametros['mes'],
+        ).order_by('alumno_id').values_list('alumno_id', 'presentes', 'ausentes', 'retardos')
+    )
+    return [str(grupo), str(asignatura), _alumnos(grupo), conteos]
+
+
+def _entradas_boletas(parametros, usuario):
+    from academic.models import Grupo, ResumenCalificacion
+    from .boletas import alumnos_boletas
+
+    alumnos = alumnos_boletas(usuario.plantel, parametros.get('grupo_id'), parametros.get('grado'))
+    filas = list(alumnos.values_list('pk', 'first_name', 'last_name', 'username', 'estatus', 'alumno_grupo_id'))
+    grupos = list(
+        Grupo.objects.filter(pk__in={f[-1] for f in filas if f[-1]})
+        .order_by('pk').values_list('pk', 'nombre', 'grado', 'carrera__nombre')
+    )
+    resumenes = ResumenCalificacion.objects.filter(alumno__in=alumnos.values('pk')).aggregate(
+        filas=Count('id'), ultimo_id=Max('id'), actualizado=Max('actualizado_en'),
+    )
+    return [filas, grupos, resumenes]
+
+
+ENTRADAS = {
+    'BOLETA_GRUPO':     _entradas_calificaciones,
+    'CONCENTRADO':      _entradas_calificaciones,
+    'ASISTENCIA_GRUPO': _entradas_asistencia_grupo,
+    'CRONOGRAMA':       _entradas_cronograma,
+    'BOLETA_ALUMNO':    _entradas_boleta_alumno,
+    'ASISTENCIA':       _entradas_asistencia,
+    'BOLETAS':          _entradas_boletas,
+    'BOLETAS_ZIP':      _entradas_boletas,
+}
+ZIP = ('BOLETAS_ZIP',)   # el resto son PDF
+
+
+def huella(tipo, parametros, usuario):
+    """Huella de los datos con los que se generaría el reporte ahora mismo."""
+    plantel = usuario.plantel.nombre if usuario.plantel else ''
+    datos = json.dumps(
+        [FORMATO, tipo, parametros, usuario.get_full_name(), plantel, ENTRADAS[tipo](parametros, usuario)],
+        cls=DjangoJSONEncoder, sort_keys=True,
+    )
+    return hmac.new(settings.SECRET_KEY.encode(), datos.encode(), hashlib.sha256).hexdigest()[:40]
+
+
+# ── Lectura y escritura ──────────────────────────────────────────────────────
+
+def _relativa(tipo, huella):
+    extension = 'zip' if tipo in ZIP else 'pdf'
+    return f'{tipo.lower()}/{huella[:2]}/{huella}.{extension}'
+
+
+def _contar(tipo, campo):
+    if UsoCacheReporte.objects.filter(tipo=tipo).update(**{campo: F(campo) + 1}):
+        return
+    try:
+        UsoCacheReporte.objects.create(tipo=tipo, **{campo: 1})
+    except IntegrityError:
+        UsoCacheReporte.objects.filter(tipo=tipo).update(**{campo: F(campo) + 1})
+
+
+def buscar(tipo, huella, contar=True):
+    """Ruta relativa del PDF en caché (y lo marca como usado), o None."""
+    relativa = _relativa(tipo, huella)
+    try:
+        os.utime(directorio() / relativa)
+    except OSError:
+        relativa = None
+    if contar:
+        _contar(tipo, 'aciertos' if relativa else 'fallos')
+    return relativa
+
+
+def guardar(tipo, huella, datos):
+    """Publica `datos` como el PDF de (tipo, huella). Devuelve la ruta relativa."""
+    relativa = _relativa(tipo, huella)
+    ruta = directorio() / relativa
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+    _sumar(len(datos))
+    return relativa
+
+
+def servir(request, relativa, nombre, adjunto=False):
+    """Reporte de la caché con su huella como ETag (304 si el navegador ya lo tiene)."""
+    etag = f'"{Path(relativa).stem}"'
+    no_modificado = get_conditional_response(request, etag=etag)
+    if no_modificado is not None:
+        no_modificado['ETag'] = etag
+        return no_modificado
+    tipo_mime = 'application/zip' if relativa.endswith('.zip') else 'application/pdf'
+    response = FileResponse(open(directorio() / relativa, 'rb'), content_type=tipo_mime,
+                            as_attachment=adjunto, filename=nombre)
+    response['ETag'] = etag
+    # Que el navegador revalide siempre: la huella cambia en cuanto cambian los datos
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def responder(request, tipo, huella, nombre, adjunto=False):
+    """304 o el PDF en caché si los datos no cambiaron; None si hay que generarlo."""
+    if get_conditional_response(request, etag=f'"{huella}"') is not None:
+        # El navegador ya tiene esta versión: 304 sin tocar el disco
+        _contar(tipo, 'aciertos')
+        return servir(request, _relativa(tipo, huella), nombre, adjunto)
+    relativa = buscar(tipo, huella)
+    if relativa is None:
+        return None
+    try:
+        return servir(request, relativa, nombre, adjunto)
+    except FileNotFoundError:
+        # Otro proceso lo podó entre buscar() y abrirlo: se vuelve a generar
+        return None
+
+
+def _sumar(tamano):
+    """Cuenta `tamano` bytes recién guardados; poda solo si se pasaría del límite."""
+    if _uso['bytes'] is None or _uso['bytes'] + tamano > limite_bytes():
+        # Se baja un poco más del límite para no volver a podar en cada guardado
+        podar(int(limite_bytes() * PODAR_HASTA))
+    else:
+        _uso['bytes'] += tamano
+
+
+# ── Mantenimiento ────────────────────────────────────────────────────────────
+
+def _recorrer():
+    raiz = directorio()
+    if not raiz.is_dir():
+        return
+    for ruta in raiz.glob('*/*/*'):
+        if ruta.is_file():
+            yield ruta, ruta.stat()
+
+
+def podar(limite=None):
+    """Borra temporales huérfanos y los PDFs menos usados hasta quedar bajo `limite` bytes."""
+    limite = limite_bytes() if limite is None else limite
+    ahora = time.time()
+    pdfs, borrados, liberados = [], 0, 0
+    for ruta, st in _recorrer():
+        if ruta.name.startswith('.tmp-'):
+            if ahora - st.st_mtime > TEMPORALES_VIEJOS:
+                ruta.unlink(missing_ok=True)
+        else:
+            pdfs.append((st.st_mtime, st.st_size, ruta))
+
+    total = sum(tamano for _, tamano, _ in pdfs)
+    for _, tamano, ruta in sorted(pdfs, key=lambda p: p[0]):
+        if total <= limite:
+            break
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+        borrados += 1
+        liberados += tamano
+    _uso['bytes'] = total
+    return borrados, liberados
+
+
+def estadisticas():
+    pdfs = [st.st_size for ruta, st in _recorrer() if not ruta.name.startswith('.tmp-')]
+    por_tipo = {
+        u.tipo: {
+            'aciertos': u.aciertos,
+            'fallos':   u.fallos,
+            'tasa':     round(u.aciertos / (u.aciertos + u.fallos), 3) if u.aciertos + u.fallos else None,
+        }
+        for u in UsoCacheReporte.objects.order_by('tipo')
+    }
+    return {
+        'archivos': len(pdfs),
+        'bytes':    sum(pdfs),
+        'limite':   limite_bytes(),
+        'aciertos': sum(t['aciertos'] for t in por_tipo.values()),
+        'fallos':   sum(t['fallos'] for t in por_tipo.values()),
+        'por_tipo': por_tipo,
+    }
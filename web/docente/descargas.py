@@ -0,0 +1,174 @@
+# docente/descargas.py
+# ─────────────────────────────────────────────────────────────────────────────
+# ZIP con todas las entregas de una Tarea o Actividad
+#
+# El ZIP se arma al vuelo y se envía por trozos (zipfile sobre una salida no
+# posicionable, con descriptores de datos). Los archivos se piden a Cloudinary
+# en paralelo con un pool de pocos hilos y una ventana acotada de descargas
+# adelantadas; cada una va a un SpooledTemporaryFile, así la memoria queda
+# acotada por la ventana y no por el tamaño del grupo. Lo que ya está en la
+# caché en disco (docente/cache_archivos.py) no sale a la red. Al final va
+# manifiesto.csv con alumno, estado, fecha de entrega y calificación.
+# ─────────────────────────────────────────────────────────────────────────────
+import csv
+import io
+import re
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.utils import timezone
+
+from . import cache_archivos
+from .archivos import sesion, url_pdf, TIMEOUT, TAMANO_TROZO
+
+HILOS = 4
+VENTANA = 2 * HILOS             # descargas adelantadas como máximo
+MAX_EN_MEMORIA = 1024 * 1024    # por archivo; lo demás se pasa a disco
+
+
+class _Salida(io.RawIOBase):
+    """Destino de zipfile que acumula lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self.trozos = []
+        self.posicion = 0
+        self.pendientes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.trozos.append(bytes(datos))
+        self.posicion += len(datos)
+        self.pendientes += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def vaciar(self):
+        datos = b''.join(self.trozos)
+        self.trozos.clear()
+        self.pendientes = 0
+        return datos
+
+
+def _bajar(archivo):
+    """Archivo abierto (caché en disco o descarga a un temporal) listo para leer."""
+    entrada = cache_archivos.buscar(cache_archivos.clave_archivo(archivo))
+    if entrada:
+        return entrada.archivo
+    temporal = tempfile.SpooledTemporaryFile(max_size=MAX_EN_MEMORIA)
+    with sesion.get(url_pdf(archivo), stream=True, timeout=TIMEOUT) as r:
+        r.raise_for_status()
+        for trozo in r.iter_content(TAMANO_TROZO):
+            temporal.write(trozo)
+    temporal.seek(0)
+    return temporal
+
+
+def _en_orden(archivos):
+    """
+    (indice, futuro) de cada archivo en el orden recibido, con a lo sumo
+    VENTANA descargas en curso o esperando a ser escritas.
+    """
+    pool = ThreadPoolExecutor(HILOS, thread_name_prefix='zip-entregas')
+    pendientes = deque()
+    siguientes = enumerate(archivos)
+
+    def lanzar():
+        siguiente = next(siguientes, None)
+        if siguiente is not None:
+            i, archivo = siguiente
+            pendientes.append((i, pool.submit(_bajar, archivo)))
+
+    try:
+        for _ in range(VENTANA):
+            lanzar()
+        while pendientes:
+            yield pendientes.popleft()
+            lanzar()
+    finally:
+        # Si el cliente corta la descarga, no seguir bajando archivos
+        pool.shutdown(wait=False, cancel_futures=True)
+        for _, futuro in pendientes:
+            if futuro.done() and not futuro.cancelled() and not futuro.exception():
+                futuro.result().close()
+
+
+def _nombre_seguro(texto):
+    return re.sub(r'[\\/:*?"<>|\x00-\x1f]+', '', texto).strip() or 'sin nombre'
+
+
+def _fecha(valor):
+    return timezone.localtime(valor).strftime('%Y-%m-%d %H:%M') if valor else ''
+
+
+def filas_entregas(alumnos, entregas, estado):
+    """
+    Una fila por alumno: {'alumno', 'entrega' (o None), 'estado'}.
+    `estado(entrega)` da el estado de las que existen.
+    """
+    por_alumno = {e.alumno_id: e for e in entregas}
+    return [
+        {'alumno': a, 'entrega': por_alumno.get(a.pk),
+         'estado': estado(por_alumno[a.pk]) if a.pk in por_alumno else 'PENDIENTE'}
+        for a in alumnos
+    ]
+
+
+def zip_entregas(titulo, filas):
+    """Generador de bytes del ZIP: un PDF por entrega con archivo y manifiesto.csv."""
+    salida = _Salida()
+    con_archivo = [f for f in filas if f['entrega'] and f['entrega'].archivo]
+    nombres, usados = {}, set()
+    for f in con_archivo:
+        base = _nombre_seguro(f"{f['alumno'].last_name} {f['alumno'].first_name}".strip()
+                              or f['alumno'].username)
+        nombre, n = f'{base}.pdf', 1
+        while nombre in usados:
+            n += 1
+            nombre = f'{base} ({n}).pdf'
+        usados.add(nombre)
+        nombres[f['alumno'].pk] = nombre
+
+    errores = set()
+    carpeta = _nombre_seguro(titulo)
+    # Sin compresión: los PDF ya vienen comprimidos
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for i, futuro in _en_orden([f['entrega'].archivo for f in con_archivo]):
+            fila = con_archivo[i]
+            try:
+                origen = futuro.result()
+            except (requests.RequestException, OSError):
+                errores.add(fila['alumno'].pk)
+                continue
+            fecha = timezone.localtime(fila['entrega'].entregada_en).timetuple()[:6]
+            with origen, zf.open(zipfile.ZipInfo(f"{carpeta}/{nombres[fila['alumno'].pk]}", fecha), 'w') as destino:
+                while trozo := origen.read(TAMANO_TROZO):
+                    destino.write(trozo)
+                    if salida.pendientes >= TAMANO_TROZO:
+                        yield salida.vaciar()
+            yield salida.vaciar()
+
+        manifiesto = io.StringIO()
+        escritor = csv.writer(manifiesto)
+        escritor.writerow(['alumno', 'usuario', 'estado', 'entregada_en', 'calificacion', 'archivo'])
+        for f in filas:
+            e, alumno = f['entrega'], f['alumno']
+            if alumno.pk in errores:
+                archivo = 'ERROR: no se pudo descargar'
+            else:
+                archivo = nombres.get(alumno.pk, '')
+            escritor.writerow([
+                alumno.get_full_name() or alumno.username, alumno.username, f['estado'],
+                _fecha(e.entregada_en) if e else '',
+                e.calificacion if e and e.calificacion is not None else '',
+                archivo,
+            ])
+        # Con BOM para que Excel respete los acentos
+        zf.writestr(f'{carpeta}/manifiesto.csv', '\ufeff' + manifiesto.getvalue())
+    yield salida.vaciar()
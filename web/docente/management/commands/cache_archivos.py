@@ -0,0 +1,40 @@
+# docente/management/commands/cache_archivos.py
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from docente import cache_archivos
+
+
+def _mb(n):
+    return f'{n / (1024 * 1024):.1f} MB'
+
+
+def _fecha(marca):
+    return datetime.datetime.fromtimestamp(marca).strftime('%Y-%m-%d %H:%M') if marca else '—'
+
+
+class Command(BaseCommand):
+    help = (
+        'Muestra el estado de la caché en disco de archivos de Cloudinary '
+        '(CACHE_ARCHIVOS_DIR). Con --podar la recorta por LRU.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--podar', action='store_true',
+                            help='Borra los archivos menos usados hasta quedar bajo el límite.')
+        parser.add_argument('--limite-mb', type=int,
+                            help='Límite a usar al podar (por defecto CACHE_ARCHIVOS_MAX_MB).')
+        parser.add_argument('--vaciar', action='store_true', help='Borra toda la caché.')
+
+    def handle(self, *args, podar, limite_mb, vaciar, **options):
+        if vaciar or podar:
+            limite = 0 if vaciar else (limite_mb * 1024 * 1024 if limite_mb is not None else None)
+            borrados, liberados = cache_archivos.podar(limite)
+            self.stdout.write(self.style.SUCCESS(f'{borrados} archivos borrados, {_mb(liberados)} liberados.'))
+
+        datos = cache_archivos.estadisticas()
+        self.stdout.write(f'Directorio:   {cache_archivos.directorio()}')
+        self.stdout.write(f'Archivos:     {datos["archivos"]}')
+        self.stdout.write(f'Ocupado:      {_mb(datos["bytes"])} de {_mb(datos["limite"])}')
+        self.stdout.write(f'Uso más viejo: {_fecha(datos["mas_antiguo"])} · más reciente: {_fecha(datos["mas_reciente"])}')
@@ -0,0 +1,46 @@
+# docente/management/commands/cache_reportes.py
+from django.core.management.base import BaseCommand
+
+from docente import cache_reportes
+from docente.models import UsoCacheReporte
+
+
+def _mb(n):
+    return f'{n / (1024 * 1024):.1f} MB'
+
+
+def _tasa(aciertos, fallos):
+    return f'{aciertos / (aciertos + fallos):.0%}' if aciertos + fallos else '—'
+
+
+class Command(BaseCommand):
+    help = (
+        'Muestra el estado de la caché de reportes PDF (REPORTES_DIR) con sus '
+        'aciertos y fallos por tipo. Con --podar la recorta por LRU.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--podar', action='store_true',
+                            help='Borra los PDFs menos usados hasta quedar bajo el límite.')
+        parser.add_argument('--limite-mb', type=int,
+                            help='Límite a usar al podar (por defecto REPORTES_MAX_MB).')
+        parser.add_argument('--vaciar', action='store_true', help='Borra todos los PDFs en caché.')
+        parser.add_argument('--reiniciar-contadores', action='store_true',
+                            help='Pone en cero los aciertos y fallos.')
+
+    def handle(self, *args, podar, limite_mb, vaciar, reiniciar_contadores, **options):
+        if vaciar or podar:
+            limite = 0 if vaciar else (limite_mb * 1024 * 1024 if limite_mb is not None else None)
+            borrados, liberados = cache_reportes.podar(limite)
+            self.stdout.write(self.style.SUCCESS(f'{borrados} PDFs borrados, {_mb(liberados)} liberados.'))
+        if reiniciar_contadores:
+            UsoCacheReporte.objects.update(aciertos=0, fallos=0)
+
+        datos = cache_reportes.estadisticas()
+        self.stdout.write(f'Directorio:  {cache_reportes.directorio()}')
+        self.stdout.write(f'PDFs:        {datos["archivos"]}')
+        self.stdout.write(f'Ocupado:     {_mb(datos["bytes"])} de {_mb(datos["limite"])}')
+        self.stdout.write(f'Aciertos:    {datos["aciertos"]} · fallos: {datos["fallos"]} '
+                          f'({_tasa(datos["aciertos"], datos["fallos"])})')
+        for tipo, uso in datos['por_tipo'].items():
+            self.stdout.write(f'  {tipo:<17} {uso["aciertos"]:>7} / {uso["fallos"]:<7} {_tasa(uso["aciertos"], uso["fallos"])}')
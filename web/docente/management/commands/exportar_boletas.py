@@ -0,0 +1,55 @@
+# docente/management/commands/exportar_boletas.py
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from campuses.models import Plantel
+from docente import boletas
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera la boleta de cada alumno de un plantel (o de un grupo o grado) '
+        'en un ZIP, repartidas entre procesos, o todas en un solo PDF.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('plantel', type=int, help='ID del plantel.')
+        parser.add_argument('salida', help='Archivo a escribir (.zip o .pdf).')
+        parser.add_argument('--grupo', type=int, help='Solo los alumnos de este grupo.')
+        parser.add_argument('--grado', type=int, help='Solo los alumnos de este grado.')
+        parser.add_argument('--formato', choices=['zip', 'pdf'],
+                            help='Por defecto, según la extensión de la salida.')
+        parser.add_argument('--procesos', type=int, default=boletas.procesos_por_defecto(),
+                            help='Procesos que generan boletas en paralelo (solo ZIP).')
+
+    def handle(self, *args, plantel, salida, grupo, grado, formato, procesos, **options):
+        try:
+            plantel = Plantel.objects.get(pk=plantel)
+        except Plantel.DoesNotExist:
+            raise CommandError(f'No existe el plantel {plantel}.')
+        salida = Path(salida)
+        formato = formato or ('pdf' if salida.suffix.lower() == '.pdf' else 'zip')
+
+        inicio = time.monotonic()
+        lista = boletas.datos_boletas(boletas.alumnos_boletas(plantel, grupo, grado))
+        datos = time.monotonic() - inicio
+        if not lista:
+            raise CommandError('No hay alumnos con esos filtros.')
+
+        if formato == 'zip':
+            with open(salida, 'wb') as f:
+                boletas.exportar_zip(lista, plantel.nombre, f, procesos)
+        else:
+            salida.write_bytes(boletas.exportar_pdf(lista, plantel.nombre).getbuffer())
+        total = time.monotonic() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(lista)} boletas en {salida} ({salida.stat().st_size / 1024:.0f} KB).'
+        ))
+        self.stdout.write(
+            f'Datos: {datos:.2f} s · total: {total:.2f} s · '
+            f'{len(lista) / max(total - datos, 1e-6):.0f} boletas/s'
+            + (f' con {procesos} procesos' if formato == 'zip' else '')
+        )
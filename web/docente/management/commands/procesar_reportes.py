@@ -0,0 +1,86 @@
+# docente/management/commands/procesar_reportes.py
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from docente import reportes
+
+CADA_MANTENIMIENTO = 60   # segundos entre limpiezas y recuperación de atascados
+
+
+class Command(BaseCommand):
+    help = (
+        'Worker de la cola de reportes PDF (TrabajoPDF): toma los trabajos '
+        'pendientes de la base de datos y los genera en un pool de procesos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=max(1, min(4, multiprocessing.cpu_count() - 1)),
+                            help='Procesos que generan PDFs en paralelo.')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos entre consultas a la cola cuando no hay trabajo.')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa lo pendiente y termina (para cron).')
+
+    def _pool(self, procesos):
+        # spawn: los hijos no heredan las conexiones a la base de datos del padre
+        return ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=django.setup)
+
+    def handle(self, *args, procesos, intervalo, una_vez, **options):
+        reportes.recuperar_atascados()
+        reportes.limpiar()
+        connections.close_all()
+        pool = self._pool(procesos)
+        en_curso = {}
+        mantenimiento = time.monotonic()
+        self.stdout.write(f'Procesando reportes con {procesos} procesos (Ctrl+C para salir).')
+        try:
+            while True:
+                libres = procesos - len(en_curso)
+                if libres:
+                    for pk in reportes.reclamar(libres):
+                        en_curso[pool.submit(reportes.ejecutar, pk)] = pk
+                if not en_curso:
+                    if una_vez:
+                        break
+                    time.sleep(intervalo)
+                else:
+                    hechos, _ = wait(en_curso, timeout=intervalo, return_when=FIRST_COMPLETED)
+                    roto = False
+                    for futuro in hechos:
+                        pk = en_curso.pop(futuro)
+                        try:
+                            archivo, tamano = futuro.result()
+                        except BrokenProcessPool:
+                            roto = True
+                            reportes.devolver([pk], 'El proceso que generaba el reporte terminó inesperadamente.')
+                        except Exception as e:
+                            reportes.fallar(pk, e)
+                            self.stderr.write(f'Trabajo {pk}: {e!r}')
+                        else:
+                            reportes.terminar(pk, archivo, tamano)
+                            self.stdout.write(f'Trabajo {pk} listo ({tamano} bytes).')
+                    if roto:
+                        # Los demás futuros del pool roto también fallaron
+                        reportes.devolver(list(en_curso.values()), 'El proceso que generaba el reporte terminó inesperadamente.')
+                        en_curso.clear()
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._pool(procesos)
+
+                if time.monotonic() - mantenimiento > CADA_MANTENIMIENTO:
+                    reportes.recuperar_atascados()
+                    reportes.limpiar()
+                    mantenimiento = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            devueltos = reportes.soltar(list(en_curso.values()))
+            pool.shutdown(wait=False, cancel_futures=True)
+            if devueltos:
+                self.stdout.write(f'{devueltos} trabajos en curso devueltos a la cola.')
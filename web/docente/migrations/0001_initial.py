@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('BOLETA_GRUPO', 'Boleta del grupo'), ('CONCENTRADO', 'Concentrado de calificaciones'), ('ASISTENCIA_GRUPO', 'Asistencia del grupo'), ('CRONOGRAMA', 'Cronograma del plan de clase')], max_length=20)),
+                ('parametros', models.JSONField(default=dict)),
+                ('clave', models.CharField(max_length=64)),
+                ('nombre', models.CharField(max_length=200)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'En cola'), ('PROCESANDO', 'Generando'), ('LISTO', 'Listo'), ('ERROR', 'Error')], default='PENDIENTE', max_length=10)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('archivo', models.CharField(blank=True, max_length=255)),
+                ('tamano', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('creado_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('terminado_en', models.DateTimeField(blank=True, null=True)),
+                ('solicitante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_pdf', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trabajo PDF',
+                'verbose_name_plural': 'Trabajos PDF',
+                'ordering': ['creado_en', 'id'],
+                'indexes': [models.Index(fields=['estado', 'creado_en'], name='docente_tra_estado_cffaed_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trabajopdf',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['PENDIENTE', 'PROCESANDO'])), fields=('clave',), name='trabajo_pdf_unico_en_curso'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docente', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsoCacheReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20, unique=True)),
+                ('aciertos', models.PositiveBigIntegerField(default=0)),
+                ('fallos', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Uso de caché de reportes',
+                'verbose_name_plural': 'Uso de caché de reportes',
+            },
+        ),
+    ]
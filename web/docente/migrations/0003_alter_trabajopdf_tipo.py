@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docente', '0002_usocachereporte'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajopdf',
+            name='tipo',
+            field=models.CharField(choices=[('BOLETA_GRUPO', 'Boleta del grupo'), ('CONCENTRADO', 'Concentrado de calificaciones'), ('ASISTENCIA_GRUPO', 'Asistencia del grupo'), ('CRONOGRAMA', 'Cronograma del plan de clase'), ('BOLETAS', 'Boletas por alumno (PDF único)'), ('BOLETAS_ZIP', 'Boletas por alumno (ZIP)')], max_length=20),
+        ),
+    ]
@@ -1,3 +1,74 @@
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
 
-# Create your models here.
+
+# ==========================================
+# REPORTES PDF EN SEGUNDO PLANO
+# ==========================================
+
+class TrabajoPDF(models.Model):
+    """
+    Un reporte pedido por un usuario y generado por `manage.py procesar_reportes`
+    (docente/reportes.py). Mientras está PENDIENTE o PROCESANDO, un pedido
+    idéntico (misma `clave`) reutiliza el mismo trabajo.
+    """
+    TIPOS = [
+        ('BOLETA_GRUPO',     'Boleta del grupo'),
+        ('CONCENTRADO',      'Concentrado de calificaciones'),
+        ('ASISTENCIA_GRUPO', 'Asistencia del grupo'),
+        ('CRONOGRAMA',       'Cronograma del plan de clase'),
+        ('BOLETAS',          'Boletas por alumno (PDF único)'),
+        ('BOLETAS_ZIP',      'Boletas por alumno (ZIP)'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE',  'En cola'),
+        ('PROCESANDO', 'Generando'),
+        ('LISTO',      'Listo'),
+        ('ERROR',      'Error'),
+    ]
+    EN_CURSO = ('PENDIENTE', 'PROCESANDO')
+
+    solicitante  = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='trabajos_pdf')
+    tipo         = models.CharField(max_length=20, choices=TIPOS)
+    parametros   = models.JSONField(default=dict)
+    clave        = models.CharField(max_length=64)
+    nombre       = models.CharField(max_length=200)
+    estado       = models.CharField(max_length=10, choices=ESTADOS, default='PENDIENTE')
+    intentos     = models.PositiveSmallIntegerField(default=0)
+    archivo      = models.CharField(max_length=255, blank=True)   # relativo a REPORTES_DIR
+    tamano       = models.PositiveIntegerField(default=0)
+    error        = models.TextField(blank=True)
+    creado_en    = models.DateTimeField(default=timezone.now)
+    iniciado_en  = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name        = 'Trabajo PDF'
+        verbose_name_plural = 'Trabajos PDF'
+        ordering            = ['creado_en', 'id']
+        constraints         = [
+            models.UniqueConstraint(
+                fields=['clave'],
+                condition=models.Q(estado__in=['PENDIENTE', 'PROCESANDO']),
+                name='trabajo_pdf_unico_en_curso',
+            ),
+        ]
+        indexes             = [models.Index(fields=['estado', 'creado_en'])]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} — {self.nombre} ({self.estado})"
+
+
+class UsoCacheReporte(models.Model):
+    """Aciertos y fallos de la caché de reportes (docente/cache_reportes.py) por tipo."""
+    tipo     = models.CharField(max_length=20, unique=True)
+    aciertos = models.PositiveBigIntegerField(default=0)
+    fallos   = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name        = 'Uso de caché de reportes'
+        verbose_name_plural = 'Uso de caché de reportes'
+
+    def __str__(self):
+        return f"{self.tipo}: {self.aciertos} aciertos / {self.fallos} fallos"
@@ -2,6 +2,7 @@
 # ─────────────────────────────────────────────────────────────────────────────
 # Utilidades para generar PDFs con ReportLab
 # ─────────────────────────────────────────────────────────────────────────────
+import datetime
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib import colors
@@ -86,7 +87,10 @@ def _header_footer(canvas, doc, titulo, subtitulo, plantel_nombre):
 # ─────────────────────────────────────────────────────────────────────────────
 # PDF 1: BOLETA INDIVIDUAL POR GRUPO
 # ─────────────────────────────────────────────────────────────────────────────
-def generar_pdf_boleta(grupo, asignaturas, filas, docente):
+def generar_pdf_boleta(grupo, matriz, docente):
+    """`matriz` es una academic.calificaciones.MatrizCalificaciones ya calculada."""
+    asignaturas = matriz.asignaturas
+    filas       = matriz.filas
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -132,8 +136,7 @@ def generar_pdf_boleta(grupo, asignaturas, filas, docente):
             row.append(f'{nota:.1f}' if nota is not None else '—')
 
         # Promedio general
-        notas = [c.get('final') for c in fila['cols'] if c.get('final') is not None]
-        prom = round(sum(notas)/len(notas), 1) if notas else None
+        prom = fila['promedio_general']
         row.append(f'{prom:.1f}' if prom is not None else '—')
         data.append(row)
 
@@ -165,9 +168,7 @@ def generar_pdf_boleta(grupo, asignaturas, filas, docente):
 
     # Color por nota
     for row_idx, fila in enumerate(filas, start=1):
-        notas = [c.get('final') for c in fila['cols'] if c.get('final') is not None]
-        prom = round(sum(notas)/len(notas), 1) if notas else None
-        color = _color_nota(prom)
+        color = _color_nota(fila['promedio_general'])
         ts.add('TEXTCOLOR', (-1, row_idx), (-1, row_idx), color)
 
         for col_idx, col in enumerate(fila['cols'], start=1):
@@ -198,8 +199,10 @@ def generar_pdf_boleta(grupo, asignaturas, filas, docente):
 # ─────────────────────────────────────────────────────────────────────────────
 # PDF 2: CONCENTRADO DE CALIFICACIONES
 # ─────────────────────────────────────────────────────────────────────────────
-def generar_pdf_concentrado(grupo, asignaturas, filas, docente):
+def generar_pdf_concentrado(grupo, matriz, docente):
     """Igual que boleta pero con columnas de tareas, actividades y manual."""
+    asignaturas = matriz.asignaturas
+    filas       = matriz.filas
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -230,7 +233,8 @@ def generar_pdf_concentrado(grupo, asignaturas, filas, docente):
 
     for fila in filas:
         row = [fila['alumno'].get_full_name()]
-        for nota in fila['cols']:
+        for col in fila['cols']:
+            nota = col['final']
             row.append(f'{nota:.1f}' if nota is not None else '—')
         prom = fila.get('promedio_general')
         row.append(f'{prom:.1f}' if prom is not None else '—')
@@ -260,8 +264,8 @@ def generar_pdf_concentrado(grupo, asignaturas, filas, docente):
     for row_idx, fila in enumerate(filas, start=1):
         prom = fila.get('promedio_general')
         ts.add('TEXTCOLOR', (-1, row_idx), (-1, row_idx), _color_nota(prom))
-        for col_idx, nota in enumerate(fila['cols'], start=1):
-            ts.add('TEXTCOLOR', (col_idx, row_idx), (col_idx, row_idx), _color_nota(nota))
+        for col_idx, col in enumerate(fila['cols'], start=1):
+            ts.add('TEXTCOLOR', (col_idx, row_idx), (col_idx, row_idx), _color_nota(col['final']))
 
     table.setStyle(ts)
     story.append(table)
@@ -369,4 +373,481 @@ def generar_pdf_asistencia(grupo, asignatura, filas, fecha, docente):
         onLaterPages=lambda c, d: _header_footer(c, d, titulo, subtitulo, plantel_nombre),
     )
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Estilos y encabezado de la boleta por alumno y de los PDF 4 y 5
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _pdf_styles():
+    """Colores y fuentes comunes para todos los PDFs."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+
+    styles  = getSampleStyleSheet()
+    AZUL    = colors.HexColor('#10131c')
+    ACCENT  = colors.HexColor('#4f6ef7')
+    GRIS    = colors.HexColor('#f4f5f9')
+    BORDE   = colors.HexColor('#e8eaf0')
+    INK2    = colors.HexColor('#6b7280')
+    OK      = colors.HexColor('#10b981')
+    DANGER  = colors.HexColor('#e53e3e')
+    WARN    = colors.HexColor('#f59e0b')
+
+    titulo_style = ParagraphStyle(
+        'TituloFRAY',
+        parent=styles['Heading1'],
+        fontName='Helvetica-Bold',
+        fontSize=16,
+        textColor=AZUL,
+        spaceAfter=4,
+    )
+    sub_style = ParagraphStyle(
+        'SubFRAY',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=9,
+        textColor=INK2,
+        spaceAfter=12,
+    )
+    label_style = ParagraphStyle(
+        'LabelFRAY',
+        parent=styles['Normal'],
+        fontName='Helvetica-Bold',
+        fontSize=7,
+        textColor=INK2,
+        spaceAfter=2,
+    )
+    body_style = ParagraphStyle(
+        'BodyFRAY',
+        parent=styles['Normal'],
+        fontName='Helvetica',
+        fontSize=9,
+        textColor=AZUL,
+        leading=13,
+    )
+    return {
+        'styles': styles,
+        'AZUL': AZUL, 'ACCENT': ACCENT, 'GRIS': GRIS,
+        'BORDE': BORDE, 'INK2': INK2, 'OK': OK,
+        'DANGER': DANGER, 'WARN': WARN,
+        'titulo': titulo_style, 'sub': sub_style,
+        'label': label_style, 'body': body_style,
+    }
+
+
+def _pdf_header(canvas_obj, doc, plantel_nombre, titulo_reporte):
+    """Encabezado y pie de página en todas las páginas."""
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+    AZUL   = colors.HexColor('#10131c')
+    ACCENT = colors.HexColor('#4f6ef7')
+    GRIS   = colors.HexColor('#f4f5f9')
+
+    w, h = doc.pagesize
+    canvas_obj.saveState()
+
+    # Barra superior azul marino
+    canvas_obj.setFillColor(AZUL)
+    canvas_obj.rect(0, h - 1.4*cm, w, 1.4*cm, fill=1, stroke=0)
+
+    # Logo FRAY
+    canvas_obj.setFillColor(ACCENT)
+    canvas_obj.roundRect(0.5*cm, h - 1.2*cm, 0.9*cm, 0.9*cm, 3, fill=1, stroke=0)
+    canvas_obj.setFillColor(colors.white)
+    canvas_obj.setFont('Helvetica-Bold', 10)
+    canvas_obj.drawCentredString(0.95*cm, h - 0.82*cm, 'F')
+
+    # Nombre plataforma
+    canvas_obj.setFont('Helvetica-Bold', 11)
+    canvas_obj.setFillColor(colors.white)
+    canvas_obj.drawString(1.6*cm, h - 0.82*cm, 'FRAY')
+
+    # Plantel
+    canvas_obj.setFont('Helvetica', 8)
+    canvas_obj.setFillColor(colors.HexColor('#9ca3af'))
+    canvas_obj.drawString(3.2*cm, h - 0.82*cm, f'· {plantel_nombre}')
+
+    # Título del reporte (derecha)
+    canvas_obj.setFont('Helvetica-Bold', 9)
+    canvas_obj.setFillColor(colors.white)
+    canvas_obj.drawRightString(w - 0.8*cm, h - 0.82*cm, titulo_reporte.upper())
+
+    # Pie de página
+    canvas_obj.setFillColor(GRIS)
+    canvas_obj.rect(0, 0, w, 0.8*cm, fill=1, stroke=0)
+    canvas_obj.setFont('Helvetica', 7)
+    canvas_obj.setFillColor(colors.HexColor('#9ca3af'))
+    canvas_obj.drawString(0.8*cm, 0.28*cm,
+        f'Generado: {datetime.datetime.now().strftime("%d/%m/%Y %H:%M")}  ·  FRAY Sistema Escolar')
+    canvas_obj.drawRightString(w - 0.8*cm, 0.28*cm, f'Página {canvas_obj.getPageNumber()}')
+
+    canvas_obj.restoreState()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF 4: ASISTENCIA DEL GRUPO POR SESIÓN
+# ─────────────────────────────────────────────────────────────────────────────
+
+MESES = ['', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+
+FECHAS_POR_TABLA = 26   # sesiones que caben a lo ancho en carta horizontal
+
+
+def periodo_asistencia(desde, hasta):
+    if (desde.year, desde.month) == (hasta.year, hasta.month):
+        return f'{MESES[desde.month]} {desde.year}'
+    return f'{desde.strftime("%d/%m/%Y")} – {hasta.strftime("%d/%m/%Y")}'
+
+
+def generar_pdf_asistencia_grupo(grupo, desde, hasta, plantel):
+    """
+    P/R/A de cada alumno en cada sesión registrada entre `desde` y `hasta`
+    (un mes o un semestre). Si no caben todas las sesiones a lo ancho, la
+    tabla se parte en bloques de FECHAS_POR_TABLA; los totales van en el último.
+    """
+    from academic.asistencias import MatrizAsistencia, PRESENTE, RETARDO, AUSENTE
+    from users.models import User
+
+    alumnos = User.objects.filter(
+        rol='ALUMNO', alumno_grupo=grupo
+    ).order_by('last_name', 'first_name')
+    matriz = MatrizAsistencia(grupo, alumnos, desde, hasta)
+    fechas = matriz.fechas
+
+    s = _pdf_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(letter),
+        topMargin=2*cm, bottomMargin=1.5*cm,
+        leftMargin=1.5*cm, rightMargin=1.5*cm,
+    )
+
+    def header(c, d):
+        _pdf_header(c, d, plantel.nombre, 'Reporte de Asistencia')
+
+    elements = []
+    elements.append(Paragraph(f'Asistencia — {grupo}', s['titulo']))
+    elements.append(Paragraph(
+        f'{periodo_asistencia(desde, hasta)}  ·  {len(matriz.alumnos)} alumnos  ·  {len(fechas)} sesiones registradas',
+        s['sub']
+    ))
+    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
+    elements.append(Spacer(1, 0.3*cm))
+
+    if not fechas:
+        elements.append(Paragraph('No hay registros de asistencia en este periodo.', s['body']))
+        doc.build(elements, onFirstPage=header, onLaterPages=header)
+        buffer.seek(0)
+        return buffer
+
+    un_mes = (desde.year, desde.month) == (hasta.year, hasta.month)
+    nombres = [[str(i), fila['alumno'].get_full_name()] for i, fila in enumerate(matriz.filas, 1)]
+    totales = [
+        [str(f['presentes']), str(f['retardos']), str(f['ausentes']),
+         f'{f["porcentaje"]}%' if f['porcentaje'] is not None else '—']
+        for f in matriz.filas
+    ]
+    colores = {PRESENTE: s['OK'], RETARDO: s['WARN'], AUSENTE: s['DANGER']}
+
+    # Color de cada celda P/R/A, repartido por bloque
+    marcas = {}
+    for codigo, color in colores.items():
+        for fila, col in matriz.posiciones(codigo):
+            bloque, col = divmod(int(col), FECHAS_POR_TABLA)
+            celda = (col + 2, int(fila) + 1)
+            marcas.setdefault(bloque, []).append(('TEXTCOLOR', celda, celda, color))
+
+    # Anchos de columna adaptativos
+    w_nombre = 5*cm
+    w_num    = 0.5*cm
+    w_tot    = 0.7*cm
+    w_fecha  = max(0.55*cm, min(0.8*cm, 14*cm / len(fechas)))
+
+    for inicio in range(0, len(fechas), FECHAS_POR_TABLA):
+        fin = min(inicio + FECHAS_POR_TABLA, len(fechas))
+        ultimo = fin == len(fechas)
+
+        # Cabecera: Nombre + fechas (+ totales en el último bloque)
+        header_row = ['#', 'Alumno'] + [
+            f.strftime('%d') if un_mes else f.strftime('%d\n%m') for f in fechas[inicio:fin]
+        ] + (['P', 'R', 'F', '%'] if ultimo else [])
+        data = [header_row] + [
+            nombres[i] + fila['celdas'][inicio:fin] + (totales[i] if ultimo else [])
+            for i, fila in enumerate(matriz.filas)
+        ]
+        col_widths = [w_num, w_nombre] + [w_fecha]*(fin - inicio) + ([w_tot]*4 if ultimo else [])
+
+        t = Table(data, colWidths=col_widths, repeatRows=1)
+        style = [
+            ('BACKGROUND',    (0,0), (-1,0), s['AZUL']),
+            ('TEXTCOLOR',     (0,0), (-1,0), colors.white),
+            ('FONTNAME',      (0,0), (-1,0), 'Helvetica-Bold'),
+            ('FONTSIZE',      (0,0), (-1,0), 7),
+            ('ALIGN',         (0,0), (-1,-1), 'CENTER'),
+            ('ALIGN',         (1,0), (1,-1), 'LEFT'),
+            ('FONTNAME',      (0,1), (-1,-1), 'Helvetica'),
+            ('FONTSIZE',      (0,1), (-1,-1), 7),
+            ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
+            ('GRID',          (0,0), (-1,-1), 0.3, s['BORDE']),
+            ('TOPPADDING',    (0,0), (-1,-1), 4),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+        ]
+
+        t.setStyle(TableStyle(style + marcas.get(inicio // FECHAS_POR_TABLA, [])))
+        if inicio:
+            elements.append(Spacer(1, 0.5*cm))
+        elements.append(t)
+
+    doc.build(elements, onFirstPage=header, onLaterPages=header)
+    buffer.seek(0)
+    return buffer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF 5: CRONOGRAMA / TEMARIO DE UN PLAN DE CLASE
+# ─────────────────────────────────────────────────────────────────────────────
+
+def generar_pdf_cronograma(plan, plantel):
+    temas = plan.temas.all()
+
+    s = _pdf_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        topMargin=2*cm, bottomMargin=1.5*cm,
+        leftMargin=1.5*cm, rightMargin=1.5*cm,
+    )
+
+    def header(c, d):
+        _pdf_header(c, d, plantel.nombre, 'Cronograma / Temario')
+
+    elements = []
+
+    # Encabezado del plan
+    elements.append(Paragraph(plan.titulo, s['titulo']))
+    elements.append(Paragraph(
+        f'{plan.asignatura}  ·  {plan.grupo}  ·  '
+        f'{plan.fecha_inicio.strftime("%d/%m/%Y")} – {plan.fecha_fin.strftime("%d/%m/%Y")}  ·  '
+        f'Progreso: {plan.progreso}%',
+        s['sub']
+    ))
+    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
+    elements.append(Spacer(1, 0.3*cm))
+
+    # Objetivo general
+    if plan.objetivo_general:
+        elements.append(Paragraph('OBJETIVO GENERAL', s['label']))
+        elements.append(Paragraph(plan.objetivo_general, s['body']))
+        elements.append(Spacer(1, 0.25*cm))
+
+    # Competencias
+    if plan.competencias:
+        elements.append(Paragraph('COMPETENCIAS A DESARROLLAR', s['label']))
+        elements.append(Paragraph(plan.competencias, s['body']))
+        elements.append(Spacer(1, 0.4*cm))
+
+    # Tabla de temas
+    if temas.exists():
+        elements.append(Paragraph('PLAN DE SESIONES', s['label']))
+        elements.append(Spacer(1, 0.2*cm))
+
+        data = [['#', 'TEMA / SESIÓN', 'FECHA', 'DURACIÓN', 'RECURSOS / EVALUACIÓN', 'EST.']]
+
+        for tema in temas:
+            fecha_str = tema.fecha.strftime('%d/%m/%Y') if tema.fecha else '—'
+            recursos  = (tema.recursos or '') + ('\n' + tema.evaluacion if tema.evaluacion else '')
+            estado    = '✓' if tema.completado else '○'
+            desc      = tema.titulo
+            if tema.descripcion:
+                desc += f'\n{tema.descripcion}'
+            data.append([
+                str(tema.numero),
+                Paragraph(desc, s['body']),
+                fecha_str,
+                f'{tema.duracion_min} min',
+                Paragraph(recursos or '—', s['body']),
+                estado,
+            ])
+
+        col_widths = [0.7*cm, 6*cm, 2*cm, 1.8*cm, 5*cm, 0.8*cm]
+        t = Table(data, colWidths=col_widths, repeatRows=1)
+        t.setStyle(TableStyle([
+            ('BACKGROUND',    (0,0), (-1,0), s['AZUL']),
+            ('TEXTCOLOR',     (0,0), (-1,0), colors.white),
+            ('FONTNAME',      (0,0), (-1,0), 'Helvetica-Bold'),
+            ('FONTSIZE',      (0,0), (-1,0), 7),
+            ('ALIGN',         (0,0), (-1,-1), 'CENTER'),
+            ('ALIGN',         (1,0), (1,-1), 'LEFT'),
+            ('ALIGN',         (4,0), (4,-1), 'LEFT'),
+            ('FONTNAME',      (0,1), (-1,-1), 'Helvetica'),
+            ('FONTSIZE',      (0,1), (-1,-1), 8),
+            ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
+            ('GRID',          (0,0), (-1,-1), 0.3, s['BORDE']),
+            ('TOPPADDING',    (0,0), (-1,-1), 6),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 6),
+            ('VALIGN',        (0,0), (-1,-1), 'TOP'),
+        ]))
+
+        # Colorear estado completado
+        for i, tema in enumerate(temas, 1):
+            color = s['OK'] if tema.completado else s['INK2']
+            t.setStyle(TableStyle([
+                ('TEXTCOLOR', (5, i), (5, i), color),
+                ('FONTNAME',  (5, i), (5, i), 'Helvetica-Bold'),
+                ('FONTSIZE',  (5, i), (5, i), 11),
+            ]))
+
+        elements.append(t)
+    else:
+        elements.append(Paragraph('Este plan no tiene sesiones registradas aún.', s['body']))
+
+    # Firma
+    elements.append(Spacer(1, 1.5*cm))
+    firma_data = [
+        ['Docente:', plan.docente.get_full_name(), 'Firma:', '___________________________'],
+    ]
+    ft = Table(firma_data, colWidths=[2*cm, 6*cm, 2*cm, 6*cm])
+    ft.setStyle(TableStyle([
+        ('FONTNAME',  (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE',  (0,0), (-1,-1), 8),
+        ('TEXTCOLOR', (0,0), (0,-1), s['INK2']),
+        ('TEXTCOLOR', (2,0), (2,-1), s['INK2']),
+        ('FONTNAME',  (0,0), (0,-1), 'Helvetica-Bold'),
+        ('FONTNAME',  (2,0), (2,-1), 'Helvetica-Bold'),
+    ]))
+    elements.append(ft)
+
+    doc.build(elements, onFirstPage=header, onLaterPages=header)
+    buffer.seek(0)
+    return buffer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PDF 6: BOLETA POR ALUMNO (una sola o en lote, docente/boletas.py)
+# ─────────────────────────────────────────────────────────────────────────────
+# `datos` es un dict de docente/boletas.py: nombre, matricula, grupo, estatus y
+# notas [(asignatura, calificación)]. Sin modelos, para poder generarla en
+# otro proceso.
+
+def _doc_boleta_alumno(buffer):
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        topMargin=2*cm, bottomMargin=1.5*cm,
+        leftMargin=1.5*cm, rightMargin=1.5*cm,
+    )
+
+
+def elementos_boleta_alumno(datos, s):
+    """Flowables de la boleta de un alumno; `s` es el resultado de _pdf_styles()."""
+    elements = []
+
+    # Datos del alumno
+    elements.append(Paragraph(datos['nombre'], s['titulo']))
+    elements.append(Paragraph(
+        f'Matrícula: {datos["matricula"]}  ·  Grupo: {datos["grupo"] or "Sin grupo"}  ·  '
+        f'Estatus: {datos["estatus"]}',
+        s['sub']
+    ))
+    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
+    elements.append(Spacer(1, 0.3*cm))
+
+    # Tabla de calificaciones
+    notas = datos['notas']
+    data = [['ASIGNATURA', 'CALIFICACIÓN', 'ESTADO']]
+    for asignatura, nota in notas:
+        data.append([asignatura, f'{nota:.1f}', 'Aprobado' if nota >= 6 else 'Reprobado'])
+    if not notas:
+        data.append(['Sin calificaciones registradas', '—', '—'])
+
+    col_widths = [10*cm, 3*cm, 4*cm]
+    estilo = [
+        # Encabezado
+        ('BACKGROUND',   (0,0), (-1,0), s['AZUL']),
+        ('TEXTCOLOR',    (0,0), (-1,0), colors.white),
+        ('FONTNAME',     (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE',     (0,0), (-1,0), 8),
+        ('ALIGN',        (0,0), (-1,0), 'CENTER'),
+        ('BOTTOMPADDING',(0,0), (-1,0), 8),
+        ('TOPPADDING',   (0,0), (-1,0), 8),
+        # Filas
+        ('FONTNAME',     (0,1), (-1,-1), 'Helvetica'),
+        ('FONTSIZE',     (0,1), (-1,-1), 9),
+        ('ALIGN',        (1,1), (2,-1), 'CENTER'),
+        ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
+        ('GRID',         (0,0), (-1,-1), 0.5, s['BORDE']),
+        ('TOPPADDING',   (0,1), (-1,-1), 7),
+        ('BOTTOMPADDING',(0,1), (-1,-1), 7),
+    ]
+    # Color condicional en calificaciones
+    for i, (_, nota) in enumerate(notas, 1):
+        color = s['OK'] if nota >= 7 else (s['WARN'] if nota >= 6 else s['DANGER'])
+        estilo += [
+            ('TEXTCOLOR', (1, i), (1, i), color),
+            ('FONTNAME',  (1, i), (1, i), 'Helvetica-Bold'),
+            ('FONTSIZE',  (1, i), (1, i), 12),
+        ]
+    t = Table(data, colWidths=col_widths, repeatRows=1)
+    t.setStyle(TableStyle(estilo))
+    elements.append(t)
+    elements.append(Spacer(1, 0.5*cm))
+
+    # Promedio general
+    if notas:
+        prom = sum(nota for _, nota in notas) / len(notas)
+        color_prom = s['OK'] if prom >= 7 else (s['WARN'] if prom >= 6 else s['DANGER'])
+        pt = Table([['', 'PROMEDIO GENERAL', f'{prom:.2f}']], colWidths=col_widths)
+        pt.setStyle(TableStyle([
+            ('BACKGROUND',   (0,0), (-1,-1), s['AZUL']),
+            ('TEXTCOLOR',    (0,0), (-1,-1), colors.white),
+            ('FONTNAME',     (0,0), (-1,-1), 'Helvetica-Bold'),
+            ('FONTSIZE',     (0,0), (1,0),   9),
+            ('FONTSIZE',     (2,0), (2,0),   14),
+            ('TEXTCOLOR',    (2,0), (2,0),   color_prom),
+            ('ALIGN',        (0,0), (-1,-1), 'CENTER'),
+            ('TOPPADDING',   (0,0), (-1,-1), 10),
+            ('BOTTOMPADDING',(0,0), (-1,-1), 10),
+        ]))
+        elements.append(pt)
+    return elements
+
+
+def generar_pdf_boleta_alumno(datos, plantel_nombre, s=None):
+    s = s or _pdf_styles()
+    buffer = BytesIO()
+
+    def header(c, d):
+        _pdf_header(c, d, plantel_nombre, 'Boleta de Calificaciones')
+
+    _doc_boleta_alumno(buffer).build(elementos_boleta_alumno(datos, s), onFirstPage=header, onLaterPages=header)
+    buffer.seek(0)
+    return buffer
+
+
+def generar_pdf_boletas(lista, plantel_nombre, s=None):
+    """Las boletas de `lista` en un solo PDF, cada una desde una página nueva."""
+    from reportlab.platypus import PageBreak
+
+    s = s or _pdf_styles()
+    buffer = BytesIO()
+
+    def header(c, d):
+        _pdf_header(c, d, plantel_nombre, 'Boleta de Calificaciones')
+
+    elements = []
+    for datos in lista:
+        if elements:
+            elements.append(PageBreak())
+        elements += elementos_boleta_alumno(datos, s)
+    if not elements:
+        elements.append(Paragraph('Sin alumnos.', s['sub']))
+    _doc_boleta_alumno(buffer).build(elements, onFirstPage=header, onLaterPages=header)
+    buffer.seek(0)
+    return buffer
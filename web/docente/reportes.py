@@ -0,0 +1,223 @@
+# docente/reportes.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Cola de reportes PDF (TrabajoPDF)
+#
+# Las vistas de boleta, concentrado, asistencia del grupo y cronograma ya no
+# generan el PDF dentro de la petición: `encolar` registra un TrabajoPDF y la
+# vista redirige a una página que consulta su estado. `manage.py
+# procesar_reportes` toma los trabajos de la base de datos y los genera en un
+# pool de procesos; no hace falta ningún broker.
+#
+#   · Deduplicación: la clave es un hash de (tipo, parámetros, solicitante) y
+#     una restricción única parcial impide dos trabajos en curso iguales.
+#   · Reclamo: cada trabajo se toma con un UPDATE condicionado al estado, así
+#     varios workers pueden compartir la misma cola.
+#   · Atascados: un trabajo PROCESANDO por más de VENCE_PROCESANDO (worker
+#     caído) vuelve a la cola hasta MAX_INTENTOS veces.
+#   · El PDF queda en la caché por contenido (docente/cache_reportes.py); las
+#     vistas la consultan antes de encolar.
+# ─────────────────────────────────────────────────────────────────────────────
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache_reportes
+from .models import TrabajoPDF
+
+MAX_INTENTOS = 3
+VENCE_PROCESANDO = datetime.timedelta(minutes=10)
+ADJUNTOS = ('BOLETA_GRUPO', 'CONCENTRADO', 'BOLETAS', 'BOLETAS_ZIP')   # el resto se abre en el navegador
+
+
+# ── Encolar ──────────────────────────────────────────────────────────────────
+
+def clave_trabajo(usuario, tipo, parametros):
+    datos = json.dumps([tipo, parametros, usuario.pk], sort_keys=True)
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+def encolar(usuario, tipo, parametros, nombre):
+    """TrabajoPDF en curso para este pedido; lo crea si no hay uno igual."""
+    clave = clave_trabajo(usuario, tipo, parametros)
+    for _ in range(2):
+        existente = TrabajoPDF.objects.filter(clave=clave, estado__in=TrabajoPDF.EN_CURSO).first()
+        if existente:
+            return existente
+        try:
+            with transaction.atomic():
+                return TrabajoPDF.objects.create(
+                    solicitante=usuario, tipo=tipo, parametros=parametros,
+                    clave=clave, nombre=nombre,
+                )
+        except IntegrityError:
+            # Otra petición igual lo creó entre la consulta y el INSERT
+            continue
+    return TrabajoPDF.objects.get(clave=clave, estado__in=TrabajoPDF.EN_CURSO)
+
+
+def posicion_en_cola(trabajo):
+    """Trabajos pendientes por delante de `trabajo` (0 si ya se está generando)."""
+    if trabajo.estado != 'PENDIENTE':
+        return 0
+    return TrabajoPDF.objects.filter(estado='PENDIENTE', creado_en__lt=trabajo.creado_en).count()
+
+
+# ── Generación (se ejecuta en los procesos del pool) ─────────────────────────
+
+def _datos_grupo(trabajo):
+    from academic.models import Grupo
+    from users.models import DocenteGrupo
+
+    grupo = Grupo.objects.get(pk=trabajo.parametros['grupo_id'], plantel=trabajo.solicitante.plantel)
+    asignaturas = [
+        a.asignatura for a in DocenteGrupo.objects
+        .filter(docente=trabajo.solicitante, activo=True, grupo=grupo)
+        .select_related('asignatura')
+    ]
+    alumnos = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
+    return grupo, asignaturas, alumnos
+
+
+def _boleta_grupo(trabajo):
+    from academic.calificaciones import MatrizCalificaciones
+    from .pdf_utils import generar_pdf_boleta
+
+    grupo, asignaturas, alumnos = _datos_grupo(trabajo)
+    return generar_pdf_boleta(grupo, MatrizCalificaciones(grupo, asignaturas, alumnos), trabajo.solicitante)
+
+
+def _concentrado(trabajo):
+    from academic.calificaciones import MatrizCalificaciones
+    from .pdf_utils import generar_pdf_concentrado
+
+    grupo, asignaturas, alumnos = _datos_grupo(trabajo)
+    return generar_pdf_concentrado(grupo, MatrizCalificaciones(grupo, asignaturas, alumnos), trabajo.solicitante)
+
+
+def _asistencia_grupo(trabajo):
+    from academic.models import Grupo
+    from .pdf_utils import generar_pdf_asistencia_grupo
+
+    plantel = trabajo.solicitante.plantel
+    grupo = Grupo.objects.get(pk=trabajo.parametros['grupo_id'], plantel=plantel)
+    desde, hasta = cache_reportes.periodo_asistencia(trabajo.parametros)
+    return generar_pdf_asistencia_grupo(grupo, desde, hasta, plantel)
+
+
+def _cronograma(trabajo):
+    from academic.models import PlanClase
+    from .pdf_utils import generar_pdf_cronograma
+
+    plan = PlanClase.objects.get(pk=trabajo.parametros['plan_id'], docente=trabajo.solicitante)
+    return generar_pdf_cronograma(plan, trabajo.solicitante.plantel)
+
+
+def _boletas(trabajo):
+    from . import boletas
+
+    plantel = trabajo.solicitante.plantel
+    lista = boletas.datos_boletas(boletas.alumnos_boletas(
+        plantel, trabajo.parametros.get('grupo_id'), trabajo.parametros.get('grado'),
+    ))
+    if trabajo.tipo == 'BOLETAS_ZIP':
+        return boletas.exportar_zip(lista, plantel.nombre, procesos=settings.BOLETAS_PROCESOS)
+    return boletas.exportar_pdf(lista, plantel.nombre)
+
+
+GENERADORES = {
+    'BOLETA_GRUPO':     _boleta_grupo,
+    'CONCENTRADO':      _concentrado,
+    'ASISTENCIA_GRUPO': _asistencia_grupo,
+    'CRONOGRAMA':       _cronograma,
+    'BOLETAS':          _boletas,
+    'BOLETAS_ZIP':      _boletas,
+}
+
+
+def ejecutar(trabajo_id):
+    """
+    Genera el PDF del trabajo y lo deja en la caché de reportes (si los datos
+    no cambiaron desde otro pedido, ya está ahí). Devuelve (ruta relativa, tamaño).
+    """
+    trabajo = TrabajoPDF.objects.select_related('solicitante__plantel').get(pk=trabajo_id)
+    huella = cache_reportes.huella(trabajo.tipo, trabajo.parametros, trabajo.solicitante)
+    relativa = cache_reportes.buscar(trabajo.tipo, huella, contar=False)
+    if relativa is not None:
+        try:
+            return relativa, (cache_reportes.directorio() / relativa).stat().st_size
+        except FileNotFoundError:
+            pass   # podado entre buscar() y stat(): se genera de nuevo
+    buffer = GENERADORES[trabajo.tipo](trabajo)
+    relativa = cache_reportes.guardar(trabajo.tipo, huella, buffer.getbuffer())
+    return relativa, len(buffer.getbuffer())
+
+
+# ── Estado (lo actualiza solo el proceso principal del worker) ───────────────
+
+def reclamar(cantidad):
+    """Pasa a PROCESANDO hasta `cantidad` trabajos pendientes, los más viejos primero."""
+    candidatos = (
+        TrabajoPDF.objects.filter(estado='PENDIENTE')
+        .order_by('creado_en', 'id').values_list('id', flat=True)[:cantidad * 2]
+    )
+    tomados = []
+    for pk in candidatos:
+        if len(tomados) >= cantidad:
+            break
+        if TrabajoPDF.objects.filter(pk=pk, estado='PENDIENTE').update(
+            estado='PROCESANDO', iniciado_en=timezone.now(), intentos=F('intentos') + 1,
+        ):
+            tomados.append(pk)
+    return tomados
+
+
+def terminar(trabajo_id, archivo, tamano):
+    TrabajoPDF.objects.filter(pk=trabajo_id, estado='PROCESANDO').update(
+        estado='LISTO', archivo=archivo, tamano=tamano, terminado_en=timezone.now(),
+    )
+
+
+def fallar(trabajo_id, error):
+    TrabajoPDF.objects.filter(pk=trabajo_id, estado='PROCESANDO').update(
+        estado='ERROR', error=str(error)[:2000] or error.__class__.__name__, terminado_en=timezone.now(),
+    )
+
+
+def devolver(trabajo_ids, motivo):
+    """Regresa trabajos PROCESANDO a la cola; los que agotaron intentos quedan en ERROR."""
+    en_proceso = TrabajoPDF.objects.filter(pk__in=trabajo_ids, estado='PROCESANDO')
+    en_proceso.filter(intentos__gte=MAX_INTENTOS).update(
+        estado='ERROR', error=motivo, terminado_en=timezone.now(),
+    )
+    return en_proceso.filter(intentos__lt=MAX_INTENTOS).update(estado='PENDIENTE', iniciado_en=None)
+
+
+def soltar(trabajo_ids):
+    """Regresa a la cola trabajos interrumpidos al detener el worker, sin gastar un intento."""
+    return TrabajoPDF.objects.filter(pk__in=trabajo_ids, estado='PROCESANDO').update(
+        estado='PENDIENTE', iniciado_en=None, intentos=F('intentos') - 1,
+    )
+
+
+def recuperar_atascados():
+    atascados = TrabajoPDF.objects.filter(
+        estado='PROCESANDO', iniciado_en__lt=timezone.now() - VENCE_PROCESANDO,
+    ).values_list('id', flat=True)
+    return devolver(list(atascados), 'El worker no terminó el reporte a tiempo.')
+
+
+def limpiar():
+    """
+    Borra trabajos terminados con más de REPORTES_RETENCION_H horas. Los PDFs
+    son de la caché de reportes, que los poda por su cuenta.
+    """
+    limite = timezone.now() - datetime.timedelta(hours=settings.REPORTES_RETENCION_H)
+    borrados, _ = TrabajoPDF.objects.filter(
+        estado__in=('LISTO', 'ERROR'), terminado_en__lt=limite,
+    ).delete()
+    return borrados
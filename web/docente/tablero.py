@@ -0,0 +1,117 @@
+# docente/tablero.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Tablero de tareas y actividades del docente
+#
+# Una sola consulta trae todas las tareas (o actividades) del docente con sus
+# contadores de entregas; las columnas (activas, vencidas, borradores, por
+# calificar) se reparten aquí en Python. Cada columna se pagina por cursor
+# (creada_en, pk) y no por número de página, así que agregar o publicar una
+# tarea no mueve lo que el docente ya estaba viendo.
+#
+# Lo usan docente.views.tareas, actividades y calificar_tareas.
+# ─────────────────────────────────────────────────────────────────────────────
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+POR_PAGINA = 30
+EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+COLUMNAS = {
+    'activas':       lambda o, ahora: o.publicada and o.fecha_entrega >= ahora,
+    'vencidas':      lambda o, ahora: o.publicada and o.fecha_entrega < ahora,
+    'borradores':    lambda o, ahora: not o.publicada,
+    'por_calificar': lambda o, ahora: o.publicada and o.total_entregas > o.entregas_calificadas,
+}
+
+
+def tareas_docente(docente, grupo_id=None, asignatura_id=None):
+    from academic.models import Tarea
+
+    qs = Tarea.objects.filter(docente=docente, activa=True).defer('descripcion').annotate(
+        total_entregas=Count('entregas'),
+        entregas_calificadas=Count('entregas', filter=Q(entregas__estado='CALIFICADA')),
+    )
+    return _filtrar(qs, grupo_id, asignatura_id)
+
+
+def actividades_docente(docente, grupo_id=None, asignatura_id=None):
+    from academic.models import Actividad
+
+    qs = Actividad.objects.filter(docente=docente).defer('instrucciones').annotate(
+        total_entregas=Count('entregas'),
+        entregas_calificadas=Count('entregas', filter=Q(entregas__calificacion__isnull=False)),
+    )
+    return _filtrar(qs, grupo_id, asignatura_id)
+
+
+def _filtrar(qs, grupo_id, asignatura_id):
+    if grupo_id:
+        qs = qs.filter(grupo_id=grupo_id)
+    if asignatura_id:
+        qs = qs.filter(asignatura_id=asignatura_id)
+    return qs.select_related('grupo__carrera', 'asignatura').order_by('-creada_en', '-pk')
+
+
+# ── Cursores ─────────────────────────────────────────────────────────────────
+
+def _llave(obj):
+    return (obj.creada_en, obj.pk)
+
+
+def cursor(obj):
+    return f'{(obj.creada_en - EPOCA) // timedelta(microseconds=1)}.{obj.pk}'
+
+
+def leer_cursor(valor):
+    """(creada_en, pk) de un cursor, o None si no viene o no es válido."""
+    try:
+        micros, pk = (valor or '').split('.')
+        return EPOCA + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, OverflowError):
+        return None
+
+
+# ── Tablero ──────────────────────────────────────────────────────────────────
+
+def armar_tablero(qs, columnas=('activas', 'vencidas', 'borradores'), cursores=None, por_pagina=POR_PAGINA):
+    """
+    {columna: {'items', 'total', 'siguiente', 'paginada'}} con una sola
+    consulta. `cursores` trae el cursor de cada columna (el de la última fila
+    ya vista); `siguiente` es el cursor de la página que sigue, o None.
+    """
+    ahora = timezone.now()
+    cursores = {c: leer_cursor((cursores or {}).get(c)) for c in columnas}
+    tablero = {c: {'items': [], 'total': 0, 'siguiente': None, 'paginada': cursores[c] is not None}
+               for c in columnas}
+
+    for obj in qs:   # ya viene de la más reciente a la más antigua
+        for c in columnas:
+            if not COLUMNAS[c](obj, ahora):
+                continue
+            col = tablero[c]
+            col['total'] += 1
+            if cursores[c] is not None and _llave(obj) >= cursores[c]:
+                continue
+            if len(col['items']) < por_pagina:
+                col['items'].append(obj)
+            elif col['siguiente'] is None:
+                col['siguiente'] = cursor(col['items'][-1])
+    return tablero
+
+
+def enlaces(tablero, params):
+    """
+    Agrega a cada columna los querystrings `url_siguiente` y `url_inicio`
+    conservando los filtros de `params` (request.GET).
+    """
+    for c, col in tablero.items():
+        for clave, valor in (('url_siguiente', col['siguiente']), ('url_inicio', None)):
+            q = params.copy()
+            q.pop(c, None)
+            if valor:
+                q[c] = valor
+            q['tab'] = c
+            col[clave] = q.urlencode()
+    return tablero
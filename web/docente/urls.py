@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     # ── Dashboard docente ─────────────────────────────────────────────────────
     path('',                             views.dashboard_docente,    name='dashboard_docente'),
+    path('notificaciones/',              views.notificaciones,       name='docente_notificaciones'),
 
     # ── Mi Espacio ────────────────────────────────────────────────────────────
     path('grupos/',                      views.mis_grupos,           name='docente_mis_grupos'),
@@ -12,6 +13,7 @@ urlpatterns = [
 
     # ── Asistencia ────────────────────────────────────────────────────────────
     path('asistencia/',                  views.lista_asistencia,     name='docente_lista_asistencia'),
+    path('asistencia/mes/',              views.asistencia_mes,       name='docente_asistencia_mes'),
 
     # ── Tareas ────────────────────────────────────────────────────────────────
     path('tareas/',                      views.tareas,               name='docente_tareas'),
@@ -19,17 +21,21 @@ urlpatterns = [
     path('tareas/<int:pk>/',             views.detalle_tarea,        name='detalle_tarea'),
     path('tareas/<int:pk>/editar/',      views.editar_tarea,         name='editar_tarea'),
     path('tareas/<int:pk>/eliminar/',    views.eliminar_tarea,       name='eliminar_tarea'),
+    path('tareas/<int:pk>/entregas.zip', views.descargar_entregas_tarea, name='descargar_entregas_tarea'),
 
     # ── Actividades ───────────────────────────────────────────────────────────
     path('actividades/',                 views.actividades,              name='docente_actividades'),
     path('actividades/crear/',           views.crear_actividad,          name='crear_actividad'),
     path('actividades/<int:pk>/',        views.detalle_actividad,        name='detalle_actividad'),
+    path('actividades/<int:pk>/analisis/', views.analisis_actividad,   name='analisis_actividad'),
     path('actividades/<int:pk>/editar/', views.editar_actividad,         name='editar_actividad'),
     path('actividades/<int:pk>/eliminar/', views.eliminar_actividad,     name='eliminar_actividad'),
+    path('actividades/<int:pk>/entregas.zip', views.descargar_entregas_actividad, name='descargar_entregas_actividad'),
 
     # ── Calificaciones ────────────────────────────────────────────────────────
     path('calificar/tareas/',            views.calificar_tareas,         name='docente_calificar_tareas'),
     path('calificar/actividades/',       views.calificar_actividades,    name='docente_calificar_actividades'),
+    path('calificar/entregas/',          views.calificar_entregas,       name='calificar_entregas'),
     path('boleta/',                      views.boleta,                   name='docente_boleta'),
     path('boleta/<int:grupo_id>/',       views.boleta_grupo,             name='docente_boleta_grupo'),
     path('concentrado/',                 views.concentrado,              name='docente_concentrado'),
@@ -53,11 +59,16 @@ urlpatterns = [
     # ── Utilidades ────────────────────────────────────────────────────────────
     path('ver-pdf/<int:pk>/<str:tipo>/', views.ver_pdf,                  name='ver_pdf'),
     path('pdf/boleta/<int:alumno_pk>/',       views.pdf_boleta_alumno,   name='pdf_boleta_alumno'),
+    path('pdf/boletas/',                      views.pdf_boletas,         name='pdf_boletas'),
     path('pdf/asistencia/<int:grupo_pk>/',    views.pdf_asistencia_grupo,name='pdf_asistencia_grupo'),
     path('pdf/cronograma/<int:plan_pk>/',     views.pdf_cronograma,      name='pdf_cronograma'),
 
     # ── Exportación PDF ───────────────────────────────────────────────────────
-    path('pdf/boleta/<int:grupo_id>/',                          views.pdf_boleta_grupo, name='pdf_boleta_grupo'),
+    path('pdf/boleta/grupo/<int:grupo_id>/',                    views.pdf_boleta_grupo, name='pdf_boleta_grupo'),
     path('pdf/concentrado/<int:grupo_id>/',                     views.pdf_concentrado,  name='pdf_concentrado'),
     path('pdf/asistencia/<int:grupo_id>/<int:asignatura_id>/',  views.pdf_asistencia,   name='pdf_asistencia'),
+    path('reportes/<int:pk>/',                                  views.reporte,            name='docente_reporte'),
+    path('reportes/<int:pk>/estado/',                           views.reporte_estado,     name='docente_reporte_estado'),
+    path('reportes/<int:pk>/descargar/',                        views.reporte_descargar,  name='docente_reporte_descargar'),
+    path('reportes/cache/',                                     views.reporte_cache,      name='docente_reporte_cache'),
 ]
\ No newline at end of file
@@ -4,9 +4,8 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from users.models import DocenteGrupo
 from django.utils import timezone
-from django.db.models import F, Q, Avg, Count, Case, When, IntegerField
+from django.db.models import F, Avg, Count, Case, When, IntegerField
 import cloudinary
-import requests as req
 from django.http import JsonResponse
 from academic.models import Tarea, EntregaTarea, EntregaActividad
 
@@ -55,6 +54,7 @@ def _get_grupo_seguro(grupo_id, docente):
 @docente_required
 def dashboard_docente(request):
     from academic.models import Grupo, Asistencia
+    from academic.eventos import feed, no_leidos
     from users.views import get_campus_theme
 
     theme   = get_campus_theme(request.user)
@@ -70,7 +70,8 @@ def dashboard_docente(request):
             docentes_asignados__activo=True,
         )
         .distinct()
-        .prefetch_related('alumnos', 'asignaturas')
+        .select_related('carrera')
+        .with_kpis()
     )
 
     total_alumnos = (
@@ -92,16 +93,50 @@ def dashboard_docente(request):
         if registros_hoy > 0 else "Sin registro"
     )
 
+    notificaciones, siguiente = feed(request.user)
+
     return render(request, 'inicio/dashboard_docente.html', {
         'grupos':         grupos,
         'total_alumnos':  total_alumnos,
         'alumnos_riesgo': alumnos_riesgo,
         'asistencia_hoy': asistencia_hoy,
+        'notificaciones': notificaciones,
+        'notif_siguiente': siguiente,
+        'notif_no_leidas': no_leidos(request.user),
         'hoy':            hoy,
         **theme,
     })
 
 
+@docente_required
+def notificaciones(request):
+    """
+    GET: página del feed de actividad (?antes=<cursor>&limite=N) y el total
+    sin leer. POST: marca como leídas las notificaciones hasta el id `hasta`
+    (todas si no viene).
+    """
+    from academic.eventos import feed, no_leidos, marcar_leidos, FEED_LIMITE
+
+    if request.method == 'POST':
+        try:
+            hasta = int(request.POST.get('hasta') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'hasta inválido'}, status=400)
+        marcadas = marcar_leidos(request.user, hasta or None)
+        return JsonResponse({'marcadas': marcadas, 'no_leidas': no_leidos(request.user)})
+
+    try:
+        limite = int(request.GET.get('limite') or FEED_LIMITE)
+        items, siguiente = feed(request.user, request.GET.get('antes'), limite)
+    except (ValueError, OverflowError):
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+    return JsonResponse({
+        'notificaciones': [{**n, 'fecha': n['fecha'].isoformat()} for n in items],
+        'siguiente':      siguiente,
+        'no_leidas':      no_leidos(request.user),
+    })
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # MI ESPACIO
 # ─────────────────────────────────────────────────────────────────────────────
@@ -117,7 +152,8 @@ def mis_grupos(request):
             docentes_asignados__activo=True,
         )
         .distinct()
-        .prefetch_related('alumnos', 'asignaturas')
+        .select_related('carrera')
+        .with_kpis()
     )
     return render(request, 'docente/mis_grupos.html', {'grupos': grupos})
 
@@ -142,7 +178,8 @@ def mi_horario(request):
 
 @docente_required
 def lista_asistencia(request):
-    from academic.models import Asistencia, Grupo, Asignatura
+    from academic.models import Asistencia, AsistenciaMensual, Grupo, Asignatura
+    from academic.asistencias import registrar_asistencia
     from datetime import date
 
     asignaciones = (
@@ -198,15 +235,12 @@ def lista_asistencia(request):
         }
         ya_guardado = bool(registros_hoy)
 
-        resumen_qs = Asistencia.objects.filter(
-            grupo=grupo, asignatura=asignatura,
-            fecha__month=fecha.month, fecha__year=fecha.year,
-        ).values('alumno_id').annotate(
-            presentes=Count('id', filter=Q(estado='P')),
-            ausentes =Count('id', filter=Q(estado='A')),
-            retardos =Count('id', filter=Q(estado='R')),
-        )
-        resumen = {r['alumno_id']: r for r in resumen_qs}
+        resumen = {
+            r['alumno_id']: r
+            for r in AsistenciaMensual.objects.filter(
+                grupo=grupo, asignatura=asignatura, anio=fecha.year, mes=fecha.month,
+            ).values('alumno_id', 'presentes', 'ausentes', 'retardos')
+        }
 
         for alumno in alumnos:
             estado_actual = registros_hoy.get(alumno.pk, 'P')
@@ -223,35 +257,15 @@ def lista_asistencia(request):
             })
 
         if request.method == 'POST' and 'guardar' in request.POST:
-            for fila in filas:
-                alumno = fila['alumno']
-                estado = request.POST.get(f'estado_{alumno.pk}', 'A')
-                if estado not in ('P', 'A', 'R'):
-                    estado = 'A'
-
-                # Si asignatura es None, usar filter+update o create explícito
-                if asignatura:
-                    Asistencia.objects.update_or_create(
-                        alumno=alumno,
-                        grupo=grupo,
-                        asignatura=asignatura,
-                        fecha=fecha,
-                        defaults={'estado': estado},
-                    )
-                else:
-                    # Sin asignatura, buscar manualmente para no duplicar
-                    obj, created = Asistencia.objects.get_or_create(
-                        alumno=alumno,
-                        grupo=grupo,
-                        asignatura=None,
-                        fecha=fecha,
-                        defaults={'estado': estado},
-                    )
-                    if not created:
-                        obj.estado = estado
-                        obj.save()
+            cambios = registrar_asistencia(grupo, asignatura, fecha, {
+                fila['alumno'].pk: request.POST.get(f'estado_{fila["alumno"].pk}', 'A')
+                for fila in filas
+            })
 
-            messages.success(request, f'✅ Asistencia del {fecha.strftime("%d/%m/%Y")} guardada.')
+            messages.success(
+                request,
+                f'✅ Asistencia del {fecha.strftime("%d/%m/%Y")} guardada ({len(cambios)} cambios).'
+            )
             return redirect(
                 f"{request.path}?grupo_id={grupo_id}&asignatura_id={asignatura_id}&fecha={fecha}"
             )
@@ -266,13 +280,59 @@ def lista_asistencia(request):
     })
 
 
+@docente_required
+def asistencia_mes(request):
+    """Cuadrícula alumno × sesión del mes (?mes=AAAA-MM) para un grupo y asignatura del docente."""
+    import calendar
+    from datetime import date, timedelta
+    from academic.asistencias import MatrizAsistencia
+    from .pdf_utils import MESES
+
+    asignacion = (
+        DocenteGrupo.objects
+        .filter(
+            docente=request.user, activo=True,
+            grupo_id=request.GET.get('grupo_id') or None,
+            asignatura_id=request.GET.get('asignatura_id') or None,
+            grupo__plantel=request.user.plantel,
+        )
+        .select_related('grupo__carrera', 'asignatura')
+        .first()
+    )
+    if not asignacion:
+        messages.error(request, 'No tienes permiso para ese grupo/asignatura.')
+        return redirect('docente_lista_asistencia')
+
+    try:
+        anio, mes = map(int, request.GET.get('mes', '').split('-'))
+        desde = date(anio, mes, 1)
+    except ValueError:
+        desde = date.today().replace(day=1)
+    hasta = desde.replace(day=calendar.monthrange(desde.year, desde.month)[1])
+
+    grupo = asignacion.grupo
+    alumnos = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
+    matriz = MatrizAsistencia(grupo, alumnos, desde, hasta, asignacion.asignatura)
+
+    return render(request, 'docente/asistencia_mes.html', {
+        'grupo':      grupo,
+        'asignatura': asignacion.asignatura,
+        'desde':      desde,
+        'titulo_mes': f'{MESES[desde.month]} {desde.year}',
+        'anterior':   (desde - timedelta(days=1)).strftime('%Y-%m'),
+        'siguiente':  (hasta + timedelta(days=1)).strftime('%Y-%m'),
+        'fechas':     matriz.fechas,
+        'filas':      matriz.filas,
+    })
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # TAREAS
 # ─────────────────────────────────────────────────────────────────────────────
 
 @docente_required
 def tareas(request):
-    from academic.models import Tarea
+    from .tablero import armar_tablero, enlaces, tareas_docente
 
     asignaciones = (
         DocenteGrupo.objects
@@ -287,32 +347,19 @@ def tareas(request):
 
     grupo_id      = request.GET.get('grupo_id', '')
     asignatura_id = request.GET.get('asignatura_id', '')
-    ahora         = timezone.now()
 
-    qs = (
-        Tarea.objects
-        .filter(docente=request.user, activa=True)
-        .select_related('grupo', 'asignatura')
-        .annotate(
-            total_entregas=Count('entregas'),
-            entregas_calificadas=Count('entregas', filter=Q(entregas__estado='CALIFICADA')),
-        )
-    )
-
-    if grupo_id:
-        qs = qs.filter(grupo_id=grupo_id)
-    if asignatura_id:
-        qs = qs.filter(asignatura_id=asignatura_id)
-
-    activas    = qs.filter(publicada=True,  fecha_entrega__gte=ahora)
-    vencidas   = qs.filter(publicada=True,  fecha_entrega__lt=ahora)
-    borradores = qs.filter(publicada=False)
+    # Una consulta para las tres columnas, cada una paginada por cursor
+    tablero = enlaces(armar_tablero(
+        tareas_docente(request.user, grupo_id, asignatura_id), cursores=request.GET,
+    ), request.GET)
 
     return render(request, 'docente/tareas.html', {
         'asignaciones':  asignaciones,
-        'activas':       activas,
-        'vencidas':      vencidas,
-        'borradores':    borradores,
+        'tablero':       tablero,
+        'activas':       tablero['activas']['items'],
+        'vencidas':      tablero['vencidas']['items'],
+        'borradores':    tablero['borradores']['items'],
+        'tab':           request.GET.get('tab') if request.GET.get('tab') in tablero else 'activas',
         'grupo_id':      grupo_id,
         'asignatura_id': asignatura_id,
     })
@@ -442,35 +489,86 @@ def detalle_tarea(request, pk):
 
 @docente_required
 def ver_pdf(request, pk, tipo):
-    from academic.models import Tarea, EntregaTarea, EntregaActividad
+    """
+    Sirve por el proxy de docente/archivos.py el PDF de una tarea o entrega,
+    o el archivo de un material de apoyo (tipo='material').
+    """
+    from academic.models import Tarea, EntregaTarea, EntregaActividad, MaterialApoyo
+    from .archivos import servir_archivo, url_pdf, url_archivo
+    from .cache_archivos import clave_archivo
 
     if tipo == 'tarea':
         obj = get_object_or_404(Tarea, pk=pk, docente=request.user)
+        nombre = obj.titulo
     elif tipo == 'entrega':
-        obj = get_object_or_404(EntregaTarea, pk=pk, tarea__docente=request.user)
+        obj = get_object_or_404(EntregaTarea.objects.select_related('alumno', 'tarea'),
+                                pk=pk, tarea__docente=request.user)
+        nombre = f'{obj.alumno.get_full_name()} - {obj.tarea.titulo}'
     elif tipo == 'actividad':
-        obj = get_object_or_404(EntregaActividad, pk=pk, actividad__docente=request.user)
+        obj = get_object_or_404(EntregaActividad.objects.select_related('alumno', 'actividad'),
+                                pk=pk, actividad__docente=request.user)
+        nombre = f'{obj.alumno.get_full_name()} - {obj.actividad.titulo}'
+    elif tipo == 'material':
+        obj = get_object_or_404(MaterialApoyo, pk=pk, docente=request.user)
+        nombre = obj.titulo
     else:
         return redirect('docente_tareas')
 
-    public_id = str(obj.archivo) if obj.archivo else None
-    if not public_id:
-        return redirect('docente_tareas')
+    if not obj.archivo:
+        return redirect('material_apoyo' if tipo == 'material' else 'docente_tareas')
+
+    if tipo == 'material':
+        formato = obj.archivo.format
+        return servir_archivo(
+            request, url_archivo(obj.archivo), f'{nombre}.{formato}' if formato else nombre,
+            clave_cache=clave_archivo(obj.archivo),
+        )
+    return servir_archivo(
+        request, url_pdf(obj.archivo), f'{nombre}.pdf', content_type='application/pdf',
+        clave_cache=clave_archivo(obj.archivo),
+    )
 
-    from django.conf import settings
-    from django.http import HttpResponse
-    cloud = settings.CLOUDINARY_STORAGE['CLOUD_NAME']
-    if not public_id.endswith('.pdf'):
-        public_id += '.pdf'
-    url = f'https://res.cloudinary.com/{cloud}/raw/upload/{public_id}'
-
-    r = req.get(url)
-    response = HttpResponse(r.content, content_type='application/pdf')
-    response['Content-Disposition'] = 'inline; filename="documento.pdf"'
-    response['X-Frame-Options'] = 'SAMEORIGIN'
+
+def _zip_entregas(titulo, filas):
+    from django.http import StreamingHttpResponse
+    from django.utils.http import content_disposition_header
+    from .descargas import zip_entregas
+
+    response = StreamingHttpResponse(zip_entregas(titulo, filas), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, f'{titulo} - entregas.zip')
     return response
 
 
+@docente_required
+def descargar_entregas_tarea(request, pk):
+    """ZIP con el PDF de cada entrega de la tarea y un manifiesto de calificaciones."""
+    from academic.models import Tarea
+    from .descargas import filas_entregas
+
+    tarea = get_object_or_404(Tarea, pk=pk, docente=request.user)
+    filas = filas_entregas(
+        tarea.grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name'),
+        tarea.entregas.all(),
+        lambda e: e.estado,
+    )
+    return _zip_entregas(tarea.titulo, filas)
+
+
+@docente_required
+def descargar_entregas_actividad(request, pk):
+    """ZIP con el archivo de cada entrega de la actividad y un manifiesto de calificaciones."""
+    from academic.models import Actividad
+    from .descargas import filas_entregas
+
+    actividad = get_object_or_404(Actividad, pk=pk, docente=request.user)
+    filas = filas_entregas(
+        actividad.grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name'),
+        actividad.entregas.all(),
+        lambda e: 'CALIFICADA' if e.calificacion is not None else 'ENTREGADA',
+    )
+    return _zip_entregas(actividad.titulo, filas)
+
+
 @docente_required
 def editar_tarea(request, pk):
     from academic.models import Tarea
@@ -529,7 +627,7 @@ def eliminar_tarea(request, pk):
 
 @docente_required
 def actividades(request):
-    from academic.models import Actividad
+    from .tablero import actividades_docente, armar_tablero, enlaces
 
     asignaciones = (
         DocenteGrupo.objects
@@ -545,23 +643,17 @@ def actividades(request):
     grupo_id      = request.GET.get('grupo_id')
     asignatura_id = request.GET.get('asignatura_id')
 
-    qs = (
-        Actividad.objects
-        .filter(docente=request.user)
-        .select_related('grupo', 'asignatura')
-        .annotate(total_entregas=Count('entregas'))
-    )
-    if grupo_id:
-        qs = qs.filter(grupo_id=grupo_id)
-    if asignatura_id:
-        qs = qs.filter(asignatura_id=asignatura_id)
+    tablero = enlaces(armar_tablero(
+        actividades_docente(request.user, grupo_id, asignatura_id), cursores=request.GET,
+    ), request.GET)
 
-    ahora = timezone.now()
     return render(request, 'docente/actividades.html', {
         'asignaciones':  asignaciones,
-        'activas':       qs.filter(publicada=True,  fecha_entrega__gte=ahora),
-        'vencidas':      qs.filter(publicada=True,  fecha_entrega__lt=ahora),
-        'borradores':    qs.filter(publicada=False),
+        'tablero':       tablero,
+        'activas':       tablero['activas']['items'],
+        'vencidas':      tablero['vencidas']['items'],
+        'borradores':    tablero['borradores']['items'],
+        'tab':           request.GET.get('tab') if request.GET.get('tab') in tablero else 'activas',
         'grupo_id':      grupo_id,
         'asignatura_id': asignatura_id,
     })
@@ -569,7 +661,9 @@ def actividades(request):
 
 @docente_required
 def crear_actividad(request):
-    from academic.models import Actividad, PreguntaActividad, OpcionRespuesta
+    from django.db import transaction
+    from academic.models import Actividad
+    from academic.preguntas import crear_preguntas, leer_preguntas
 
     asignaciones = (
         DocenteGrupo.objects
@@ -602,42 +696,24 @@ def crear_actividad(request):
             if not asignacion:
                 messages.error(request, 'No tienes permiso para ese grupo/asignatura.')
             else:
-                actividad = Actividad.objects.create(
-                    docente=request.user,
-                    grupo=asignacion.grupo,
-                    asignatura=asignacion.asignatura,
-                    titulo=titulo,
-                    instrucciones=instrucciones,
-                    tipo=tipo,
-                    fecha_entrega=fecha_entrega,
-                    url_interactiva=url_interactiva if tipo == 'INTERACTIVA' else '',
-                    archivo=archivo,
-                    calificacion_automatica=cal_auto,
-                    publicada=request.POST.get('publicada') == '1',
-                )
+                # Una transacción: la calificación automática corre una vez, al final
+                with transaction.atomic():
+                    actividad = Actividad.objects.create(
+                        docente=request.user,
+                        grupo=asignacion.grupo,
+                        asignatura=asignacion.asignatura,
+                        titulo=titulo,
+                        instrucciones=instrucciones,
+                        tipo=tipo,
+                        fecha_entrega=fecha_entrega,
+                        url_interactiva=url_interactiva if tipo == 'INTERACTIVA' else '',
+                        archivo=archivo,
+                        calificacion_automatica=cal_auto,
+                        publicada=request.POST.get('publicada') == '1',
+                    )
 
-                if tipo in ('MULTIPLE', 'ABIERTA'):
-                    textos   = request.POST.getlist('pregunta_texto')
-                    puntos_l = request.POST.getlist('pregunta_puntos')
-                    for i, texto in enumerate(textos):
-                        if not texto.strip():
-                            continue
-                        pregunta = PreguntaActividad.objects.create(
-                            actividad=actividad,
-                            texto=texto.strip(),
-                            orden=i,
-                            puntos=puntos_l[i] if i < len(puntos_l) else 1,
-                        )
-                        if tipo == 'MULTIPLE':
-                            opciones     = request.POST.getlist(f'opcion_texto_{i}')
-                            correcta_idx = request.POST.get(f'opcion_correcta_{i}', '0')
-                            for j, op_texto in enumerate(opciones):
-                                if op_texto.strip():
-                                    OpcionRespuesta.objects.create(
-                                        pregunta=pregunta,
-                                        texto=op_texto.strip(),
-                                        es_correcta=(str(j) == correcta_idx),
-                                    )
+                    if tipo in ('MULTIPLE', 'ABIERTA'):
+                        crear_preguntas(actividad, leer_preguntas(request.POST, tipo))
 
                 messages.success(request, f'✅ Actividad "{titulo}" creada.')
                 return redirect('detalle_actividad', pk=actividad.pk)
@@ -678,6 +754,12 @@ def detalle_actividad(request, pk):
             messages.error(request, 'Entrega no encontrada.')
         return redirect('detalle_actividad', pk=pk)
 
+    if request.method == 'POST' and 'recalificar' in request.POST:
+        from academic.autocalificacion import calificar_actividad
+        cambios = calificar_actividad(actividad)
+        messages.success(request, f'Calificación automática: {cambios} entregas actualizadas.')
+        return redirect('detalle_actividad', pk=pk)
+
     if request.method == 'POST' and 'toggle_publicar' in request.POST:
         actividad.publicada    = not actividad.publicada
         actividad.publicada_en = timezone.now() if actividad.publicada else None
@@ -685,6 +767,11 @@ def detalle_actividad(request, pk):
         messages.success(request, f'Actividad {"publicada" if actividad.publicada else "despublicada"}.')
         return redirect('detalle_actividad', pk=pk)
 
+    analisis = None
+    if actividad.tipo == 'MULTIPLE':
+        from academic.analisis_items import analizar
+        analisis = analizar(actividad)
+
     return render(request, 'docente/detalle_actividad.html', {
         'actividad':         actividad,
         'filas':             filas,
@@ -693,12 +780,25 @@ def detalle_actividad(request, pk):
         'total_entregaron':  len([f for f in filas if f['entrega']]),
         'total_calificadas': len([f for f in filas if f['estado'] == 'CALIFICADA']),
         'total_pendientes':  alumnos.count() - len([f for f in filas if f['entrega']]),
+        'analisis':          analisis,
     })
 
 
+@docente_required
+def analisis_actividad(request, pk):
+    """Dificultad, discriminación, distractores y alfa de Cronbach de una actividad de opción múltiple."""
+    from academic.models import Actividad
+    from academic.analisis_items import analizar
+
+    actividad = get_object_or_404(Actividad, pk=pk, docente=request.user, tipo='MULTIPLE')
+    return JsonResponse(analizar(actividad))
+
+
 @docente_required
 def editar_actividad(request, pk):
-    from academic.models import Actividad, PreguntaActividad, OpcionRespuesta
+    from django.db import transaction
+    from academic.models import Actividad
+    from academic.preguntas import actualizar_preguntas, leer_preguntas
 
     actividad = get_object_or_404(Actividad, pk=pk, docente=request.user)
 
@@ -724,38 +824,19 @@ def editar_actividad(request, pk):
         if not all([titulo, fecha_entrega]):
             messages.error(request, 'Título y fecha son obligatorios.')
         else:
-            actividad.titulo          = titulo
-            actividad.instrucciones   = instrucciones
-            actividad.fecha_entrega   = fecha_entrega
-            actividad.url_interactiva = url_interactiva
-            actividad.publicada       = publicada
-            if archivo:
-                actividad.archivo = archivo
-            actividad.save()
-
-            if actividad.tipo in ('MULTIPLE', 'ABIERTA'):
-                actividad.preguntas.all().delete()
-                textos   = request.POST.getlist('pregunta_texto')
-                puntos_l = request.POST.getlist('pregunta_puntos')
-                for i, texto in enumerate(textos):
-                    if not texto.strip():
-                        continue
-                    pregunta = PreguntaActividad.objects.create(
-                        actividad=actividad,
-                        texto=texto.strip(),
-                        orden=i,
-                        puntos=puntos_l[i] if i < len(puntos_l) else 1,
-                    )
-                    if actividad.tipo == 'MULTIPLE':
-                        opciones     = request.POST.getlist(f'opcion_texto_{i}')
-                        correcta_idx = request.POST.get(f'opcion_correcta_{i}', '0')
-                        for j, op_texto in enumerate(opciones):
-                            if op_texto.strip():
-                                OpcionRespuesta.objects.create(
-                                    pregunta=pregunta,
-                                    texto=op_texto.strip(),
-                                    es_correcta=(str(j) == correcta_idx),
-                                )
+            # Una transacción: la calificación automática corre una vez, al final
+            with transaction.atomic():
+                actividad.titulo          = titulo
+                actividad.instrucciones   = instrucciones
+                actividad.fecha_entrega   = fecha_entrega
+                actividad.url_interactiva = url_interactiva
+                actividad.publicada       = publicada
+                if archivo:
+                    actividad.archivo = archivo
+                actividad.save()
+
+                if actividad.tipo in ('MULTIPLE', 'ABIERTA'):
+                    actualizar_preguntas(actividad, leer_preguntas(request.POST, actividad.tipo))
 
             messages.success(request, f'✅ Actividad "{titulo}" actualizada.')
             return redirect('detalle_actividad', pk=pk)
@@ -782,12 +863,45 @@ def eliminar_actividad(request, pk):
 
 @docente_required
 def calificar_tareas(request):
+    from academic.models import EntregaTarea
+    from .tablero import armar_tablero, enlaces, tareas_docente
+
     asignaciones = (
         DocenteGrupo.objects
         .filter(docente=request.user, activo=True, grupo__plantel=request.user.plantel)
         .select_related('grupo', 'asignatura')
     )
-    return render(request, 'docente/calificar_tareas.html', {'asignaciones': asignaciones})
+    grupo_id      = request.GET.get('grupo_id', '')
+    asignatura_id = request.GET.get('asignatura_id', '')
+
+    # Tareas publicadas con entregas sin calificar
+    tablero = enlaces(armar_tablero(
+        tareas_docente(request.user, grupo_id, asignatura_id),
+        columnas=('por_calificar',), cursores=request.GET,
+    ), request.GET)
+    columna = tablero['por_calificar']
+
+    # Entregas sin calificar de las tareas de esta página, para calificarlas ahí mismo
+    pendientes = {}
+    for entrega in (
+        EntregaTarea.objects
+        .filter(tarea__in=[t.pk for t in columna['items']])
+        .exclude(estado='CALIFICADA')
+        .select_related('alumno')
+        .order_by('alumno__last_name', 'alumno__first_name', 'pk')
+    ):
+        if entrega.archivo:
+            entrega.archivo_url = fix_pdf_url(entrega.archivo.url)
+        pendientes.setdefault(entrega.tarea_id, []).append(entrega)
+    for tarea in columna['items']:
+        tarea.pendientes = pendientes.get(tarea.pk, [])
+
+    return render(request, 'docente/calificar_tareas.html', {
+        'asignaciones':  asignaciones,
+        'columna':       columna,
+        'grupo_id':      grupo_id,
+        'asignatura_id': asignatura_id,
+    })
 
 
 @docente_required
@@ -800,6 +914,34 @@ def calificar_actividades(request):
     return render(request, 'docente/calificar_actividades.html', {'asignaciones': asignaciones})
 
 
+@docente_required
+def calificar_entregas(request):
+    """
+    Califica en bloque entregas de tareas o actividades del docente.
+    POST JSON: {"tipo": "tarea"|"actividad", "entregas": [{"id", "calificacion", "feedback"}]}.
+    """
+    import json
+    from academic.models import EntregaActividad, EntregaTarea
+    from academic.calificaciones import calificar_entregas as calificar
+
+    if request.method != 'POST':
+        return JsonResponse({'ok': False, 'error': 'Método no permitido.'}, status=405)
+    try:
+        data = json.loads(request.body)
+        modelo = {'tarea': EntregaTarea, 'actividad': EntregaActividad}[data.get('tipo', 'tarea')]
+        filas = [f for f in data.get('entregas', []) if isinstance(f, dict)]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'ok': False, 'error': 'Solicitud inválida.'}, status=400)
+
+    guardadas, errores, contadores = calificar(request.user, modelo, filas)
+    return JsonResponse({
+        'ok':         not errores,
+        'guardadas':  guardadas,
+        'errores':    {str(pk): msg for pk, msg in errores.items()},
+        'contadores': {str(pk): c for pk, c in contadores.items()},
+    })
+
+
 @docente_required
 def boleta(request):
     asignaciones = (
@@ -814,7 +956,8 @@ def boleta(request):
 
 @docente_required
 def boleta_grupo(request, grupo_id):
-    from academic.models import Grupo, Calificacion, EntregaTarea, EntregaActividad
+    from academic.models import Grupo
+    from academic.calificaciones import MatrizCalificaciones, validar_notas, guardar_notas
 
     # Fix crítico: verificar plantel + pertenencia del docente
     grupo = get_object_or_404(
@@ -835,66 +978,46 @@ def boleta_grupo(request, grupo_id):
     asignaturas = [a.asignatura for a in asignaciones]
     alumnos     = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
 
+    errores = {}
     if request.method == 'POST':
+        capturadas = {}
         for key, value in request.POST.items():
             if key.startswith('cal_'):
-                _, alumno_id, asig_id = key.split('_')
                 try:
-                    nota = float(value)
-                    if 0 <= nota <= 10:
-                        Calificacion.objects.update_or_create(
-                            alumno_id=alumno_id,
-                            asignatura_id=asig_id,
-                            grupo=grupo,
-                            tipo='MANUAL',
-                            defaults={'nota': nota, 'docente': request.user}
-                        )
-                except (ValueError, TypeError):
-                    pass
-        messages.success(request, 'Calificaciones guardadas.')
-        return redirect('docente_boleta_grupo', grupo_id=grupo_id)
-
-    filas = []
-    for alumno in alumnos:
-        cols = []
-        for asig in asignaturas:
-            prom_tareas = EntregaTarea.objects.filter(
-                alumno=alumno, tarea__asignatura=asig,
-                tarea__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            prom_actividades = EntregaActividad.objects.filter(
-                alumno=alumno, actividad__asignatura=asig,
-                actividad__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            cal_manual = Calificacion.objects.filter(
-                alumno=alumno, asignatura=asig, grupo=grupo, tipo='MANUAL',
-            ).first()
-
-            valores = [v for v in [
-                prom_tareas, prom_actividades,
-                cal_manual.nota if cal_manual else None,
-            ] if v is not None]
-            promedio_final = round(sum(valores) / len(valores), 2) if valores else None
-
-            cols.append({
-                'asignatura':  asig,
-                'prom_tareas': round(float(prom_tareas), 2) if prom_tareas else None,
-                'prom_activ':  round(float(prom_actividades), 2) if prom_actividades else None,
-                'manual':      float(cal_manual.nota) if cal_manual else None,
-                'final':       promedio_final,
-            })
-        filas.append({'alumno': alumno, 'cols': cols})
+                    _, alumno_id, asig_id = key.split('_')
+                    capturadas[(int(alumno_id), int(asig_id))] = value
+                except ValueError:
+                    continue
+
+        notas, errores = validar_notas(
+            capturadas,
+            alumnos_ids=set(alumnos.values_list('pk', flat=True)),
+            asignaturas_ids={a.pk for a in asignaturas},
+        )
+        if not errores:
+            guardar_notas(grupo, notas, docente=request.user)
+            messages.success(request, 'Calificaciones guardadas.')
+            return redirect('docente_boleta_grupo', grupo_id=grupo_id)
+        messages.error(request, f'Revisa {len(errores)} calificación(es) marcadas; no se guardó ningún cambio.')
+
+    matriz = MatrizCalificaciones(grupo, asignaturas, alumnos)
+    if errores:
+        # Se conserva lo capturado para que el docente corrija sin volver a teclear
+        for fila in matriz.filas:
+            for col in fila['cols']:
+                clave = (fila['alumno'].pk, col['asignatura'].pk)
+                col['manual'] = capturadas.get(clave, col['manual'])
+                col['error']  = errores.get(clave)
 
     return render(request, 'docente/boleta_grupo.html', {
-        'grupo': grupo, 'asignaturas': asignaturas, 'filas': filas,
+        'grupo': grupo, 'asignaturas': asignaturas, 'filas': matriz.filas,
     })
 
 
 @docente_required
 def concentrado(request):
-    from academic.models import Grupo, Calificacion, EntregaTarea, EntregaActividad
+    from academic.models import Grupo
+    from academic.calificaciones import MatrizCalificaciones
 
     grupo_id = request.GET.get('grupo_id')
 
@@ -927,32 +1050,7 @@ def concentrado(request):
         asignaturas = [a.asignatura for a in asignaciones.filter(grupo=grupo)]
         alumnos     = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
 
-        for alumno in alumnos:
-            cols = []
-            for asig in asignaturas:
-                prom_tareas = EntregaTarea.objects.filter(
-                    alumno=alumno, tarea__asignatura=asig,
-                    tarea__grupo=grupo, calificacion__isnull=False,
-                ).aggregate(p=Avg('calificacion'))['p']
-
-                prom_activ = EntregaActividad.objects.filter(
-                    alumno=alumno, actividad__asignatura=asig,
-                    actividad__grupo=grupo, calificacion__isnull=False,
-                ).aggregate(p=Avg('calificacion'))['p']
-
-                cal_manual = Calificacion.objects.filter(
-                    alumno=alumno, asignatura=asig, grupo=grupo, tipo='MANUAL',
-                ).first()
-
-                valores = [v for v in [
-                    prom_tareas, prom_activ,
-                    cal_manual.nota if cal_manual else None,
-                ] if v is not None]
-                cols.append(round(sum(valores) / len(valores), 2) if valores else None)
-
-            valores_fila     = [c for c in cols if c is not None]
-            promedio_general = round(sum(valores_fila) / len(valores_fila), 2) if valores_fila else None
-            filas.append({'alumno': alumno, 'cols': cols, 'promedio_general': promedio_general})
+        filas = MatrizCalificaciones(grupo, asignaturas, alumnos).filas
 
     return render(request, 'docente/concentrado.html', {
         'grupos': grupos, 'grupo': grupo, 'asignaturas': asignaturas,
@@ -1205,7 +1303,7 @@ from django.utils import timezone
 from django.db.models import Count, Avg, Q
 from academic.models import (
     PlanClase, TemaClase, Grupo, Asignatura,
-    Calificacion, Asistencia
+    Calificacion
 )
 import datetime
 
@@ -1397,487 +1495,181 @@ def eliminar_plan(request, pk):
 # EXPORTACIÓN PDF — usa ReportLab (pip install reportlab)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _pdf_styles():
-    """Colores y fuentes comunes para todos los PDFs."""
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-
-    styles  = getSampleStyleSheet()
-    AZUL    = colors.HexColor('#10131c')
-    ACCENT  = colors.HexColor('#4f6ef7')
-    GRIS    = colors.HexColor('#f4f5f9')
-    BORDE   = colors.HexColor('#e8eaf0')
-    INK2    = colors.HexColor('#6b7280')
-    OK      = colors.HexColor('#10b981')
-    DANGER  = colors.HexColor('#e53e3e')
-    WARN    = colors.HexColor('#f59e0b')
-
-    titulo_style = ParagraphStyle(
-        'TituloFRAY',
-        parent=styles['Heading1'],
-        fontName='Helvetica-Bold',
-        fontSize=16,
-        textColor=AZUL,
-        spaceAfter=4,
-    )
-    sub_style = ParagraphStyle(
-        'SubFRAY',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=9,
-        textColor=INK2,
-        spaceAfter=12,
-    )
-    label_style = ParagraphStyle(
-        'LabelFRAY',
-        parent=styles['Normal'],
-        fontName='Helvetica-Bold',
-        fontSize=7,
-        textColor=INK2,
-        spaceAfter=2,
-    )
-    body_style = ParagraphStyle(
-        'BodyFRAY',
-        parent=styles['Normal'],
-        fontName='Helvetica',
-        fontSize=9,
-        textColor=AZUL,
-        leading=13,
-    )
-    return {
-        'styles': styles,
-        'AZUL': AZUL, 'ACCENT': ACCENT, 'GRIS': GRIS,
-        'BORDE': BORDE, 'INK2': INK2, 'OK': OK,
-        'DANGER': DANGER, 'WARN': WARN,
-        'titulo': titulo_style, 'sub': sub_style,
-        'label': label_style, 'body': body_style,
-    }
+# ── PDF 1: Boleta de calificaciones por alumno ────────────────────────────────
 
+@login_required
+def pdf_boleta_alumno(request, alumno_pk):
+    from users.models import User
+    from .boletas import datos_boletas
+    from .pdf_utils import generar_pdf_boleta_alumno
+    from . import cache_reportes
 
-def _pdf_header(canvas_obj, doc, plantel_nombre, titulo_reporte):
-    """Encabezado y pie de página en todas las páginas."""
-    from reportlab.lib import colors
-    from reportlab.lib.units import cm
-    AZUL   = colors.HexColor('#10131c')
-    ACCENT = colors.HexColor('#4f6ef7')
-    GRIS   = colors.HexColor('#f4f5f9')
+    alumno = get_object_or_404(User, pk=alumno_pk, plantel=request.user.plantel, rol='ALUMNO')
+    nombre = f'boleta_{alumno.username}.pdf'
+    huella = cache_reportes.huella('BOLETA_ALUMNO', {'alumno_id': alumno.pk}, request.user)
+    respuesta = cache_reportes.responder(request, 'BOLETA_ALUMNO', huella, nombre)
+    if respuesta:
+        return respuesta
 
-    w, h = doc.pagesize
-    canvas_obj.saveState()
+    datos, = datos_boletas(User.objects.filter(pk=alumno.pk))
+    buffer = generar_pdf_boleta_alumno(datos, request.user.plantel.nombre)
+    relativa = cache_reportes.guardar('BOLETA_ALUMNO', huella, buffer.getbuffer())
+    return cache_reportes.servir(request, relativa, nombre)
 
-    # Barra superior azul marino
-    canvas_obj.setFillColor(AZUL)
-    canvas_obj.rect(0, h - 1.4*cm, w, 1.4*cm, fill=1, stroke=0)
 
-    # Logo FRAY
-    canvas_obj.setFillColor(ACCENT)
-    canvas_obj.roundRect(0.5*cm, h - 1.2*cm, 0.9*cm, 0.9*cm, 3, fill=1, stroke=0)
-    canvas_obj.setFillColor(colors.white)
-    canvas_obj.setFont('Helvetica-Bold', 10)
-    canvas_obj.drawCentredString(0.95*cm, h - 0.82*cm, 'F')
+@login_required
+def pdf_boletas(request):
+    """
+    Boletas individuales de un grupo (?grupo=), un grado (?grado=) o todo el
+    plantel, en un solo PDF o en un ZIP (?formato=zip). Se generan en la cola
+    de reportes.
+    """
+    from academic.models import Grupo
 
-    # Nombre plataforma
-    canvas_obj.setFont('Helvetica-Bold', 11)
-    canvas_obj.setFillColor(colors.white)
-    canvas_obj.drawString(1.6*cm, h - 0.82*cm, 'FRAY')
+    user    = request.user
+    grupo   = None
+    grado   = request.GET.get('grado', '')
+    formato = request.GET.get('formato', 'pdf')
+    if request.GET.get('grupo'):
+        grupo = get_object_or_404(Grupo, pk=request.GET['grupo'], plantel=user.plantel)
+    elif grado and not grado.isdigit():
+        messages.error(request, 'Grado inválido.')
+        return redirect('docente_boleta')
 
-    # Plantel
-    canvas_obj.setFont('Helvetica', 8)
-    canvas_obj.setFillColor(colors.HexColor('#9ca3af'))
-    canvas_obj.drawString(3.2*cm, h - 0.82*cm, f'· {plantel_nombre}')
+    if not (user.es_director or user.es_coordinador or user.is_staff):
+        # Un docente solo puede sacar las boletas de sus grupos
+        if grupo is None or not DocenteGrupo.objects.filter(docente=user, grupo=grupo, activo=True).exists():
+            messages.error(request, 'No tienes acceso a este grupo.')
+            return redirect('docente_boleta')
 
-    # Título del reporte (derecha)
-    canvas_obj.setFont('Helvetica-Bold', 9)
-    canvas_obj.setFillColor(colors.white)
-    canvas_obj.drawRightString(w - 0.8*cm, h - 0.82*cm, titulo_reporte.upper())
+    if grupo:
+        parametros, alcance = {'grupo_id': grupo.pk}, str(grupo)
+    elif grado:
+        parametros, alcance = {'grado': int(grado)}, f'{grado}º grado'
+    else:
+        parametros, alcance = {}, user.plantel.nombre
+    tipo = 'BOLETAS_ZIP' if formato == 'zip' else 'BOLETAS'
+    nombre = f'boletas {alcance}.{"zip" if tipo == "BOLETAS_ZIP" else "pdf"}'
+    return _reporte_en_cola(request, tipo, parametros, nombre)
 
-    # Pie de página
-    canvas_obj.setFillColor(GRIS)
-    canvas_obj.rect(0, 0, w, 0.8*cm, fill=1, stroke=0)
-    canvas_obj.setFont('Helvetica', 7)
-    canvas_obj.setFillColor(colors.HexColor('#9ca3af'))
-    canvas_obj.drawString(0.8*cm, 0.28*cm,
-        f'Generado: {datetime.datetime.now().strftime("%d/%m/%Y %H:%M")}  ·  FRAY Sistema Escolar')
-    canvas_obj.drawRightString(w - 0.8*cm, 0.28*cm, f'Página {canvas_obj.getPageNumber()}')
 
-    canvas_obj.restoreState()
+# ── PDF 2: Reporte de asistencia del grupo ───────────────────────────────────
 
+@login_required
+def pdf_asistencia_grupo(request, grupo_pk):
+    """Un mes (?mes=&anio=, por defecto el actual) o un periodo (?desde=&hasta=, hasta un año)."""
+    import calendar
+    from .pdf_utils import MESES
 
-# ── PDF 1: Boleta de calificaciones por alumno ────────────────────────────────
+    grupo = get_object_or_404(Grupo, pk=grupo_pk, plantel=request.user.plantel)
+    hoy   = datetime.date.today()
+    try:
+        if request.GET.get('desde') and request.GET.get('hasta'):
+            desde = datetime.date.fromisoformat(request.GET['desde'])
+            hasta = datetime.date.fromisoformat(request.GET['hasta'])
+            if not datetime.timedelta(0) <= hasta - desde <= datetime.timedelta(days=366):
+                raise ValueError
+        else:
+            mes   = int(request.GET.get('mes', hoy.month))
+            anio  = int(request.GET.get('anio', hoy.year))
+            desde = datetime.date(anio, mes, 1)
+            hasta = datetime.date(anio, mes, calendar.monthrange(anio, mes)[1])
+    except ValueError:
+        desde = hoy.replace(day=1)
+        hasta = hoy.replace(day=calendar.monthrange(hoy.year, hoy.month)[1])
 
-@login_required
-def pdf_boleta_alumno(request, alumno_pk):
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.units import cm
-    from reportlab.lib import colors
-    from users.models import User
+    if (desde.year, desde.month) == (hasta.year, hasta.month):
+        nombre = f'asistencia_{grupo.nombre}_{MESES[desde.month]}{desde.year}.pdf'
+    else:
+        nombre = f'asistencia_{grupo.nombre}_{desde}_{hasta}.pdf'
+    return _reporte_en_cola(
+        request, 'ASISTENCIA_GRUPO', {'grupo_id': grupo.pk, 'desde': desde.isoformat(), 'hasta': hasta.isoformat()},
+        nombre,
+    )
 
-    alumno = get_object_or_404(User, pk=alumno_pk, plantel=request.user.plantel, rol='ALUMNO')
-    calificaciones = Calificacion.objects.filter(
-        alumno=alumno
-    ).select_related('asignatura').order_by('asignatura__nombre')
 
-    s = _pdf_styles()
-    plantel = request.user.plantel
+# ── PDF 3: Cronograma / Temario del docente ───────────────────────────────────
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'inline; filename="boleta_{alumno.username}.pdf"'
-    )
+@docente_required
+def pdf_cronograma(request, plan_pk):
+    plan = get_object_or_404(PlanClase, pk=plan_pk, docente=request.user)
+    return _reporte_en_cola(request, 'CRONOGRAMA', {'plan_id': plan.pk}, f'cronograma_{plan.pk}.pdf')
 
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=letter,
-        topMargin=2*cm, bottomMargin=1.5*cm,
-        leftMargin=1.5*cm, rightMargin=1.5*cm,
-    )
 
-    def header(c, d):
-        _pdf_header(c, d, plantel.nombre, 'Boleta de Calificaciones')
-
-    elements = []
-
-    # Datos del alumno
-    elements.append(Paragraph(alumno.get_full_name(), s['titulo']))
-    elements.append(Paragraph(
-        f'Matrícula: {alumno.username}  ·  Grupo: {alumno.alumno_grupo or "Sin grupo"}  ·  '
-        f'Estatus: {alumno.get_estatus_display()}',
-        s['sub']
-    ))
-    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
-    elements.append(Spacer(1, 0.3*cm))
-
-    # Tabla de calificaciones
-    data = [['ASIGNATURA', 'CALIFICACIÓN', 'ESTADO']]
-    promedio_total = 0
-    count = 0
-
-    for cal in calificaciones:
-        nota = float(cal.nota)
-        promedio_total += nota
-        count += 1
-        estado = 'Aprobado' if nota >= 6 else 'Reprobado'
-        data.append([
-            cal.asignatura.nombre,
-            f'{nota:.1f}',
-            estado,
-        ])
-
-    if not calificaciones.exists():
-        data.append(['Sin calificaciones registradas', '—', '—'])
-
-    col_widths = [10*cm, 3*cm, 4*cm]
-    t = Table(data, colWidths=col_widths, repeatRows=1)
-    t.setStyle(TableStyle([
-        # Encabezado
-        ('BACKGROUND',   (0,0), (-1,0), s['AZUL']),
-        ('TEXTCOLOR',    (0,0), (-1,0), colors.white),
-        ('FONTNAME',     (0,0), (-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE',     (0,0), (-1,0), 8),
-        ('ALIGN',        (0,0), (-1,0), 'CENTER'),
-        ('BOTTOMPADDING',(0,0), (-1,0), 8),
-        ('TOPPADDING',   (0,0), (-1,0), 8),
-        # Filas
-        ('FONTNAME',     (0,1), (-1,-1), 'Helvetica'),
-        ('FONTSIZE',     (0,1), (-1,-1), 9),
-        ('ALIGN',        (1,1), (2,-1), 'CENTER'),
-        ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
-        ('GRID',         (0,0), (-1,-1), 0.5, s['BORDE']),
-        ('TOPPADDING',   (0,1), (-1,-1), 7),
-        ('BOTTOMPADDING',(0,1), (-1,-1), 7),
-    ]))
-
-    # Color condicional en calificaciones
-    for i, cal in enumerate(calificaciones, 1):
-        nota = float(cal.nota)
-        color = s['OK'] if nota >= 7 else (s['WARN'] if nota >= 6 else s['DANGER'])
-        t.setStyle(TableStyle([('TEXTCOLOR', (1, i), (1, i), color)]))
-        t.setStyle(TableStyle([('FONTNAME',  (1, i), (1, i), 'Helvetica-Bold')]))
-        t.setStyle(TableStyle([('FONTSIZE',  (1, i), (1, i), 12)]))
-
-    elements.append(t)
-    elements.append(Spacer(1, 0.5*cm))
-
-    # Promedio general
-    if count > 0:
-        prom = promedio_total / count
-        color_prom = s['OK'] if prom >= 7 else (s['WARN'] if prom >= 6 else s['DANGER'])
-        prom_data = [['', 'PROMEDIO GENERAL', f'{prom:.2f}']]
-        pt = Table(prom_data, colWidths=col_widths)
-        pt.setStyle(TableStyle([
-            ('BACKGROUND',   (0,0), (-1,-1), s['AZUL']),
-            ('TEXTCOLOR',    (0,0), (-1,-1), colors.white),
-            ('FONTNAME',     (0,0), (-1,-1), 'Helvetica-Bold'),
-            ('FONTSIZE',     (0,0), (1,0),   9),
-            ('FONTSIZE',     (2,0), (2,0),   14),
-            ('TEXTCOLOR',    (2,0), (2,0),   color_prom),
-            ('ALIGN',        (0,0), (-1,-1), 'CENTER'),
-            ('TOPPADDING',   (0,0), (-1,-1), 10),
-            ('BOTTOMPADDING',(0,0), (-1,-1), 10),
-        ]))
-        elements.append(pt)
-
-    doc.build(elements, onFirstPage=header, onLaterPages=header)
-    return response
+# ── Reportes en segundo plano (docente/reportes.py) ───────────────────────────
 
+def _reporte_en_cola(request, tipo, parametros, nombre):
+    """
+    Si los datos no cambiaron desde la última vez, el PDF sale de la caché (o
+    304). Si no, encola el reporte (o reutiliza uno igual en curso) y lleva a
+    la página de espera.
+    """
+    from . import cache_reportes
+    from .reportes import encolar, ADJUNTOS
 
-# ── PDF 2: Reporte de asistencia del grupo ───────────────────────────────────
+    huella = cache_reportes.huella(tipo, parametros, request.user)
+    respuesta = cache_reportes.responder(request, tipo, huella, nombre, adjunto=tipo in ADJUNTOS)
+    if respuesta:
+        return respuesta
+    trabajo = encolar(request.user, tipo, parametros, nombre)
+    return redirect('docente_reporte', pk=trabajo.pk)
 
-@login_required
-def pdf_asistencia_grupo(request, grupo_pk):
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable
-    from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.lib.units import cm
-    from reportlab.lib import colors
-    from users.models import User
 
-    grupo = get_object_or_404(Grupo, pk=grupo_pk, plantel=request.user.plantel)
-    mes   = int(request.GET.get('mes', datetime.date.today().month))
-    anio  = int(request.GET.get('anio', datetime.date.today().year))
-
-    alumnos = User.objects.filter(
-        rol='ALUMNO', alumno_grupo=grupo
-    ).order_by('last_name', 'first_name')
-
-    # Obtener fechas únicas del mes con asistencia registrada
-    fechas = list(
-        Asistencia.objects.filter(
-            grupo=grupo, fecha__month=mes, fecha__year=anio
-        ).values_list('fecha', flat=True).distinct().order_by('fecha')
-    )
+def _estado_reporte(trabajo):
+    from django.urls import reverse
+    from .reportes import posicion_en_cola
 
-    s = _pdf_styles()
-    plantel = request.user.plantel
-    meses_nombres = ['', 'Enero','Febrero','Marzo','Abril','Mayo','Junio',
-                     'Julio','Agosto','Septiembre','Octubre','Noviembre','Diciembre']
+    return {
+        'id':       trabajo.pk,
+        'estado':   trabajo.estado,
+        'texto':    trabajo.get_estado_display(),
+        'nombre':   trabajo.nombre,
+        'posicion': posicion_en_cola(trabajo),
+        'error':    trabajo.error,
+        'url':      reverse('docente_reporte_descargar', args=[trabajo.pk]) if trabajo.estado == 'LISTO' else None,
+    }
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'inline; filename="asistencia_{grupo.nombre}_{meses_nombres[mes]}{anio}.pdf"'
-    )
 
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=landscape(letter),
-        topMargin=2*cm, bottomMargin=1.5*cm,
-        leftMargin=1.5*cm, rightMargin=1.5*cm,
-    )
+@login_required
+def reporte(request, pk):
+    from .models import TrabajoPDF
 
-    def header(c, d):
-        _pdf_header(c, d, plantel.nombre, 'Reporte de Asistencia')
-
-    elements = []
-    elements.append(Paragraph(f'Asistencia — {grupo}', s['titulo']))
-    elements.append(Paragraph(
-        f'{meses_nombres[mes]} {anio}  ·  {alumnos.count()} alumnos  ·  {len(fechas)} sesiones registradas',
-        s['sub']
-    ))
-    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
-    elements.append(Spacer(1, 0.3*cm))
-
-    if not fechas:
-        elements.append(Paragraph('No hay registros de asistencia para este mes.', s['body']))
-        doc.build(elements, onFirstPage=header, onLaterPages=header)
-        return response
-
-    # Construir mapa de asistencia {alumno_id: {fecha: estado}}
-    registros = Asistencia.objects.filter(
-        grupo=grupo, fecha__month=mes, fecha__year=anio
-    ).values('alumno_id', 'fecha', 'estado')
-
-    mapa = {}
-    for r in registros:
-        mapa.setdefault(r['alumno_id'], {})[r['fecha']] = r['estado']
-
-    # Cabecera: Nombre + fechas + totales
-    header_row = ['#', 'Alumno'] + [f.strftime('%d') for f in fechas] + ['P', 'R', 'F', '%']
-    data = [header_row]
-
-    for i, alumno in enumerate(alumnos, 1):
-        fila = [str(i), alumno.get_full_name()]
-        p = r_cnt = f_cnt = 0
-        for fecha in fechas:
-            estado = mapa.get(alumno.pk, {}).get(fecha, '—')
-            fila.append(estado)
-            if estado == 'P': p += 1
-            elif estado == 'R': r_cnt += 1
-            elif estado == 'A': f_cnt += 1
-        total = p + r_cnt + f_cnt
-        pct = f'{int(p/total*100)}%' if total > 0 else '—'
-        fila += [str(p), str(r_cnt), str(f_cnt), pct]
-        data.append(fila)
-
-    # Anchos de columna adaptativos
-    n_fechas = len(fechas)
-    w_nombre = 5*cm
-    w_num    = 0.5*cm
-    w_fecha  = max(0.55*cm, min(0.8*cm, 14*cm / max(n_fechas, 1)))
-    w_tot    = 0.7*cm
-    col_widths = [w_num, w_nombre] + [w_fecha]*n_fechas + [w_tot, w_tot, w_tot, w_tot]
-
-    t = Table(data, colWidths=col_widths, repeatRows=1)
-    style = [
-        ('BACKGROUND',    (0,0), (-1,0), s['AZUL']),
-        ('TEXTCOLOR',     (0,0), (-1,0), colors.white),
-        ('FONTNAME',      (0,0), (-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE',      (0,0), (-1,0), 7),
-        ('ALIGN',         (0,0), (-1,-1), 'CENTER'),
-        ('ALIGN',         (1,0), (1,-1), 'LEFT'),
-        ('FONTNAME',      (0,1), (-1,-1), 'Helvetica'),
-        ('FONTSIZE',      (0,1), (-1,-1), 7),
-        ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
-        ('GRID',          (0,0), (-1,-1), 0.3, s['BORDE']),
-        ('TOPPADDING',    (0,0), (-1,-1), 4),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]
-
-    # Colorear celdas P/R/A
-    for row_i, alumno in enumerate(alumnos, 1):
-        for col_j, fecha in enumerate(fechas, 2):
-            estado = mapa.get(alumno.pk, {}).get(fecha, '—')
-            if estado == 'P':
-                style.append(('TEXTCOLOR', (col_j, row_i), (col_j, row_i), s['OK']))
-            elif estado == 'R':
-                style.append(('TEXTCOLOR', (col_j, row_i), (col_j, row_i), s['WARN']))
-            elif estado == 'A':
-                style.append(('TEXTCOLOR', (col_j, row_i), (col_j, row_i), s['DANGER']))
-
-    t.setStyle(TableStyle(style))
-    elements.append(t)
-    doc.build(elements, onFirstPage=header, onLaterPages=header)
-    return response
+    trabajo = get_object_or_404(TrabajoPDF, pk=pk, solicitante=request.user)
+    return render(request, 'docente/reporte.html', {'trabajo': trabajo, 'estado': _estado_reporte(trabajo)})
 
 
-# ── PDF 3: Cronograma / Temario del docente ───────────────────────────────────
+@login_required
+def reporte_estado(request, pk):
+    from .models import TrabajoPDF
 
-@docente_required
-def pdf_cronograma(request, plan_pk):
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable, KeepTogether
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.units import cm
-    from reportlab.lib import colors
+    trabajo = get_object_or_404(TrabajoPDF, pk=pk, solicitante=request.user)
+    return JsonResponse(_estado_reporte(trabajo))
 
-    plan  = get_object_or_404(PlanClase, pk=plan_pk, docente=request.user)
-    temas = plan.temas.all()
 
-    s = _pdf_styles()
-    plantel = request.user.plantel
+@login_required
+def reporte_descargar(request, pk):
+    from django.http import Http404
+    from .models import TrabajoPDF
+    from . import cache_reportes
+    from .reportes import ADJUNTOS
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'inline; filename="cronograma_{plan.pk}.pdf"'
-    )
+    trabajo = get_object_or_404(TrabajoPDF, pk=pk, solicitante=request.user, estado='LISTO')
+    try:
+        return cache_reportes.servir(request, trabajo.archivo, trabajo.nombre, adjunto=trabajo.tipo in ADJUNTOS)
+    except FileNotFoundError:
+        raise Http404('El reporte ya no está disponible.')
+
+
+@login_required
+def reporte_cache(request):
+    """Tamaño de la caché de reportes y aciertos/fallos por tipo, para monitoreo."""
+    from . import cache_reportes
+
+    if request.user.rol != 'ADMIN' and not request.user.is_staff:
+        return JsonResponse({'error': 'No autorizado'}, status=403)
+    return JsonResponse(cache_reportes.estadisticas())
 
-    doc = SimpleDocTemplate(
-        response,
-        pagesize=letter,
-        topMargin=2*cm, bottomMargin=1.5*cm,
-        leftMargin=1.5*cm, rightMargin=1.5*cm,
-    )
 
-    def header(c, d):
-        _pdf_header(c, d, plantel.nombre, 'Cronograma / Temario')
-
-    elements = []
-
-    # Encabezado del plan
-    elements.append(Paragraph(plan.titulo, s['titulo']))
-    elements.append(Paragraph(
-        f'{plan.asignatura}  ·  {plan.grupo}  ·  '
-        f'{plan.fecha_inicio.strftime("%d/%m/%Y")} – {plan.fecha_fin.strftime("%d/%m/%Y")}  ·  '
-        f'Progreso: {plan.progreso}%',
-        s['sub']
-    ))
-    elements.append(HRFlowable(width='100%', thickness=1, color=s['BORDE']))
-    elements.append(Spacer(1, 0.3*cm))
-
-    # Objetivo general
-    if plan.objetivo_general:
-        elements.append(Paragraph('OBJETIVO GENERAL', s['label']))
-        elements.append(Paragraph(plan.objetivo_general, s['body']))
-        elements.append(Spacer(1, 0.25*cm))
-
-    # Competencias
-    if plan.competencias:
-        elements.append(Paragraph('COMPETENCIAS A DESARROLLAR', s['label']))
-        elements.append(Paragraph(plan.competencias, s['body']))
-        elements.append(Spacer(1, 0.4*cm))
-
-    # Tabla de temas
-    if temas.exists():
-        elements.append(Paragraph('PLAN DE SESIONES', s['label']))
-        elements.append(Spacer(1, 0.2*cm))
-
-        data = [['#', 'TEMA / SESIÓN', 'FECHA', 'DURACIÓN', 'RECURSOS / EVALUACIÓN', 'EST.']]
-
-        for tema in temas:
-            fecha_str = tema.fecha.strftime('%d/%m/%Y') if tema.fecha else '—'
-            recursos  = (tema.recursos or '') + ('\n' + tema.evaluacion if tema.evaluacion else '')
-            estado    = '✓' if tema.completado else '○'
-            desc      = tema.titulo
-            if tema.descripcion:
-                desc += f'\n{tema.descripcion}'
-            data.append([
-                str(tema.numero),
-                Paragraph(desc, s['body']),
-                fecha_str,
-                f'{tema.duracion_min} min',
-                Paragraph(recursos or '—', s['body']),
-                estado,
-            ])
-
-        col_widths = [0.7*cm, 6*cm, 2*cm, 1.8*cm, 5*cm, 0.8*cm]
-        t = Table(data, colWidths=col_widths, repeatRows=1)
-        t.setStyle(TableStyle([
-            ('BACKGROUND',    (0,0), (-1,0), s['AZUL']),
-            ('TEXTCOLOR',     (0,0), (-1,0), colors.white),
-            ('FONTNAME',      (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE',      (0,0), (-1,0), 7),
-            ('ALIGN',         (0,0), (-1,-1), 'CENTER'),
-            ('ALIGN',         (1,0), (1,-1), 'LEFT'),
-            ('ALIGN',         (4,0), (4,-1), 'LEFT'),
-            ('FONTNAME',      (0,1), (-1,-1), 'Helvetica'),
-            ('FONTSIZE',      (0,1), (-1,-1), 8),
-            ('ROWBACKGROUNDS',(0,1), (-1,-1), [colors.white, s['GRIS']]),
-            ('GRID',          (0,0), (-1,-1), 0.3, s['BORDE']),
-            ('TOPPADDING',    (0,0), (-1,-1), 6),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 6),
-            ('VALIGN',        (0,0), (-1,-1), 'TOP'),
-        ]))
-
-        # Colorear estado completado
-        for i, tema in enumerate(temas, 1):
-            color = s['OK'] if tema.completado else s['INK2']
-            t.setStyle(TableStyle([
-                ('TEXTCOLOR', (5, i), (5, i), color),
-                ('FONTNAME',  (5, i), (5, i), 'Helvetica-Bold'),
-                ('FONTSIZE',  (5, i), (5, i), 11),
-            ]))
-
-        elements.append(t)
-    else:
-        elements.append(Paragraph('Este plan no tiene sesiones registradas aún.', s['body']))
-
-    # Firma
-    elements.append(Spacer(1, 1.5*cm))
-    firma_data = [
-        ['Docente:', plan.docente.get_full_name(), 'Firma:', '___________________________'],
-    ]
-    ft = Table(firma_data, colWidths=[2*cm, 6*cm, 2*cm, 6*cm])
-    ft.setStyle(TableStyle([
-        ('FONTNAME',  (0,0), (-1,-1), 'Helvetica'),
-        ('FONTSIZE',  (0,0), (-1,-1), 8),
-        ('TEXTCOLOR', (0,0), (0,-1), s['INK2']),
-        ('TEXTCOLOR', (2,0), (2,-1), s['INK2']),
-        ('FONTNAME',  (0,0), (0,-1), 'Helvetica-Bold'),
-        ('FONTNAME',  (2,0), (2,-1), 'Helvetica-Bold'),
-    ]))
-    elements.append(ft)
-
-    doc.build(elements, onFirstPage=header, onLaterPages=header)
-    return response
 # ─────────────────────────────────────────────────────────────────────────────
 # EXPORTACIÓN PDF
 # Agregar al final de docente/views.py
@@ -1885,126 +1677,37 @@ def pdf_cronograma(request, plan_pk):
 
 @docente_required
 def pdf_boleta_grupo(request, grupo_id):
-    from academic.models import Grupo, Calificacion, EntregaTarea, EntregaActividad
-    from django.http import HttpResponse
-    from .pdf_utils import generar_pdf_boleta
+    from academic.models import Grupo
 
     grupo = get_object_or_404(Grupo, pk=grupo_id, plantel=request.user.plantel)
 
-    asignaciones = (
-        DocenteGrupo.objects
-        .filter(docente=request.user, activo=True, grupo=grupo)
-        .select_related('asignatura')
-    )
-    if not asignaciones.exists():
+    if not DocenteGrupo.objects.filter(docente=request.user, activo=True, grupo=grupo).exists():
         messages.error(request, 'No tienes acceso a este grupo.')
         return redirect('docente_boleta')
 
-    asignaturas = [a.asignatura for a in asignaciones]
-    alumnos     = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
-
-    filas = []
-    for alumno in alumnos:
-        cols = []
-        for asig in asignaturas:
-            prom_tareas = EntregaTarea.objects.filter(
-                alumno=alumno, tarea__asignatura=asig,
-                tarea__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            prom_actividades = EntregaActividad.objects.filter(
-                alumno=alumno, actividad__asignatura=asig,
-                actividad__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            cal_manual = Calificacion.objects.filter(
-                alumno=alumno, asignatura=asig, grupo=grupo, tipo='MANUAL',
-            ).first()
-
-            valores = [v for v in [
-                prom_tareas, prom_actividades,
-                cal_manual.nota if cal_manual else None,
-            ] if v is not None]
-            promedio_final = round(sum(valores) / len(valores), 2) if valores else None
-
-            cols.append({
-                'asignatura':  asig,
-                'prom_tareas': round(float(prom_tareas), 2) if prom_tareas else None,
-                'prom_activ':  round(float(prom_actividades), 2) if prom_actividades else None,
-                'manual':      float(cal_manual.nota) if cal_manual else None,
-                'final':       promedio_final,
-            })
-        filas.append({'alumno': alumno, 'cols': cols})
-
-    buffer = generar_pdf_boleta(grupo, asignaturas, filas, request.user)
-
     nombre_archivo = f"boleta_{grupo.nombre.replace(' ', '_')}.pdf"
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
-    return response
+    return _reporte_en_cola(request, 'BOLETA_GRUPO', {'grupo_id': grupo.pk}, nombre_archivo)
 
 
 @docente_required
 def pdf_concentrado(request, grupo_id):
-    from academic.models import Grupo, Calificacion, EntregaTarea, EntregaActividad
-    from django.http import HttpResponse
-    from .pdf_utils import generar_pdf_concentrado
+    from academic.models import Grupo
 
     grupo = get_object_or_404(Grupo, pk=grupo_id, plantel=request.user.plantel)
 
-    asignaciones = (
-        DocenteGrupo.objects
-        .filter(docente=request.user, activo=True, grupo=grupo)
-        .select_related('asignatura')
-    )
-    if not asignaciones.exists():
+    if not DocenteGrupo.objects.filter(docente=request.user, activo=True, grupo=grupo).exists():
         messages.error(request, 'No tienes acceso a este grupo.')
         return redirect('docente_concentrado')
 
-    asignaturas = [a.asignatura for a in asignaciones]
-    alumnos     = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
-
-    filas = []
-    for alumno in alumnos:
-        cols = []
-        for asig in asignaturas:
-            prom_tareas = EntregaTarea.objects.filter(
-                alumno=alumno, tarea__asignatura=asig,
-                tarea__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            prom_activ = EntregaActividad.objects.filter(
-                alumno=alumno, actividad__asignatura=asig,
-                actividad__grupo=grupo, calificacion__isnull=False,
-            ).aggregate(p=Avg('calificacion'))['p']
-
-            cal_manual = Calificacion.objects.filter(
-                alumno=alumno, asignatura=asig, grupo=grupo, tipo='MANUAL',
-            ).first()
-
-            valores = [v for v in [
-                prom_tareas, prom_activ,
-                cal_manual.nota if cal_manual else None,
-            ] if v is not None]
-            cols.append(round(sum(valores) / len(valores), 2) if valores else None)
-
-        valores_fila     = [c for c in cols if c is not None]
-        promedio_general = round(sum(valores_fila) / len(valores_fila), 2) if valores_fila else None
-        filas.append({'alumno': alumno, 'cols': cols, 'promedio_general': promedio_general})
-
-    buffer = generar_pdf_concentrado(grupo, asignaturas, filas, request.user)
-
     nombre_archivo = f"concentrado_{grupo.nombre.replace(' ', '_')}.pdf"
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
-    return response
+    return _reporte_en_cola(request, 'CONCENTRADO', {'grupo_id': grupo.pk}, nombre_archivo)
 
 
 @docente_required
 def pdf_asistencia(request, grupo_id, asignatura_id):
-    from academic.models import Grupo, Asignatura, Asistencia
-    from django.http import HttpResponse
+    from academic.models import Grupo, Asignatura, AsistenciaMensual
     from .pdf_utils import generar_pdf_asistencia
+    from . import cache_reportes
     from datetime import date
 
     grupo      = get_object_or_404(Grupo, pk=grupo_id, plantel=request.user.plantel)
@@ -2027,18 +1730,21 @@ def pdf_asistencia(request, grupo_id, asignatura_id):
     except (ValueError, TypeError):
         fecha = date.today()
 
+    nombre_archivo = f"asistencia_{grupo.nombre.replace(' ','_')}_{fecha.strftime('%Y-%m')}.pdf"
+    parametros = {'grupo_id': grupo.pk, 'asignatura_id': asignatura.pk, 'anio': fecha.year, 'mes': fecha.month}
+    huella = cache_reportes.huella('ASISTENCIA', parametros, request.user)
+    respuesta = cache_reportes.responder(request, 'ASISTENCIA', huella, nombre_archivo, adjunto=True)
+    if respuesta:
+        return respuesta
+
     alumnos = grupo.alumnos.filter(estatus='ACTIVO', rol='ALUMNO').order_by('last_name', 'first_name')
 
-    from django.db.models import Count, Q
-    resumen_qs = Asistencia.objects.filter(
-        grupo=grupo, asignatura=asignatura,
-        fecha__month=fecha.month, fecha__year=fecha.year,
-    ).values('alumno_id').annotate(
-        presentes=Count('id', filter=Q(estado='P')),
-        ausentes =Count('id', filter=Q(estado='A')),
-        retardos =Count('id', filter=Q(estado='R')),
-    )
-    resumen = {r['alumno_id']: r for r in resumen_qs}
+    resumen = {
+        r['alumno_id']: r
+        for r in AsistenciaMensual.objects.filter(
+            grupo=grupo, asignatura=asignatura, anio=fecha.year, mes=fecha.month,
+        ).values('alumno_id', 'presentes', 'ausentes', 'retardos')
+    }
 
     filas = []
     for alumno in alumnos:
@@ -2051,8 +1757,5 @@ def pdf_asistencia(request, grupo_id, asignatura_id):
         })
 
     buffer = generar_pdf_asistencia(grupo, asignatura, filas, fecha, request.user)
-
-    nombre_archivo = f"asistencia_{grupo.nombre.replace(' ','_')}_{fecha.strftime('%Y-%m')}.pdf"
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
-    return response
\ No newline at end of file
+    relativa = cache_reportes.guardar('ASISTENCIA', huella, buffer.getbuffer())
+    return cache_reportes.servir(request, relativa, nombre_archivo, adjunto=True)
\ No newline at end of file
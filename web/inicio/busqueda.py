@@ -0,0 +1,248 @@
+# inicio/busqueda.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Búsqueda global
+#
+# Alumnos, docentes, grupos, asignaturas, tareas y materiales se copian a
+# EntradaBusqueda con el texto normalizado (minúsculas, sin acentos), así
+# "Garcia" encuentra a "García". Las señales de inicio/signals.py mantienen
+# la tabla al día y la migración 0001 monta el índice según la base:
+#   · SQLite:     tabla FTS5 inicio_busqueda_fts sincronizada por triggers
+#   · PostgreSQL: GIN sobre to_tsvector('simple', texto) y GIN de trigramas
+# Cada búsqueda es una consulta al índice ordenada por relevancia (bm25 /
+# ts_rank + word_similarity) más un in_bulk de las filas encontradas.
+# ─────────────────────────────────────────────────────────────────────────────
+import re
+import unicodedata
+
+from django.apps import apps as apps_global
+from django.db import connection, transaction
+from django.urls import reverse
+
+LIMITE_SUGERENCIAS = 8
+MAX_TERMINOS = 6
+
+# Tipos que ve cada rol (tareas y materiales, además, solo los de su docente)
+TIPOS_POR_ROL = {
+    'DOCENTE': ('ALUMNO', 'DOCENTE', 'GRUPO', 'ASIGNATURA', 'TAREA', 'MATERIAL'),
+}
+TIPOS_POR_DEFECTO = ('ALUMNO', 'DOCENTE', 'GRUPO', 'ASIGNATURA')
+
+
+def normalizar(*partes):
+    """Une las partes en minúsculas y sin acentos ('José García' → 'jose garcia')."""
+    texto = ' '.join(str(p) for p in partes if p)
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def terminos(consulta):
+    return re.findall(r'\w+', normalizar(consulta))[:MAX_TERMINOS]
+
+
+# ── Fuentes: objeto → filas de EntradaBusqueda ───────────────────────────────
+# Trabajan con .values() para poder usarse con los modelos históricos de la
+# migración que llena el índice.
+
+def _nombre(first_name, last_name, username):
+    return f'{first_name} {last_name}'.strip() or username
+
+
+def _usuarios(apps, filtro):
+    User = apps.get_model('users', 'User')
+    for u in (
+        User.objects.filter(rol__in=('ALUMNO', 'DOCENTE'), **filtro)
+        .values('pk', 'rol', 'plantel_id', 'first_name', 'last_name', 'username', 'email',
+                'alumno_grupo__nombre')
+    ):
+        nombre = _nombre(u['first_name'], u['last_name'], u['username'])
+        yield {
+            'tipo': u['rol'], 'objeto_id': u['pk'], 'plantel_id': u['plantel_id'],
+            'titulo': nombre[:200],
+            'detalle': (u['alumno_grupo__nombre'] or u['email'] or u['username'])[:200],
+            'texto': normalizar(nombre, u['username'], u['email']),
+        }
+
+
+def _grupos(apps, filtro):
+    Grupo = apps.get_model('academic', 'Grupo')
+    for g in Grupo.objects.filter(**filtro).values('pk', 'plantel_id', 'nombre', 'carrera__nombre'):
+        yield {
+            'tipo': 'GRUPO', 'objeto_id': g['pk'], 'plantel_id': g['plantel_id'],
+            'titulo': g['nombre'][:200], 'detalle': (g['carrera__nombre'] or '')[:200],
+            'texto': normalizar(g['nombre'], g['carrera__nombre']),
+        }
+
+
+def _asignaturas(apps, filtro):
+    Asignatura = apps.get_model('academic', 'Asignatura')
+    for a in Asignatura.objects.filter(**filtro).values(
+        'pk', 'carrera__plantel_id', 'nombre', 'clave', 'carrera__nombre',
+    ):
+        yield {
+            'tipo': 'ASIGNATURA', 'objeto_id': a['pk'], 'plantel_id': a['carrera__plantel_id'],
+            'titulo': a['nombre'][:200], 'detalle': (a['carrera__nombre'] or '')[:200],
+            'texto': normalizar(a['nombre'], a['clave'], a['carrera__nombre']),
+        }
+
+
+def _tareas(apps, filtro):
+    Tarea = apps.get_model('academic', 'Tarea')
+    for t in Tarea.objects.filter(activa=True, **filtro).values(
+        'pk', 'grupo__plantel_id', 'docente_id', 'titulo', 'asignatura__nombre', 'grupo__nombre',
+    ):
+        yield {
+            'tipo': 'TAREA', 'objeto_id': t['pk'], 'plantel_id': t['grupo__plantel_id'],
+            'propietario_id': t['docente_id'], 'titulo': t['titulo'][:200],
+            'detalle': f"{t['asignatura__nombre']} · {t['grupo__nombre']}"[:200],
+            'texto': normalizar(t['titulo'], t['asignatura__nombre']),
+        }
+
+
+def _materiales(apps, filtro):
+    Material = apps.get_model('academic', 'MaterialApoyo')
+    for m in Material.objects.filter(activo=True, **filtro).values(
+        'pk', 'grupo__plantel_id', 'docente_id', 'titulo', 'asignatura__nombre', 'grupo__nombre',
+    ):
+        yield {
+            'tipo': 'MATERIAL', 'objeto_id': m['pk'], 'plantel_id': m['grupo__plantel_id'],
+            'propietario_id': m['docente_id'], 'titulo': m['titulo'][:200],
+            'detalle': f"{m['asignatura__nombre']} · {m['grupo__nombre']}"[:200],
+            'texto': normalizar(m['titulo'], m['asignatura__nombre']),
+        }
+
+
+# fuente → (tipos que produce, función)
+FUENTES = {
+    'usuario':    (('ALUMNO', 'DOCENTE'), _usuarios),
+    'grupo':      (('GRUPO',),            _grupos),
+    'asignatura': (('ASIGNATURA',),       _asignaturas),
+    'tarea':      (('TAREA',),            _tareas),
+    'material':   (('MATERIAL',),         _materiales),
+}
+
+
+def indexar(fuente, ids=None, apps=apps_global):
+    """
+    Reescribe las entradas de `fuente` para los objetos `ids` (todos si es
+    None). Los objetos que ya no aplican (borrados, inactivos, cambio de rol)
+    se quedan fuera.
+    """
+    tipos, construir = FUENTES[fuente]
+    Entrada = apps.get_model('inicio', 'EntradaBusqueda')
+    filtro = {} if ids is None else {'pk__in': list(ids)}
+    filas = [Entrada(**datos) for datos in construir(apps, filtro)]
+    with transaction.atomic():
+        viejas = Entrada.objects.filter(tipo__in=tipos)
+        if ids is not None:
+            viejas = viejas.filter(objeto_id__in=filtro['pk__in'])
+        viejas.delete()
+        Entrada.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def desindexar(fuente, ids):
+    tipos, _ = FUENTES[fuente]
+    apps_global.get_model('inicio', 'EntradaBusqueda').objects.filter(
+        tipo__in=tipos, objeto_id__in=list(ids),
+    ).delete()
+
+
+def reindexar(apps=apps_global):
+    """Reconstruye todo el índice. Devuelve {fuente: filas}."""
+    return {fuente: indexar(fuente, apps=apps) for fuente in FUENTES}
+
+
+# ── Consulta ─────────────────────────────────────────────────────────────────
+
+def _buscar_sqlite(cursor, plantel_id, terms, tipos, usuario_id, limite):
+    cursor.execute(
+        f"""
+        SELECT e.id FROM inicio_busqueda_fts
+        JOIN inicio_entradabusqueda e ON e.id = inicio_busqueda_fts.rowid
+        WHERE inicio_busqueda_fts MATCH %s
+          AND e.plantel_id = %s
+          AND e.tipo IN ({', '.join(['%s'] * len(tipos))})
+          AND (e.propietario_id IS NULL OR e.propietario_id = %s)
+        ORDER BY bm25(inicio_busqueda_fts)
+        LIMIT %s
+        """,
+        [' '.join(f'"{t}"*' for t in terms), plantel_id, *tipos, usuario_id, limite],
+    )
+
+
+def _buscar_postgres(cursor, plantel_id, terms, tipos, usuario_id, limite):
+    tsquery = ' & '.join(f'{t}:*' for t in terms)
+    frase = ' '.join(terms)
+    cursor.execute(
+        """
+        SELECT id FROM inicio_entradabusqueda
+        WHERE plantel_id = %s
+          AND tipo = ANY(%s)
+          AND (propietario_id IS NULL OR propietario_id = %s)
+          AND (to_tsvector('simple', texto) @@ to_tsquery('simple', %s) OR %s <%% texto)
+        ORDER BY ts_rank(to_tsvector('simple', texto), to_tsquery('simple', %s))
+                 + word_similarity(%s, texto) DESC
+        LIMIT %s
+        """,
+        [plantel_id, list(tipos), usuario_id, tsquery, frase, tsquery, frase, limite],
+    )
+
+
+def _buscar_generico(plantel_id, terms, tipos, usuario_id, limite):
+    from django.db.models import Q
+    from .models import EntradaBusqueda
+
+    qs = EntradaBusqueda.objects.filter(
+        Q(propietario_id__isnull=True) | Q(propietario_id=usuario_id),
+        plantel_id=plantel_id, tipo__in=tipos,
+    )
+    for t in terms:
+        qs = qs.filter(texto__contains=t)
+    return list(qs.order_by('titulo').values_list('pk', flat=True)[:limite])
+
+
+def buscar(usuario, consulta, limite=20, tipos=None):
+    """
+    Entradas del plantel de `usuario` que contienen todas las palabras de
+    `consulta` (como prefijos), de la más a la menos relevante.
+    """
+    from .models import EntradaBusqueda
+
+    terms = terminos(consulta)
+    if not terms or not usuario.plantel_id:
+        return []
+    permitidos = TIPOS_POR_ROL.get(usuario.rol, TIPOS_POR_DEFECTO)
+    tipos = [t for t in (tipos or permitidos) if t in permitidos]
+    if not tipos:
+        return []
+
+    consulta_bd = {'sqlite': _buscar_sqlite, 'postgresql': _buscar_postgres}.get(connection.vendor)
+    if consulta_bd:
+        with connection.cursor() as cursor:
+            consulta_bd(cursor, usuario.plantel_id, terms, tipos, usuario.pk, limite)
+            ids = [fila[0] for fila in cursor.fetchall()]
+    else:
+        ids = _buscar_generico(usuario.plantel_id, terms, tipos, usuario.pk, limite)
+
+    entradas = EntradaBusqueda.objects.in_bulk(ids)
+    return [resultado(entradas[pk]) for pk in ids if pk in entradas]
+
+
+URLS = {
+    'ALUMNO':   'detalle_alumno',
+    'DOCENTE':  'detalle_docente',
+    'GRUPO':    'detalle_grupo',
+    'TAREA':    'detalle_tarea',
+    'MATERIAL': 'detalle_material',
+}
+
+
+def resultado(entrada):
+    if entrada.tipo in URLS:
+        url = reverse(URLS[entrada.tipo], args=[entrada.objeto_id])
+    else:
+        url = reverse('lista_asignaturas')
+    return {
+        'tipo': entrada.tipo, 'etiqueta': entrada.get_tipo_display(),
+        'titulo': entrada.titulo, 'detalle': entrada.detalle, 'url': url,
+    }
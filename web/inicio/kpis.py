@@ -0,0 +1,131 @@
+# inicio/kpis.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Foto de KPIs del dashboard de dirección, por plantel
+#
+# Cada sección (usuarios, asistencia, calificaciones, actividad) se calcula
+# con una o dos consultas agrupadas y se guarda en la caché con un TTL corto.
+# Las señales de inicio/signals.py (y los guardados en bloque de academic)
+# borran solo las secciones afectadas. Con una caché por proceso (LocMem) el
+# borrado solo alcanza al proceso que hizo el cambio: en los demás el TTL
+# acota cuánto puede tardar en verse.
+# ─────────────────────────────────────────────────────────────────────────────
+import time
+
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from users.models import User
+from academic.models import Grupo, Asistencia, Asignatura
+
+KPIS_TTL = 60
+SECCIONES = ('usuarios', 'asistencia', 'calificaciones', 'actividad')
+
+
+def _clave(plantel_id, seccion, fecha=None):
+    if seccion == 'asistencia':
+        return f'kpis:{plantel_id}:asistencia:{(fecha or timezone.localdate()).isoformat()}'
+    return f'kpis:{plantel_id}:{seccion}'
+
+
+# ── Secciones ────────────────────────────────────────────────────────────────
+
+def _usuarios(plantel):
+    datos = User.objects.filter(plantel=plantel).aggregate(
+        total_docentes=Count('pk', filter=Q(rol='DOCENTE')),
+        total_coordinadores=Count('pk', filter=Q(rol='COORD')),
+        total_alumnos=Count('pk', filter=Q(rol='ALUMNO')),
+    )
+    datos['aulas_reales'] = {
+        'ocupadas': Grupo.objects.filter(plantel=plantel).count(),
+        'total':    plantel.total_aulas,
+    }
+    return datos
+
+
+def _asistencia(plantel):
+    hoy = Asistencia.objects.filter(grupo__plantel=plantel, fecha=timezone.localdate()).aggregate(
+        registros=Count('pk'), presentes=Count('pk', filter=Q(estado='P')),
+    )
+    if not hoy['registros']:
+        return {'asistencia_global': 'Sin registros'}
+    return {'asistencia_global': f"{int((hoy['presentes'] / hoy['registros']) * 100)}%"}
+
+
+def _calificaciones(plantel):
+    riesgo = (
+        User.objects
+        .filter(plantel=plantel, rol='ALUMNO', resumenes_calificacion__promedio_final__lt=6.0)
+        .distinct()
+        .only('pk', 'username', 'first_name', 'last_name')
+    )
+    sin_notas = Asignatura.objects.filter(calificaciones__isnull=True, carrera__plantel=plantel)
+    return {
+        'alumnos_riesgo':      list(riesgo[:5]),
+        'num_riesgo_total':    riesgo.count(),
+        'docentes_pendientes': (
+            User.objects.filter(materias_impartidas__in=sin_notas).distinct().count()
+        ),
+    }
+
+
+def _actividad(plantel):
+    return {
+        'actividad_reciente': list(
+            LogEntry.objects.filter(user__plantel=plantel)
+            .select_related('content_type', 'user')
+            .order_by('-action_time')[:5]
+        ),
+    }
+
+
+CALCULOS = {
+    'usuarios':       _usuarios,
+    'asistencia':     _asistencia,
+    'calificaciones': _calificaciones,
+    'actividad':      _actividad,
+}
+
+
+# ── API ──────────────────────────────────────────────────────────────────────
+
+def kpis_plantel(plantel):
+    """
+    KPIs del dashboard del plantel. Además de los valores incluye
+    'kpis_ms' (tiempo total de cálculo, 0 si todo vino de la caché) y
+    'kpis_metricas' ({sección: ms} de las secciones recalculadas).
+    """
+    claves = {seccion: _clave(plantel.pk, seccion) for seccion in SECCIONES}
+    en_cache = cache.get_many(claves.values())
+
+    datos, metricas, nuevas = {}, {}, {}
+    for seccion, clave in claves.items():
+        if clave in en_cache:
+            datos.update(en_cache[clave])
+            continue
+        inicio = time.perf_counter()
+        valor = CALCULOS[seccion](plantel)
+        metricas[seccion] = round((time.perf_counter() - inicio) * 1000, 1)
+        datos.update(valor)
+        nuevas[clave] = valor
+    if nuevas:
+        cache.set_many(nuevas, KPIS_TTL)
+
+    datos['kpis_metricas'] = metricas
+    datos['kpis_ms'] = round(sum(metricas.values()), 1)
+    return datos
+
+
+def invalidar_kpis(secciones, plantel_ids=(), grupo_ids=(), fecha=None):
+    """
+    Borra de la caché las `secciones` de los planteles indicados (o de los
+    planteles de `grupo_ids`). `fecha` elige el día de la sección asistencia.
+    """
+    plantel_ids = {p for p in plantel_ids if p}
+    grupo_ids = [g for g in grupo_ids if g]
+    if grupo_ids:
+        plantel_ids.update(Grupo.objects.filter(pk__in=grupo_ids).values_list('plantel_id', flat=True))
+    cache.delete_many([
+        _clave(plantel_id, seccion, fecha) for plantel_id in plantel_ids for seccion in secciones
+    ])
@@ -0,0 +1,36 @@
+# inicio/management/commands/reindexar_busqueda.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from inicio.busqueda import FUENTES, indexar
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de la búsqueda global (EntradaBusqueda) desde '
+        'usuarios, grupos, asignaturas, tareas y materiales.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fuente', action='append', dest='fuentes', choices=sorted(FUENTES),
+                            help='Limitar a una o varias fuentes (repetible).')
+
+    def handle(self, *args, fuentes=None, **options):
+        for fuente in fuentes or FUENTES:
+            filas = indexar(fuente)
+            self.stdout.write(f'  {fuente}: {filas} entradas')
+
+        if connection.vendor == 'sqlite':
+            # Sin los triggers (SQLite los pierde si una migración rehace la
+            # tabla) el índice FTS5 quedaría desfasado en cuanto haya cambios
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = 'inicio_busqueda_ai'")
+                if not cursor.fetchone()[0]:
+                    raise CommandError(
+                        'Faltan los triggers de inicio_busqueda_fts: vuelve a aplicar '
+                        'la migración inicio 0001 (migrate inicio zero && migrate inicio).'
+                    )
+                # Rehace la tabla FTS5 desde EntradaBusqueda y la compacta
+                cursor.execute("INSERT INTO inicio_busqueda_fts(inicio_busqueda_fts) VALUES ('rebuild')")
+                cursor.execute("INSERT INTO inicio_busqueda_fts(inicio_busqueda_fts) VALUES ('optimize')")
+        self.stdout.write(self.style.SUCCESS('Índice de búsqueda reconstruido.'))
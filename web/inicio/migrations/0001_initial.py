@@ -0,0 +1,86 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+# ── Índices de texto según la base (ver inicio/busqueda.py) ──────────────────
+SQLITE = [
+    """CREATE VIRTUAL TABLE inicio_busqueda_fts USING fts5(
+           texto, content='inicio_entradabusqueda', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER inicio_busqueda_ai AFTER INSERT ON inicio_entradabusqueda BEGIN
+           INSERT INTO inicio_busqueda_fts(rowid, texto) VALUES (new.id, new.texto);
+       END""",
+    """CREATE TRIGGER inicio_busqueda_ad AFTER DELETE ON inicio_entradabusqueda BEGIN
+           INSERT INTO inicio_busqueda_fts(inicio_busqueda_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+       END""",
+    """CREATE TRIGGER inicio_busqueda_au AFTER UPDATE ON inicio_entradabusqueda BEGIN
+           INSERT INTO inicio_busqueda_fts(inicio_busqueda_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+           INSERT INTO inicio_busqueda_fts(rowid, texto) VALUES (new.id, new.texto);
+       END""",
+]
+SQLITE_REVERSA = [
+    'DROP TRIGGER IF EXISTS inicio_busqueda_au',
+    'DROP TRIGGER IF EXISTS inicio_busqueda_ad',
+    'DROP TRIGGER IF EXISTS inicio_busqueda_ai',
+    'DROP TABLE IF EXISTS inicio_busqueda_fts',
+]
+POSTGRES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX inicio_busqueda_tsv ON inicio_entradabusqueda USING gin (to_tsvector('simple', texto))",
+    'CREATE INDEX inicio_busqueda_trgm ON inicio_entradabusqueda USING gin (texto gin_trgm_ops)',
+]
+POSTGRES_REVERSA = [
+    'DROP INDEX IF EXISTS inicio_busqueda_trgm',
+    'DROP INDEX IF EXISTS inicio_busqueda_tsv',
+]
+
+
+def _ejecutar(schema_editor, por_base):
+    for sql in por_base.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def crear_indices_texto(apps, schema_editor):
+    _ejecutar(schema_editor, {'sqlite': SQLITE, 'postgresql': POSTGRES})
+
+
+def borrar_indices_texto(apps, schema_editor):
+    _ejecutar(schema_editor, {'sqlite': SQLITE_REVERSA, 'postgresql': POSTGRES_REVERSA})
+
+
+def llenar_indice(apps, schema_editor):
+    from inicio.busqueda import reindexar
+    reindexar(apps)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('academic', '0033_eventoactividad'),
+        ('users', '0013_docenteplantel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntradaBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ALUMNO', 'Alumno'), ('DOCENTE', 'Docente'), ('GRUPO', 'Grupo'), ('ASIGNATURA', 'Asignatura'), ('TAREA', 'Tarea'), ('MATERIAL', 'Material')], max_length=12)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('plantel_id', models.PositiveIntegerField(db_index=True, null=True)),
+                ('propietario_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('titulo', models.CharField(max_length=200)),
+                ('detalle', models.CharField(blank=True, max_length=200)),
+                ('texto', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Entrada de búsqueda',
+                'verbose_name_plural': 'Entradas de búsqueda',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.RunPython(crear_indices_texto, borrar_indices_texto),
+        migrations.RunPython(llenar_indice, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,35 @@
 from django.db import models
 
-# Create your models here.
+
+class EntradaBusqueda(models.Model):
+    """
+    Una fila por objeto buscable (ver inicio/busqueda.py). `texto` va ya en
+    minúsculas y sin acentos; sobre él se montan el índice FTS5 (SQLite) o
+    los índices GIN de texto completo y trigramas (PostgreSQL), creados en
+    la migración. objeto_id y plantel_id son enteros simples: las señales
+    borran la fila junto con el objeto.
+    """
+    TIPOS = [
+        ('ALUMNO',     'Alumno'),
+        ('DOCENTE',    'Docente'),
+        ('GRUPO',      'Grupo'),
+        ('ASIGNATURA', 'Asignatura'),
+        ('TAREA',      'Tarea'),
+        ('MATERIAL',   'Material'),
+    ]
+    tipo           = models.CharField(max_length=12, choices=TIPOS)
+    objeto_id      = models.PositiveIntegerField()
+    plantel_id     = models.PositiveIntegerField(null=True, db_index=True)
+    # Docente dueño de tareas y materiales: solo él los ve en la búsqueda
+    propietario_id = models.PositiveIntegerField(null=True, blank=True)
+    titulo         = models.CharField(max_length=200)
+    detalle        = models.CharField(max_length=200, blank=True)
+    texto          = models.TextField()
+
+    class Meta:
+        verbose_name = "Entrada de búsqueda"
+        verbose_name_plural = "Entradas de búsqueda"
+        unique_together = [['tipo', 'objeto_id']]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} · {self.titulo}"
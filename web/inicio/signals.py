@@ -0,0 +1,125 @@
+# inicio/signals.py
+# Invalida las secciones de la foto de KPIs (inicio/kpis.py) que toca cada cambio
+# y mantiene al día el índice de búsqueda global (inicio/busqueda.py).
+from django.contrib.admin.models import LogEntry
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from campuses.models import Plantel
+from users.models import User
+from academic.models import (
+    Grupo, Asistencia, Asignatura, Calificacion, EntregaTarea, EntregaActividad,
+    Carrera, Tarea, MaterialApoyo,
+)
+from .kpis import invalidar_kpis
+from .busqueda import indexar, desindexar
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_cambiado(sender, instance, update_fields=None, **kwargs):
+    # El login solo toca last_login: no cambia ningún KPI
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_kpis(['usuarios', 'calificaciones'], plantel_ids=[instance.plantel_id])
+
+
+@receiver(post_save, sender=Plantel)
+def plantel_guardado(sender, instance, **kwargs):
+    invalidar_kpis(['usuarios'], plantel_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Grupo)
+@receiver(post_delete, sender=Grupo)
+def grupo_cambiado(sender, instance, **kwargs):
+    invalidar_kpis(['usuarios'], plantel_ids=[instance.plantel_id])
+
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_delete, sender=Asistencia)
+def asistencia_cambiada(sender, instance, **kwargs):
+    fecha = Asistencia._meta.get_field('fecha').to_python(instance.fecha)
+    invalidar_kpis(['asistencia'], grupo_ids=[instance.grupo_id], fecha=fecha)
+
+
+@receiver(post_save, sender=Calificacion)
+@receiver(post_delete, sender=Calificacion)
+def calificacion_cambiada(sender, instance, **kwargs):
+    invalidar_kpis(['calificaciones'], grupo_ids=[instance.grupo_id or instance.alumno.alumno_grupo_id])
+
+
+@receiver(post_save, sender=EntregaTarea)
+@receiver(post_delete, sender=EntregaTarea)
+@receiver(post_save, sender=EntregaActividad)
+@receiver(post_delete, sender=EntregaActividad)
+def entrega_cambiada(sender, instance, **kwargs):
+    padre = instance.tarea if isinstance(instance, EntregaTarea) else instance.actividad
+    invalidar_kpis(['calificaciones'], grupo_ids=[padre.grupo_id])
+
+
+@receiver(post_save, sender=Asignatura)
+@receiver(post_delete, sender=Asignatura)
+def asignatura_cambiada(sender, instance, **kwargs):
+    invalidar_kpis(['calificaciones'], plantel_ids=[instance.carrera.plantel_id])
+
+
+@receiver(post_save, sender=LogEntry)
+def bitacora_registrada(sender, instance, **kwargs):
+    invalidar_kpis(['actividad'], plantel_ids=[instance.user.plantel_id])
+
+
+# ── Índice de búsqueda ───────────────────────────────────────────────────────
+# Las tareas y materiales llevan en el texto el nombre de su grupo y asignatura,
+# y alumnos, grupos y asignaturas el de su grupo o carrera: al renombrar uno se
+# reindexan también los que lo muestran.
+
+@receiver(post_save, sender=User)
+def usuario_a_busqueda(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    indexar('usuario', [instance.pk])
+
+
+@receiver(post_save, sender=Grupo)
+def grupo_a_busqueda(sender, instance, **kwargs):
+    indexar('grupo', [instance.pk])
+    indexar('usuario', instance.alumnos.values_list('pk', flat=True))
+    indexar('tarea', instance.tareas.values_list('pk', flat=True))
+    indexar('material', instance.materiales.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Carrera)
+def carrera_a_busqueda(sender, instance, **kwargs):
+    indexar('grupo', instance.grupos.values_list('pk', flat=True))
+    indexar('asignatura', instance.asignaturas_de_carrera.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Asignatura)
+def asignatura_a_busqueda(sender, instance, **kwargs):
+    indexar('asignatura', [instance.pk])
+    indexar('tarea', instance.tareas.values_list('pk', flat=True))
+    indexar('material', instance.materiales.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Tarea)
+def tarea_a_busqueda(sender, instance, **kwargs):
+    indexar('tarea', [instance.pk])
+
+
+@receiver(post_save, sender=MaterialApoyo)
+def material_a_busqueda(sender, instance, **kwargs):
+    indexar('material', [instance.pk])
+
+
+FUENTE_POR_MODELO = {
+    User: 'usuario', Grupo: 'grupo', Asignatura: 'asignatura', Tarea: 'tarea', MaterialApoyo: 'material',
+}
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Grupo)
+@receiver(post_delete, sender=Asignatura)
+@receiver(post_delete, sender=Tarea)
+@receiver(post_delete, sender=MaterialApoyo)
+def objeto_fuera_de_busqueda(sender, instance, **kwargs):
+    desindexar(FUENTE_POR_MODELO[sender], [instance.pk])
@@ -7,5 +7,6 @@ urlpatterns = [
     path('login/',  views.login_view,        name='login'),
     path('logout/', views.logout_view,       name='logout'),
     path('buscar/', views.busqueda_global,   name='busqueda_global'),
+    path('buscar/sugerencias/', views.busqueda_sugerencias, name='busqueda_sugerencias'),
     # ← dashboard_docente se eliminó de aquí, vive en docente/urls.py
 ]
\ No newline at end of file
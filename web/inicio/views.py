@@ -1,10 +1,11 @@
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q, Avg
+from django.db.models import Count, Avg
 from django.utils import timezone
-from django.contrib.admin.models import LogEntry
 import datetime
 
 from .forms import LoginForm
@@ -12,6 +13,10 @@ from users.models import User
 from academic.models import Periodo, Grupo, Calificacion, Asistencia, Asignatura
 from academic.forms import AlumnoForm
 from users.views import get_campus_theme
+from .kpis import kpis_plantel
+from .busqueda import buscar, LIMITE_SUGERENCIAS
+
+LIMITE_PAGINA_BUSQUEDA = 50
 
 
 
@@ -97,39 +102,12 @@ def dashboard_view(request):
     # ── Grupos disponibles para el select del modal ───────────────────
     grupos_disponibles = Grupo.objects.filter(plantel=plantel).prefetch_related('alumnos').order_by('grado', 'nombre')
 
-    # ── Gestión de espacios (Aulas) ───────────────────────────────────
-    total_aulas   = getattr(plantel, 'total_aulas', 20)
-    aulas_ocupadas = Grupo.objects.filter(plantel=plantel).count()
-    aulas_reales  = {'ocupadas': aulas_ocupadas, 'total': total_aulas}
-
-    # ── KPIs ─────────────────────────────────────────────────────────
-    total_docentes      = User.objects.filter(plantel=plantel, rol='DOCENTE').count()
-    total_coordinadores = User.objects.filter(plantel=plantel, rol='COORD').count()
-    total_alumnos       = User.objects.filter(plantel=plantel, rol='ALUMNO').count()
-    
-
-    # ── Asistencia diaria ─────────────────────────────────────────────
-    registros_hoy    = Asistencia.objects.filter(grupo__plantel=plantel, fecha=hoy).count()
-    asistencia_global = "Sin registros"
-    if registros_hoy > 0:
-        presentes = Asistencia.objects.filter(grupo__plantel=plantel, fecha=hoy, estado='P').count()
-        asistencia_global = f"{int((presentes / registros_hoy) * 100)}%"
-
-    # ── Radar de riesgo ───────────────────────────────────────────────
-    riesgo_qs      = User.objects.filter(plantel=plantel, rol='ALUMNO', notas__nota__lt=6.0).distinct()
-    alumnos_riesgo = riesgo_qs[:5]
-    num_riesgo_total = riesgo_qs.count()
-
-    # ── Docentes pendientes ───────────────────────────────────────────
-    asignaturas_sin_notas = Asignatura.objects.filter(
-        calificaciones__isnull=True, carrera__plantel=plantel
-    ).distinct()
-    docentes_pendientes = User.objects.filter(id__in=asignaturas_sin_notas).count()
-
-    # ── Actividad reciente ────────────────────────────────────────────
-    actividad_reciente = LogEntry.objects.filter(
-        user__plantel=plantel
-    ).select_related('content_type', 'user').order_by('-action_time')[:5]
+    # ── KPIs (foto cacheada por plantel, ver inicio/kpis.py) ───────────
+    kpis = kpis_plantel(plantel)
+    docentes_pendientes = kpis['docentes_pendientes']
+    num_riesgo_total    = kpis['num_riesgo_total']
+    aulas_ocupadas      = kpis['aulas_reales']['ocupadas']
+    total_aulas         = kpis['aulas_reales']['total']
 
     # ── Agenda inteligente ────────────────────────────────────────────
     agenda = []
@@ -143,23 +121,18 @@ def dashboard_view(request):
         agenda.append({'hora': '09:00', 'evento': 'Revisión de expedientes rutinaria', 'tipo': 'rutina'})
 
     context = {
-        'total_docentes':      total_docentes,
-        'total_coordinadores': total_coordinadores,
-        'total_alumnos':       total_alumnos,
-        'asistencia_global':   asistencia_global,
+        **kpis,
         'periodos':            periodos,
-        'alumnos_riesgo':      alumnos_riesgo,
-        'docentes_pendientes': docentes_pendientes,
         'agenda':              agenda,
-        'actividad_reciente':  actividad_reciente,
-        'aulas_reales':        aulas_reales,
         'grupos_disponibles':  grupos_disponibles,
         'inscripcion_errors':  inscripcion_errors,
         'inscripcion_data':    inscripcion_data,
         **theme,
     }
 
-    return render(request, 'inicio/dashboard.html', context)
+    response = render(request, 'inicio/dashboard.html', context)
+    response['Server-Timing'] = f"kpis;dur={kpis['kpis_ms']}"
+    return response
 
 def logout_view(request):
     logout(request)
@@ -197,124 +170,26 @@ def login_view(request):
 
 @login_required
 def busqueda_global(request):
-    query   = request.GET.get('q', '').strip()
-    theme   = get_campus_theme(request.user)
-    plantel = request.user.plantel
-
-    alumnos  = []
-    docentes = []
-    grupos   = []
-
-    if query:
-        alumnos = User.objects.filter(plantel=plantel, rol='ALUMNO').filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)  |
-            Q(username__icontains=query)   |
-            Q(email__icontains=query)
-        )[:10]
-
-        docentes = User.objects.filter(plantel=plantel, rol='DOCENTE').filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)  |
-            Q(email__icontains=query)
-        )[:10]
-
-        grupos = Grupo.objects.filter(plantel=plantel).filter(
-            Q(nombre__icontains=query) |
-            Q(carrera__nombre__icontains=query)
-        )[:10]
+    query = request.GET.get('q', '').strip()
+    theme = get_campus_theme(request.user)
 
-    total = len(alumnos) + len(docentes) + len(grupos)
+    resultados = buscar(request.user, query, limite=LIMITE_PAGINA_BUSQUEDA) if query else []
+    secciones = {}
+    for r in resultados:
+        secciones.setdefault(r['etiqueta'], []).append(r)
 
     return render(request, 'inicio/busqueda.html', {
-        'query':   query,
-        'alumnos': alumnos,
-        'docentes': docentes,
-        'grupos':  grupos,
-        'total':   total,
+        'query':      query,
+        'secciones':  secciones,
+        'total':      len(resultados),
         **theme,
     })
-@login_required
-def dashboard_docente(request):
-    if request.user.rol != 'DOCENTE':
-        return redirect('dashboard')
 
-    from users.models import DocenteGrupo
-    from academic.models import Tarea, ComentarioTarea
-    theme = get_campus_theme(request.user)
-    hoy   = timezone.now().date()
-
-    # Grupos via DocenteGrupo
-    asignaciones = DocenteGrupo.objects.filter(
-        docente=request.user, activo=True, asignatura__isnull=False
-    ).select_related('grupo', 'asignatura')
-
-    grupos = list({a.grupo for a in asignaciones})
-
-    # KPIs
-    registros_hoy = Asistencia.objects.filter(grupo__in=grupos, fecha=hoy).count()
-    presentes_hoy = Asistencia.objects.filter(grupo__in=grupos, fecha=hoy, estado='P').count()
-    asistencia_hoy = f"{int((presentes_hoy / registros_hoy) * 100)}%" if registros_hoy > 0 else "Sin registro"
-
-    total_alumnos = User.objects.filter(
-        rol='ALUMNO', alumno_grupo__in=grupos
-    ).distinct().count()
-
-    tareas_activas = Tarea.objects.filter(
-        docente=request.user, publicada=True,
-        fecha_entrega__gte=timezone.now()
-    ).count()
-
-    # Últimas 10 notificaciones: entregas + comentarios
-    from academic.models import EntregaTarea, ComentarioTarea, EntregaActividad
-    from itertools import chain
-
-    entregas_tarea = EntregaTarea.objects.filter(
-        tarea__docente=request.user
-    ).select_related('alumno', 'tarea').order_by('-entregada_en')[:10]
-
-    comentarios_tarea = ComentarioTarea.objects.filter(
-        tarea__docente=request.user
-    ).exclude(autor=request.user).select_related('autor', 'tarea').order_by('-creado_en')[:10]
-
-    # Construir lista unificada de notificaciones
-    notificaciones = []
-
-    for e in entregas_tarea:
-        notificaciones.append({
-            'tipo':   'entrega_tarea',
-            'icono':  '📥',
-            'color':  '#059669',
-            'bg':     '#d1fae5',
-            'titulo': f'{e.alumno.get_full_name()} entregó una tarea',
-            'sub':    e.tarea.titulo,
-            'fecha':  e.entregada_en,
-            'url':    f'/docente/tareas/{e.tarea.pk}/',
-        })
-
-    for c in comentarios_tarea:
-        notificaciones.append({
-            'tipo':   'comentario',
-            'icono':  '💬',
-            'color':  '#7c3aed',
-            'bg':     '#ede9fe',
-            'titulo': f'{c.autor.get_full_name()} comentó',
-            'sub':    c.tarea.titulo,
-            'fecha':  c.creado_en,
-            'url':    f'/docente/tareas/{c.tarea.pk}/',
-        })
-
-    # Ordenar por fecha desc y tomar 10
-    notificaciones.sort(key=lambda x: x['fecha'], reverse=True)
-    notificaciones = notificaciones[:10]
-
-    return render(request, 'inicio/dashboard_docente.html', {
-        'grupos':          grupos,
-        'asignaciones':    asignaciones,
-        'total_alumnos':   total_alumnos,
-        'asistencia_hoy':  asistencia_hoy,
-        'tareas_activas':  tareas_activas,
-        'notificaciones':  notificaciones,
-        'hoy':             hoy,
-        **theme,
-    })
\ No newline at end of file
+
+@login_required
+def busqueda_sugerencias(request):
+    """Typeahead del buscador de la barra superior: ?q= → {'resultados': [...]}."""
+    resultados = buscar(request.user, request.GET.get('q', ''), limite=LIMITE_SUGERENCIAS)
+    response = JsonResponse({'resultados': resultados})
+    patch_cache_control(response, private=True, max_age=30)
+    return response